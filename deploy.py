@@ -67,6 +67,13 @@ def create_directories():
             path.mkdir(parents=True, exist_ok=True)
             print(f"📁 Directorio creado: {directory}")
 
+def build_assets():
+    """Generar el CSS del sitio (sin el CLI de Tailwind queda el app.css versionado)"""
+    return run_command(
+        'python manage.py build_assets',
+        'Generando CSS del sitio'
+    )
+
 def collect_static():
     """Recopilar archivos estáticos"""
     return run_command(
@@ -134,7 +141,11 @@ def main():
         print("❌ Fallo en migraciones. Abortando despliegue.")
         sys.exit(1)
     
-    # Recopilar archivos estáticos
+    # Generar CSS y recopilar archivos estáticos
+    if not build_assets():
+        print("❌ Fallo generando el CSS del sitio. Abortando despliegue.")
+        sys.exit(1)
+    
     if not collect_static():
         print("❌ Fallo recopilando archivos estáticos. Abortando despliegue.")
         sys.exit(1)
@@ -155,7 +166,8 @@ def main():
     print("   1. Configura las variables de entorno (.env)")
     print("   2. Configura el servidor web (Nginx/Apache)")
     print("   3. Inicia el servidor: gunicorn -c gunicorn.conf.py timeline_love.wsgi:application")
-    print("   4. Cambia la contraseña del superusuario")
+    print("   4. Inicia el worker de imágenes: python manage.py image_worker")
+    print("   5. Cambia la contraseña del superusuario")
     print("\n🔗 URLs importantes:")
     print("   - Admin: /admin/")
     print("   - Timeline: /")
@@ -6,10 +6,21 @@ import multiprocessing
 import os
 
 # Configuración del servidor
-bind = "0.0.0.0:8000"
+bind = os.environ.get('GUNICORN_BIND', "0.0.0.0:8000")
 workers = multiprocessing.cpu_count() * 2 + 1
 worker_class = "sync"
 worker_connections = 1000
+
+# SERVER_MODE=asgi: workers de uvicorn sobre timeline_love.asgi, con las
+# vistas async de memories/async_views.py. Un worker sync atiende una
+# conexión a la vez; uno ASGI mantiene muchas abiertas (subidas lentas,
+# keep-alive) sin bloquear a las demás. Requiere uvicorn (requirements.txt).
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+if SERVER_MODE == 'asgi':
+    worker_class = "uvicorn.workers.UvicornWorker"
+    wsgi_app = "timeline_love.asgi:application"
+else:
+    wsgi_app = "timeline_love.wsgi:application"
 max_requests = 1000
 max_requests_jitter = 100
 
@@ -44,4 +55,25 @@ else:
     # Configuración de desarrollo
     workers = 1
     reload = True
-    preload_app = False
\ No newline at end of file
+    preload_app = False
+
+if 'GUNICORN_WORKERS' in os.environ:
+    workers = int(os.environ['GUNICORN_WORKERS'])
+
+
+def worker_exit(server, worker):
+    """Volcar las métricas pendientes antes de que el worker termine"""
+    from memories.metrics import registry
+    registry.flush()
+
+
+def child_exit(server, worker):
+    """
+    Sumar el archivo de métricas del worker terminado al acumulado, para que
+    METRICS_DIR no crezca con cada reciclado de max_requests
+    """
+    from memories.metrics import mark_process_dead
+    try:
+        mark_process_dead(worker.pid)
+    except Exception as e:  # Sin settings de Django o sin permisos: lo hace /metrics/
+        server.log.warning('No se pudieron acumular las métricas del worker %s: %s', worker.pid, e)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Memory
+from .models import Memory, ImageBlob, ImageJob
 
 
 @admin.register(Memory)
@@ -7,8 +7,8 @@ class MemoryAdmin(admin.ModelAdmin):
     """
     Configuración del admin para el modelo Memory
     """
-    list_display = ('title', 'user', 'date', 'created_at')
-    list_filter = ('date', 'created_at', 'user')
+    list_display = ('title', 'user', 'date', 'processing_status', 'created_at')
+    list_filter = ('date', 'created_at', 'processing_status', 'user')
     search_fields = ('title', 'description')
     date_hierarchy = 'date'
     ordering = ('-date', '-created_at')
@@ -21,13 +21,42 @@ class MemoryAdmin(admin.ModelAdmin):
             'fields': ('user',)
         }),
         ('Metadatos', {
-            'fields': ('created_at', 'updated_at'),
+            'fields': ('processing_status', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
     
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('processing_status', 'created_at', 'updated_at')
     
     def get_queryset(self, request):
         """Optimizar consultas con select_related"""
         return super().get_queryset(request).select_related('user')
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Buscar con el índice de texto completo en lugar de LIKE '%q%'"""
+        from .search import filter_search
+        return filter_search(queryset, search_term), False
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para la cola de trabajos de imagen
+    """
+    list_display = ('id', 'memory', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('memory', 'attempts', 'error', 'created_at', 'started_at', 'finished_at')
+    
+    def get_queryset(self, request):
+        """Optimizar consultas con select_related"""
+        return super().get_queryset(request).select_related('memory')
+
+
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para los archivos de imagen compartidos
+    """
+    list_display = ('digest', 'name', 'size', 'ref_count', 'created_at')
+    search_fields = ('digest',)
+    readonly_fields = ('digest', 'name', 'size', 'ref_count', 'created_at')
@@ -0,0 +1,132 @@
+"""
+Agregados de la línea de tiempo: índice año → mes y "un día como hoy".
+
+Ambos se calculan con consultas agrupadas sobre el índice (user, -date) y
+se cachean por usuario con la misma versión que los fragmentos de la línea
+de tiempo (ver memories/cache.py), así que cualquier escritura los invalida.
+"""
+import calendar
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from .cache import get_timeline_version
+from .models import Memory
+from .pagination import TIMELINE_ORDERING
+
+
+# Recuerdos de "un día como hoy" que se muestran
+ON_THIS_DAY_LIMIT = 12
+
+
+class InvalidDateRange(ValueError):
+    """Parámetros year/month fuera de rango o mal formados"""
+
+
+def _aggregate_key(user_id, name, *parts):
+    suffix = ':'.join(str(part) for part in parts)
+    return f'timeline:{name}:{user_id}:{get_timeline_version(user_id)}:{suffix}'
+
+
+def _cached(key, compute):
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, getattr(settings, 'TIMELINE_CACHE_TIMEOUT', 600))
+    return value
+
+
+def date_histogram(user_id):
+    """
+    Recuerdos por año y mes, del más reciente al más antiguo:
+    [{'year': 2024, 'count': 7, 'months': [{'month': 5, 'count': 3, 'start': date(2024, 5, 1)}, ...]}, ...]
+    """
+    return _cached(_aggregate_key(user_id, 'histogram'), lambda: _build_histogram(user_id))
+
+
+def _build_histogram(user_id):
+    rows = (
+        Memory.objects.filter(user_id=user_id)
+        .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+        .values('year', 'month')
+        .annotate(count=Count('pk'))
+        .order_by('-year', '-month')
+    )
+    years = []
+    for row in rows:
+        if not years or years[-1]['year'] != row['year']:
+            years.append({'year': row['year'], 'count': 0, 'months': []})
+        years[-1]['count'] += row['count']
+        years[-1]['months'].append({
+            'month': row['month'],
+            'count': row['count'],
+            'start': date(row['year'], row['month'], 1),
+        })
+    return years
+
+
+def range_count(user_id, year, month=None):
+    """Recuerdos de un año (o mes) según el histograma cacheado, sin COUNT(*)"""
+    for entry in date_histogram(user_id):
+        if entry['year'] != year:
+            continue
+        if month is None:
+            return entry['count']
+        return next((item['count'] for item in entry['months'] if item['month'] == month), 0)
+    return 0
+
+
+def on_this_day(user, today=None, limit=ON_THIS_DAY_LIMIT):
+    """
+    Recuerdos del mismo día y mes en años anteriores, el más reciente primero.
+    Se consultan fechas exactas (una por año desde el recuerdo más antiguo),
+    que el índice (user, -date) resuelve sin recorrer la tabla.
+    """
+    from .stats import get_user_stats
+
+    today = today or date.today()
+    key = _aggregate_key(user.pk, 'on_this_day', today.isoformat(), limit)
+
+    def compute():
+        earliest = get_user_stats(user).earliest_date
+        if earliest is None:
+            return []
+        dates = [
+            date(year, today.month, today.day)
+            for year in range(earliest.year, today.year)
+            # El 29 de febrero solo existe en años bisiestos
+            if today.day <= calendar.monthrange(year, today.month)[1]
+        ]
+        if not dates:
+            return []
+        return list(
+            Memory.objects.filter(user=user, date__in=dates)
+            .order_by(*TIMELINE_ORDERING)[:limit]
+        )
+
+    return _cached(key, compute)
+
+
+def parse_date_range(params):
+    """
+    Leer ?year= y ?month= de la petición.
+    Retorna (year, month, desde, hasta) o None si no se pidió un rango.
+    """
+    year = params.get('year')
+    month = params.get('month')
+    if not year:
+        if month:
+            raise InvalidDateRange('El mes requiere un año.')
+        return None
+    try:
+        year = int(year)
+        month = int(month) if month else None
+        if month is None:
+            return year, None, date(year, 1, 1), date(year, 12, 31)
+        last_day = calendar.monthrange(year, month)[1]
+        return year, month, date(year, month, 1), date(year, month, last_day)
+    except ValueError as e:
+        raise InvalidDateRange(f'Rango de fechas no válido: {year}-{month}') from e
@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class MemoriesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'memories'
+
+    def ready(self):
+        # Registrar señales
+        from . import signals  # noqa: F401
+
+        # PRAGMA de SQLite en cada conexión nueva (ver memories/sqlite.py)
+        from django.db.backends.signals import connection_created
+        from .sqlite import configure_connection
+        connection_created.connect(configure_connection, dispatch_uid='memories.sqlite.configure_connection')
+
+        # Consultas por petición para /metrics/ (ver memories/metrics.py)
+        from .metrics import install_query_counter
+        connection_created.connect(install_query_counter, dispatch_uid='memories.metrics.install_query_counter')
@@ -0,0 +1,262 @@
+"""
+Bundle de CSS del sitio y fuentes propias, generados por el comando build_assets.
+
+Reemplaza al compilador de Tailwind que corría en el navegador
+(cdn.tailwindcss.com) por el CLI de Tailwind CSS (paquete tailwindcss-bin,
+sin Node): a partir de assets/css/app.css, que importa static/css/custom.css
+y declara las fuentes, genera solo las utilidades que aparecen en plantillas,
+JavaScript y formularios, en un único archivo minificado, static/css/app.css.
+
+En producción CompressedManifestStaticFilesStorage le agrega el hash del
+contenido al nombre y lo sirve comprimido y con cache de larga duración.
+Las fuentes (static/fonts) se recortan a los caracteres latinos con
+fontTools a partir de las de Google Fonts que traen los paquetes fontpkg-*;
+ambos, el CLI y fontTools, solo hacen falta para regenerar los archivos.
+"""
+import glob
+import gzip
+import importlib
+import os
+import re
+import subprocess
+import urllib.request
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+
+TAILWIND_CLI = 'tailwindcss'
+TAILWIND_INPUT = 'assets/css/app.css'
+BUNDLE = 'css/app.css'
+
+# Fuentes propias: fuente original del paquete -> woff2 en static/
+FONTS = (
+    {
+        'family': 'Inter',
+        'package': 'fontpkg_inter',
+        'source': 'Inter[[]*.ttf',
+        'output': 'fonts/inter-latin.woff2',
+        # Los pesos que usan las plantillas, con el tamaño óptico de texto
+        'axes': {'wght': (300, 700), 'opsz': 14},
+        'preload': True,
+    },
+    {
+        'family': 'Dancing Script',
+        'package': 'fontpkg_dancing_script',
+        'source': 'DancingScript[[]*.ttf',
+        'output': 'fonts/dancing-script-latin.woff2',
+        'axes': {},
+        'preload': False,
+    },
+)
+
+# Latín básico y suplemento (español incluido), puntuación y símbolos comunes;
+# el mismo unicode-range de los @font-face de assets/css/app.css
+LATIN_UNICODE_RANGE = (
+    'U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, '
+    'U+2000-206F, U+2074, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD'
+)
+
+
+def static_dir():
+    """Carpeta de static/ del proyecto (la primera de STATICFILES_DIRS)"""
+    return str(settings.STATICFILES_DIRS[0])
+
+
+def built_fonts():
+    """Fuentes de FONTS cuyo woff2 ya se generó"""
+    return [font for font in FONTS if os.path.exists(os.path.join(static_dir(), font['output']))]
+
+
+def build_bundle():
+    """
+    Contenido de static/css/app.css según las fuentes actuales.
+    FileNotFoundError si el CLI de Tailwind no está instalado y
+    CalledProcessError si falla.
+    """
+    result = subprocess.run(
+        [TAILWIND_CLI, '--input', TAILWIND_INPUT, '--output', '-', '--minify'],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    return result.stdout
+
+
+def write_bundle(css):
+    path = os.path.join(static_dir(), BUNDLE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write(css)
+    return path
+
+
+def latin_unicodes():
+    unicodes = []
+    for part in LATIN_UNICODE_RANGE.split(','):
+        start, _, end = part.strip()[2:].partition('-')
+        unicodes.extend(range(int(start, 16), int(end or start, 16) + 1))
+    return unicodes
+
+
+def subset_font(source, output, axes=None):
+    """
+    Recortar una fuente a LATIN_UNICODE_RANGE y guardarla como woff2.
+    axes limita los ejes de una fuente variable ({'wght': (300, 700)}).
+    """
+    from fontTools import subset  # Opcional: solo para regenerar las fuentes
+    from fontTools.varLib import instancer
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    font = subset.load_font(source, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=latin_unicodes())
+    subsetter.subset(font)
+    if axes:
+        font = instancer.instantiateVariableFont(font, axes)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    subset.save_font(font, output, options)
+
+
+def font_source(font, source_dir=None):
+    """
+    Fuente original: la de source_dir o la del paquete fontpkg-* instalado.
+    None si no está.
+    """
+    if source_dir is None:
+        try:
+            package = importlib.import_module(font['package'])
+        except ImportError:
+            return None
+        source_dir = os.path.join(package.ROOT, 'files')
+    matches = sorted(glob.glob(os.path.join(source_dir, font['source'])))
+    return matches[0] if matches else None
+
+
+def subset_fonts(source_dir=None):
+    """Generar los woff2 de FONTS que tengan su fuente original. Retorna [(fuente, woff2)]"""
+    generated = []
+    for font in FONTS:
+        source = font_source(font, source_dir)
+        if source is None:
+            continue
+        output = os.path.join(static_dir(), font['output'])
+        subset_font(source, output, font['axes'])
+        generated.append((source, output))
+    return generated
+
+
+# --- Reporte por página ---------------------------------------------------------
+
+def read_source(path, revision=None):
+    """Archivo del proyecto, del árbol actual o de una revisión de git"""
+    if revision is None:
+        full_path = os.path.join(settings.BASE_DIR, path)
+        if not os.path.exists(full_path):
+            return None
+        with open(full_path, 'rb') as handle:
+            return handle.read()
+    result = subprocess.run(
+        ['git', 'show', f'{revision}:{path}'], cwd=settings.BASE_DIR, capture_output=True,
+    )
+    return result.stdout if result.returncode == 0 else None
+
+
+def page_templates():
+    """Plantillas de página (las que extienden base.html)"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(settings.BASE_DIR, 'templates', '**', '*.html'), recursive=True)):
+        with open(path, encoding='utf-8') as handle:
+            if "{% extends 'base.html' %}" in handle.read().replace('"', "'"):
+                pages.append(os.path.relpath(path, settings.BASE_DIR))
+    return pages
+
+
+RESOURCE_PATTERNS = (
+    ('css', re.compile(r'<link\b[^>]*\brel=["\']stylesheet["\'][^>]*>', re.I)),
+    ('font', re.compile(r'<link\b[^>]*\bas=["\']font["\'][^>]*>', re.I)),
+    ('js', re.compile(r'<script\b[^>]*\bsrc=[^>]*>', re.I)),
+)
+
+
+def page_resources(template, revision=None, fetch=False):
+    """
+    Peticiones que hace una página además del HTML: [{url, kind, blocking, bytes, gzip}].
+    Bloqueante: hoja de estilos o script sin async/defer dentro de <head>.
+    bytes es None para recursos externos si no se descargan (fetch).
+    """
+    base = (read_source('templates/base.html', revision) or b'').decode('utf-8')
+    page = (read_source(template, revision) or b'').decode('utf-8')
+    head_end = base.find('</head>')
+    resources = []
+    for html, in_head_until in ((base, head_end), (page, -1)):
+        for kind, pattern in RESOURCE_PATTERNS:
+            for match in pattern.finditer(html):
+                tag = match.group(0)
+                url = _resource_url(tag)
+                if url is None:
+                    continue
+                in_head = match.start() < in_head_until
+                blocking = in_head and (kind == 'css' or (kind == 'js' and not re.search(r'\b(async|defer)\b', tag)))
+                resources.append(_measure(url, kind, blocking, revision, fetch))
+    # Fuentes que piden las hojas de estilos
+    for resource in list(resources):
+        if resource['kind'] == 'css' and resource['content']:
+            for url in re.findall(r'url\(\s*["\']?([^"\')]+)', resource['content'].decode('utf-8', 'replace')):
+                if url.startswith('data:'):
+                    continue
+                full_url = _join_url(resource['url'], url)
+                if not any(item['url'] == full_url for item in resources):
+                    resources.append(_measure(full_url, 'font', False, revision, fetch))
+    for resource in resources:
+        resource.pop('content')
+    return resources
+
+
+def _resource_url(tag):
+    match = re.search(r'\b(?:href|src)=(["\'])(.+?)\1', tag)
+    if match is None:
+        return None
+    url = match.group(2)
+    static = re.fullmatch(r"\{%\s*static\s+['\"]([^'\"]+)['\"]\s*%\}", url)
+    return f'static/{static.group(1)}' if static else url
+
+
+def _join_url(base, url):
+    if '://' in url or url.startswith('/'):
+        return url
+    return os.path.normpath(os.path.join(os.path.dirname(base), url)).replace(os.sep, '/')
+
+
+def _measure(url, kind, blocking, revision, fetch):
+    content = None
+    if '://' in url:
+        if fetch:
+            content = _download(url)
+    else:
+        content = read_source(url, revision)
+    return {
+        'url': url,
+        'kind': kind,
+        'blocking': blocking,
+        'external': '://' in url,
+        'content': content,
+        'bytes': len(content) if content is not None else None,
+        'gzip': len(gzip.compress(content, 9)) if content is not None else None,
+    }
+
+
+def _download(url):
+    request = urllib.request.Request(url, headers={
+        # Con un navegador actual Google Fonts responde con woff2
+        'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.read()
+    except OSError:
+        return None
+
+
+def external_hosts(resources):
+    return sorted({urlsplit(resource['url']).hostname for resource in resources if resource['external']})
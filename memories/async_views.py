@@ -0,0 +1,128 @@
+"""
+Versiones async de las vistas de lectura más frecuentes, para servir con ASGI
+(ver timeline_love/asgi.py y gunicorn.conf.py).
+
+Heredan de las vistas de views.py y solo reemplazan lo que bloquea: la carga
+del usuario, los validadores de ETag y las consultas, que pasan por el ORM
+async o por sync_to_async. Lo que no tiene versión async en Django 4.2
+(renderizar plantillas, el cache de fragmentos) sigue corriendo en el hilo
+de sync_to_async, pero mientras espera el worker atiende otras conexiones.
+memories/urls.py las usa cuando settings.ASYNC_VIEWS está activo.
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.views.generic import View
+
+from . import views
+from .health import READINESS_CHECKS, cached_checks, cached_result
+from .models import Memory
+from .routers import get_replicas, is_primary_sticky, replica_reads
+from .stats import aget_user_stats
+
+
+class AsyncReadMixin:
+    """
+    Equivalente async de LoginRequiredMixin + ReplicaReadMixin +
+    ConditionalGetMixin. Reemplaza su dispatch: el de esos mixins evalúa
+    request.user, que consulta la sesión y la base de forma síncrona.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Cargar el usuario fuera del event loop; después queda en memoria
+        authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not authenticated:
+            return self.handle_no_permission()
+
+        if request.method in ('GET', 'HEAD') and get_replicas() and not is_primary_sticky(request):
+            with replica_reads():
+                return await self.conditional_dispatch(request, *args, **kwargs)
+        return await self.conditional_dispatch(request, *args, **kwargs)
+
+    async def conditional_dispatch(self, request, *args, **kwargs):
+        if not self.is_conditional(request):
+            return await View.dispatch(self, request, *args, **kwargs)
+
+        etag, last_modified = await self.aget_validators(request)
+        response = self.not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = await View.dispatch(self, request, *args, **kwargs)
+        return self.add_validators(response, etag, last_modified)
+
+    async def aget_validators(self, request):
+        """Versión async de get_validators()"""
+        raise NotImplementedError
+
+
+class TimelineView(AsyncReadMixin, views.TimelineView):
+    """
+    Línea de tiempo servida con ASGI
+    """
+
+    async def aget_validators(self, request):
+        self.stats = await aget_user_stats(request.user)
+        # El ETag incluye la versión del cache, que puede estar en Redis
+        return await sync_to_async(self.validators_from_stats)(request)
+
+    async def get(self, request, *args, **kwargs):
+        # La plantilla se renderiza después, en el hilo del handler ASGI
+        context = await sync_to_async(self.get_page_context)(request)
+        return self.render_to_response(context)
+
+
+class MemoryDetailView(AsyncReadMixin, views.MemoryDetailView):
+    """
+    Detalle de un recuerdo servido con ASGI
+    """
+
+    async def aget_validators(self, request):
+        return self.validators_from_row(request, await self.validators_queryset(request).afirst())
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await Memory.objects.filter(pk=self.kwargs['pk'], user=request.user).afirst()
+        if self.object is None:
+            raise Http404("No tienes permiso para ver este recuerdo.")
+        return self.render_to_response(self.get_context_data(object=self.object))
+
+
+class MemoryCountView(AsyncReadMixin, views.MemoryCountView):
+    """
+    Conteo de recuerdos servido con ASGI
+    """
+
+    async def aget_validators(self, request):
+        self.stats = await aget_user_stats(request.user)
+        return self.validators_from_stats(request)
+
+    async def get(self, request):
+        return super().get(request)
+
+
+class LivenessView(views.LivenessView):
+    """
+    Sondeo de vida servido con ASGI: responde en el event loop aunque
+    todos los hilos estén ocupados
+    """
+
+    async def get(self, request):
+        return super().get(request)
+
+
+class HealthView(views.HealthView):
+    """
+    Estado de salud servido con ASGI
+    """
+
+    async def get(self, request):
+        result = cached_result(self.variant)
+        if result is None:
+            # Puede esperar hasta HEALTH_CHECK_TIMEOUT: no ocupar el hilo del ORM
+            result = await sync_to_async(cached_checks, thread_sensitive=False)(self.variant, self.checks)
+        return self.health_response(*result)
+
+
+class ReadinessView(HealthView):
+    """
+    Sondeo de disponibilidad servido con ASGI
+    """
+    variant = 'ready'
+    checks = READINESS_CHECKS
@@ -0,0 +1,98 @@
+"""
+Procesamiento en lote de las imágenes ya guardadas (comando normalize_images).
+
+Como en importer.py, las funciones que procesan imágenes corren en procesos
+separados: no usan el ORM ni el storage de Django, solo leen y escriben
+archivos bajo MEDIA_ROOT con los nombres por contenido de storage.py.
+"""
+import hashlib
+import os
+
+from PIL import Image, ImageOps
+
+from .images import (
+    FORMAT_EXTENSIONS,
+    RENDITIONS,
+    derivative_name,
+    image_summary,
+    normalize_image,
+    render_rendition,
+    render_variants,
+    variant_formats,
+)
+from .storage import content_name, write_once
+
+
+def normalize_stored_image(blob, media_root, options):
+    """
+    Recodificar un original guardado y generar los derivados y variantes que
+    le falten. blob es (id, nombre). Corre en un proceso del pool; retorna un
+    diccionario serializable con el resultado o con el error.
+    """
+    blob_id, name = blob
+    formats = variant_formats(options)
+    result = {'blob': blob_id, 'old_name': name, 'name': name}
+    try:
+        size = os.path.getsize(os.path.join(media_root, name))
+        result.update(old_size=size, size=size)
+        if is_normalized(media_root, name, options, formats):
+            result['skipped'] = True
+            return result
+
+        normalized = normalize_image(os.path.join(media_root, name), size, options)
+        if normalized is not None:
+            content, ext = normalized
+            name = content_name(hashlib.sha256(content).hexdigest(), ext)
+            write_once(media_root, name, content)
+            result.update(name=name, size=len(content))
+
+        with Image.open(os.path.join(media_root, name)) as image:
+            image.seek(0)  # Primer cuadro en GIF animados
+            image = ImageOps.exif_transpose(image)
+            image.load()
+        result['derivatives'], result['variant_bytes'] = _write_renditions(media_root, name, image, formats)
+        result['summary'] = image_summary(image)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        result['error'] = str(e) or e.__class__.__name__
+    return result
+
+
+def is_normalized(media_root, name, options, formats):
+    """
+    Ya pasó por normalize_stored_image: tiene todas las variantes o, sin
+    variantes configuradas, ya está en el formato de destino
+    """
+    if not formats:
+        return os.path.splitext(name)[1] == FORMAT_EXTENSIONS[options['FORMAT']]
+    return all(
+        os.path.exists(os.path.join(media_root, derivative_name(name, field_name, FORMAT_EXTENSIONS[image_format])))
+        for field_name in RENDITIONS
+        for image_format in formats
+    )
+
+
+def _write_renditions(media_root, name, image, formats):
+    """Derivados y variantes que falten; retorna ({campo: nombre}, bytes de variantes escritos)"""
+    names, variant_bytes = {}, 0
+    for field_name, width in RENDITIONS.items():
+        existing = [
+            derivative_name(name, field_name, ext) for ext in ('.jpg', '.png')
+            if os.path.exists(os.path.join(media_root, derivative_name(name, field_name, ext)))
+        ]
+        if existing:
+            names[field_name] = existing[0]
+        else:
+            content, ext = render_rendition(image, width)
+            names[field_name] = derivative_name(name, field_name, ext)
+            write_once(media_root, names[field_name], content)
+
+        missing = {
+            image_format: quality for image_format, quality in formats.items()
+            if not os.path.exists(os.path.join(
+                media_root, derivative_name(name, field_name, FORMAT_EXTENSIONS[image_format])
+            ))
+        }
+        for content, ext in render_variants(image, width, missing):
+            write_once(media_root, derivative_name(name, field_name, ext), content)
+            variant_bytes += len(content)
+    return names, variant_bytes
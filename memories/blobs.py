@@ -0,0 +1,122 @@
+"""
+Conteo de referencias de las imágenes compartidas entre recuerdos.
+
+Cada archivo original (y sus derivados) pertenece a un ImageBlob; los
+recuerdos lo adquieren al subir la imagen y lo liberan al cambiarla o
+eliminarse. Un blob sin referencias es huérfano y se purga con una consulta
+indexada en lugar de recorrer el directorio de media.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, ProtectedError, Subquery
+from django.db.models.functions import Coalesce
+
+from .images import RENDITIONS, SUMMARY_FIELDS, derivative_name
+from .models import ImageBlob, Memory
+from .storage import digest_from_name
+
+
+# Extensiones que pueden tener los derivados y sus variantes (ver images.generate_derivatives)
+DERIVATIVE_EXTENSIONS = ('.jpg', '.png', '.webp', '.avif')
+
+
+def acquire_blob(name, size):
+    """Registrar una referencia más al archivo guardado con ese nombre"""
+    blob, created = ImageBlob.objects.get_or_create(
+        digest=digest_from_name(name),
+        defaults={'name': name, 'size': size, 'ref_count': 1},
+    )
+    if not created:
+        ImageBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+    return blob
+
+
+def release_blob(blob_id):
+    """
+    Quitar una referencia. Si era la última, los archivos se borran al
+    confirmar la transacción (la purga vuelve a comprobar el contador).
+    """
+    ImageBlob.objects.filter(pk=blob_id).update(ref_count=F('ref_count') - 1)
+    transaction.on_commit(lambda: purge_blob(blob_id))
+
+
+def image_file_names(name):
+    """Nombres del original y de todos los derivados (y variantes) posibles de una imagen"""
+    names = [name]
+    for field_name in RENDITIONS:
+        for ext in DERIVATIVE_EXTENSIONS:
+            names.append(derivative_name(name, field_name, ext))
+    return names
+
+
+def blob_file_names(blob):
+    """Nombres del original y de todos los derivados posibles del blob"""
+    return image_file_names(blob.name)
+
+
+def purge_blob(blob_id):
+    """
+    Eliminar el blob y sus archivos si nadie lo referencia.
+    Retorna los bytes liberados, o None si el blob sigue en uso.
+    """
+    blob = ImageBlob.objects.filter(pk=blob_id, ref_count__lte=0).first()
+    if blob is None:
+        return None
+
+    try:
+        with transaction.atomic():
+            deleted, _ = ImageBlob.objects.filter(pk=blob.pk, ref_count__lte=0).delete()
+    except ProtectedError:
+        # El contador se desfasó: todavía hay recuerdos que lo usan
+        recount_blobs(ImageBlob.objects.filter(pk=blob.pk))
+        return None
+    if not deleted:
+        return None  # Otro recuerdo lo adquirió entre medio
+
+    storage = Memory._meta.get_field('image').storage
+    freed = 0
+    for name in blob_file_names(blob):
+        if storage.exists(name):
+            freed += storage.size(name)
+            storage.delete(name)
+    return freed
+
+
+def purge_orphaned_blobs():
+    """Purgar todos los blobs sin referencias. Retorna (blobs, bytes)"""
+    purged = freed = 0
+    orphan_ids = list(
+        ImageBlob.objects.filter(ref_count__lte=0).values_list('pk', flat=True)
+    )
+    for blob_id in orphan_ids:
+        released = purge_blob(blob_id)
+        if released is not None:
+            purged += 1
+            freed += released
+    return purged, freed
+
+
+def recount_blobs(queryset=None):
+    """Recalcular ref_count desde las referencias reales de Memory"""
+    queryset = ImageBlob.objects.all() if queryset is None else queryset
+    references = (
+        Memory.objects.filter(blob=OuterRef('pk'))
+        .order_by()
+        .values('blob')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return queryset.update(ref_count=Coalesce(Subquery(references), 0))
+
+
+def shared_derivatives(blob_id, exclude_pk=None):
+    """
+    Derivados (y placeholder) ya generados por otro recuerdo con la misma
+    imagen. Retorna {campo: valor} o None si todavía no hay.
+    """
+    siblings = Memory.objects.filter(blob_id=blob_id, processing_status=Memory.STATUS_READY)
+    if exclude_pk is not None:
+        siblings = siblings.exclude(pk=exclude_pk)
+    row = siblings.exclude(thumbnail='').values(*RENDITIONS, *SUMMARY_FIELDS).first()
+    if row is None or not all(row[field_name] for field_name in RENDITIONS):
+        return None
+    return row
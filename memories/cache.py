@@ -0,0 +1,87 @@
+"""
+Cache por usuario de la línea de tiempo renderizada.
+
+Cada usuario tiene un contador de versión que se incrementa al crear,
+editar o eliminar un recuerdo (ver memories/signals.py). Las claves de
+fragmento incluyen esa versión, así que invalidar es un solo INCR y los
+fragmentos viejos simplemente expiran. Funciona con LocMemCache en
+desarrollo y con RedisCache en producción.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from .metrics import record_cache
+
+
+def _version_key(user_id):
+    return f'timeline:version:{user_id}'
+
+
+def _initial_version():
+    # Basada en el reloj: si el cache pierde la clave, la nueva versión
+    # nunca coincide con la de fragmentos anteriores
+    return time.time_ns() // 1000
+
+
+def get_timeline_version(user_id):
+    """Versión actual de la línea de tiempo de un usuario"""
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        cache.add(_version_key(user_id), _initial_version(), timeout=None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+def bump_timeline_version(user_id):
+    """Invalidar todos los fragmentos cacheados de un usuario"""
+    try:
+        return cache.incr(_version_key(user_id))
+    except ValueError:
+        version = _initial_version()
+        cache.set(_version_key(user_id), version, timeout=None)
+        return version
+
+
+def timeline_fragment_key(user_id, params):
+    """Clave de un fragmento: usuario, versión y parámetros de página/cursor"""
+    query = '&'.join(f'{key}={value}' for key, value in sorted(params.items()))
+    digest = hashlib.md5(query.encode()).hexdigest()
+    return f'timeline:fragment:{user_id}:{get_timeline_version(user_id)}:{digest}'
+
+
+def get_cached_fragment(key):
+    """Obtener un fragmento cacheado registrando hit o miss"""
+    fragment = cache.get(key)
+    _record('hits' if fragment is not None else 'misses')
+    return mark_safe(fragment) if fragment is not None else None
+
+
+def cache_fragment(key, fragment):
+    """Guardar un fragmento renderizado"""
+    cache.set(key, str(fragment), getattr(settings, 'TIMELINE_CACHE_TIMEOUT', 600))
+
+
+def _record(outcome):
+    record_cache(outcome)
+    key = f'timeline:cache:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def timeline_cache_stats():
+    """Contadores de hits y misses del cache de la línea de tiempo"""
+    hits = cache.get('timeline:cache:hits', 0)
+    misses = cache.get('timeline:cache:misses', 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
@@ -12,7 +12,7 @@ class RegistrationForm(UserCreationForm):
     email = forms.EmailField(
         required=True,
         widget=forms.EmailInput(attrs={
-            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
+            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-hidden focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
             'placeholder': 'tu@email.com'
         })
     )
@@ -20,21 +20,21 @@ class RegistrationForm(UserCreationForm):
     username = forms.CharField(
         validators=[validate_username_custom],
         widget=forms.TextInput(attrs={
-            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
+            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-hidden focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
             'placeholder': 'Nombre de usuario'
         })
     )
     
     password1 = forms.CharField(
         widget=forms.PasswordInput(attrs={
-            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
+            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-hidden focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
             'placeholder': 'Contraseña'
         })
     )
     
     password2 = forms.CharField(
         widget=forms.PasswordInput(attrs={
-            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
+            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-hidden focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
             'placeholder': 'Confirmar contraseña'
         })
     )
@@ -65,14 +65,14 @@ class CustomLoginForm(AuthenticationForm):
     """
     username = forms.CharField(
         widget=forms.TextInput(attrs={
-            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
+            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-hidden focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
             'placeholder': 'Nombre de usuario'
         })
     )
     
     password = forms.CharField(
         widget=forms.PasswordInput(attrs={
-            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
+            'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-hidden focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
             'placeholder': 'Contraseña'
         })
     )
@@ -93,20 +93,20 @@ class MemoryForm(forms.ModelForm):
         fields = ('title', 'description', 'image', 'date')
         widgets = {
             'title': forms.TextInput(attrs={
-                'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
+                'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-hidden focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
                 'placeholder': 'Título del recuerdo'
             }),
             'description': forms.Textarea(attrs={
-                'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors resize-none',
+                'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-hidden focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors resize-none',
                 'rows': 4,
                 'placeholder': 'Describe este hermoso recuerdo...'
             }),
             'image': forms.FileInput(attrs={
-                'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors file:mr-4 file:py-2 file:px-4 file:rounded-full file:border-0 file:text-sm file:font-semibold file:bg-pink-50 file:text-pink-700 hover:file:bg-pink-100',
+                'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-hidden focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors file:mr-4 file:py-2 file:px-4 file:rounded-full file:border-0 file:text-sm file:font-semibold file:bg-pink-50 file:text-pink-700 hover:file:bg-pink-100',
                 'accept': 'image/*'
             }),
             'date': forms.DateInput(attrs={
-                'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
+                'class': 'w-full px-4 py-3 border border-gray-300 rounded-lg focus:outline-hidden focus:ring-2 focus:ring-pink-500 focus:border-transparent transition-colors',
                 'type': 'date'
             })
         }
@@ -125,6 +125,10 @@ class MemoryForm(forms.ModelForm):
 
     def clean_image(self):
         """Validar imagen con validaciones adicionales"""
+        # Rechazos hechos por el upload handler mientras se recibía el archivo
+        if 'image' in self.upload_errors:
+            raise forms.ValidationError(self.upload_errors['image'])
+
         image = self.cleaned_data.get('image')
         if image:
             # Validar tamaño máximo de 5MB
@@ -172,12 +176,18 @@ class MemoryForm(forms.ModelForm):
                 raise forms.ValidationError('La descripción debe tener al menos 10 caracteres.')
         return description
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, upload_errors=None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
         # Hacer todos los campos requeridos excepto imagen en edición
         for field_name, field in self.fields.items():
             if field_name == 'image' and self.instance.pk:
                 # En edición, la imagen no es requerida (mantener la actual)
                 field.required = False
             else:
-                field.required = True
\ No newline at end of file
+                field.required = True
+
+        if 'image' in self.upload_errors:
+            # El archivo rechazado no llega a request.FILES: mostrar el motivo
+            # en lugar del mensaje genérico de campo obligatorio
+            self.fields['image'].error_messages['required'] = self.upload_errors['image']
\ No newline at end of file
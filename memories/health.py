@@ -0,0 +1,224 @@
+"""
+Verificaciones de salud del sistema, compartidas por /health/ y el comando
+health_check.
+
+Las verificaciones corren en paralelo en un pool de hilos, cada una con su
+propio tiempo límite, y el resultado se guarda en memoria del proceso unos
+segundos (HEALTH_CACHE_SECONDS): los sondeos frecuentes del balanceador
+no repiten consultas ni E/S. No se usa el cache de Django para esto, porque
+es una de las cosas que se verifican.
+"""
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections
+
+try:
+    import psutil
+except ImportError:  # Opcional (ver requirements.txt)
+    psutil = None
+
+
+def check_database():
+    """Verificar conexión a la base de datos"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        result = cursor.fetchone()
+    if result and result[0] == 1:
+        return {
+            'healthy': True,
+            'message': 'Conexión exitosa',
+            'details': [f'Motor: {connection.vendor}']
+        }
+    return {
+        'healthy': False,
+        'message': 'Respuesta inesperada de la base de datos'
+    }
+
+
+def check_cache():
+    """Verificar sistema de cache"""
+    test_key = f'health_check_test:{os.getpid()}:{threading.get_ident()}'
+    test_value = 'test_value'
+    cache.set(test_key, test_value, 30)
+    retrieved_value = cache.get(test_key)
+    cache.delete(test_key)
+    if retrieved_value == test_value:
+        return {
+            'healthy': True,
+            'message': 'Cache funcionando correctamente'
+        }
+    return {
+        'healthy': False,
+        'message': 'Cache no está funcionando correctamente'
+    }
+
+
+def check_media_storage():
+    """Verificar almacenamiento de archivos media"""
+    media_root = settings.MEDIA_ROOT
+    if not os.path.exists(media_root):
+        return {
+            'healthy': False,
+            'message': 'Directorio media no existe'
+        }
+    if not os.access(media_root, os.W_OK):
+        return {
+            'healthy': False,
+            'message': 'No hay permisos de escritura en directorio media'
+        }
+
+    free_space_mb = shutil.disk_usage(media_root).free / (1024 * 1024)
+    if free_space_mb < 100:  # Menos de 100MB
+        return {
+            'healthy': False,
+            'message': f'Poco espacio disponible: {free_space_mb:.1f}MB'
+        }
+    return {
+        'healthy': True,
+        'message': 'Almacenamiento media OK',
+        'details': [f'Espacio libre: {free_space_mb:.1f}MB']
+    }
+
+
+def check_system_memory():
+    """Verificar memoria del sistema"""
+    if psutil is None:
+        return {
+            'healthy': True,
+            'message': 'psutil no está instalado; memoria sin verificar'
+        }
+    memory = psutil.virtual_memory()
+    memory_percent = memory.percent
+    if memory_percent > 90:
+        return {
+            'healthy': False,
+            'message': f'Memoria alta: {memory_percent:.1f}%'
+        }
+    if memory_percent > 80:
+        return {
+            'healthy': True,
+            'message': f'Memoria moderada: {memory_percent:.1f}%'
+        }
+    return {
+        'healthy': True,
+        'message': f'Memoria OK: {memory_percent:.1f}%',
+        'details': [
+            f'Total: {memory.total / (1024**3):.1f}GB',
+            f'Disponible: {memory.available / (1024**3):.1f}GB'
+        ]
+    }
+
+
+def check_disk_space():
+    """Verificar espacio en disco"""
+    disk_usage = shutil.disk_usage(settings.BASE_DIR)
+    percent_used = (disk_usage.used / disk_usage.total) * 100
+    free_gb = disk_usage.free / (1024**3)
+    if percent_used > 95:
+        return {
+            'healthy': False,
+            'message': f'Disco casi lleno: {percent_used:.1f}%'
+        }
+    if percent_used > 85:
+        return {
+            'healthy': True,
+            'message': f'Espacio en disco bajo: {percent_used:.1f}%'
+        }
+    return {
+        'healthy': True,
+        'message': f'Espacio en disco OK: {percent_used:.1f}%',
+        'details': [f'Espacio libre: {free_gb:.1f}GB']
+    }
+
+
+# Nombre -> verificación, en el orden en que se muestran
+CHECKS = {
+    'Base de Datos': check_database,
+    'Cache': check_cache,
+    'Archivos Media': check_media_storage,
+    'Memoria del Sistema': check_system_memory,
+    'Espacio en Disco': check_disk_space,
+}
+
+# Lo que necesita el proceso para atender peticiones
+READINESS_CHECKS = ('Base de Datos', 'Cache', 'Archivos Media')
+
+_executor = ThreadPoolExecutor(max_workers=len(CHECKS) * 2, thread_name_prefix='health')
+_lock = threading.Lock()
+_running = {}  # Verificaciones que no terminaron a tiempo (no se relanzan)
+_results = {}  # Variante -> (instante, resultado)
+
+
+def _run_check(function):
+    try:
+        return function()
+    except Exception as e:
+        return {
+            'healthy': False,
+            'message': f'Error en verificación: {str(e)}'
+        }
+    finally:
+        # Cada hilo del pool abre su propia conexión; no dejarla abierta
+        connections.close_all()
+
+
+def run_checks(names=None, timeout=None):
+    """
+    Ejecutar verificaciones en paralelo.
+    Retorna (todo_saludable, {nombre: resultado}).
+    """
+    names = list(names or CHECKS)
+    timeout = timeout if timeout is not None else getattr(settings, 'HEALTH_CHECK_TIMEOUT', 2.0)
+
+    futures = {}
+    for name in names:
+        previous = _running.get(name)
+        if previous is not None and not previous.done():
+            futures[name] = previous  # Sigue colgada: no ocupar otro hilo
+        else:
+            futures[name] = _running[name] = _executor.submit(_run_check, CHECKS[name])
+    wait(futures.values(), timeout=timeout)
+
+    results = {}
+    for name in names:
+        future = futures[name]
+        if future.done():
+            results[name] = future.result()
+        else:
+            results[name] = {
+                'healthy': False,
+                'message': f'Tiempo agotado ({timeout:.1f}s)'
+            }
+    return all(result['healthy'] for result in results.values()), results
+
+
+def cached_checks(variant, names, max_age=None):
+    """
+    Resultado de run_checks reutilizado durante max_age segundos.
+    Con varias peticiones a la vez, solo una ejecuta las verificaciones.
+    """
+    cached = cached_result(variant, max_age)
+    if cached is not None:
+        return cached
+    with _lock:
+        cached = cached_result(variant, max_age)
+        if cached is not None:
+            return cached
+        result = run_checks(names)
+        _results[variant] = (time.monotonic(), result)
+        return result
+
+
+def cached_result(variant, max_age=None):
+    """Último resultado de la variante si aún está vigente, si no None"""
+    max_age = max_age if max_age is not None else getattr(settings, 'HEALTH_CACHE_SECONDS', 5)
+    cached = _results.get(variant)
+    if cached and time.monotonic() - cached[0] < max_age:
+        return cached[1]
+    return None
@@ -0,0 +1,167 @@
+"""
+Lectura de la cabecera de imágenes (formato y dimensiones) sin decodificarlas.
+
+Funciona sobre los primeros bytes del archivo, de modo que puede usarse
+mientras la subida todavía se está recibiendo.
+"""
+import struct
+from collections import namedtuple
+
+
+ImageInfo = namedtuple('ImageInfo', ['format', 'width', 'height'])
+
+MIME_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'WEBP': 'image/webp',
+}
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Bytes máximos a leer buscando la cabecera (JPEG con EXIF o ICC grandes)
+HEADER_LIMIT = 256 * 1024
+
+# Tamaño de cada lectura; casi todas las cabeceras se resuelven con la primera
+READ_SIZE = 8 * 1024
+
+# Marcadores SOF de JPEG que llevan las dimensiones (excepto DHT, JPG y DAC)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Marcadores sin segmento de longitud
+JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xD8)) | {0x01}
+
+
+class ImageHeaderError(ValueError):
+    """La cabecera no corresponde a un formato de imagen soportado"""
+
+
+def sniff_image(data):
+    """
+    Detecta formato y dimensiones a partir del comienzo del archivo.
+
+    Retorna un ImageInfo, o None si todavía no hay bytes suficientes para
+    decidir. Lanza ImageHeaderError si los datos no son una imagen soportada.
+    """
+    if len(data) < 12:
+        if _could_be_image(data):
+            return None
+        raise ImageHeaderError('Formato de archivo no reconocido')
+
+    if data.startswith(b'\xff\xd8'):
+        return _sniff_jpeg(data)
+    if data.startswith(PNG_SIGNATURE):
+        return _sniff_png(data)
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        width, height = struct.unpack('<HH', data[6:10])
+        return _checked(ImageInfo('GIF', width, height))
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return _sniff_webp(data)
+    raise ImageHeaderError('Formato de archivo no reconocido')
+
+
+def read_image_info(file, limit=HEADER_LIMIT):
+    """
+    Lee el comienzo de un archivo hasta poder detectar la imagen.
+    Deja el puntero al inicio. Lanza ImageHeaderError si no es una imagen
+    soportada o si la cabecera no se resuelve dentro de `limit` bytes.
+    """
+    file.seek(0)
+    data = b''
+    try:
+        while len(data) < limit:
+            chunk = file.read(READ_SIZE)
+            if not chunk:
+                break
+            data += chunk
+            info = sniff_image(data)
+            if info is not None:
+                return info
+    finally:
+        file.seek(0)
+    raise ImageHeaderError('Cabecera de imagen incompleta')
+
+
+def _could_be_image(data):
+    """Indica si un prefijo corto coincide con alguna firma conocida"""
+    signatures = (b'\xff\xd8', PNG_SIGNATURE, b'GIF87a', b'GIF89a', b'RIFF')
+    return any(
+        signature.startswith(data) or data.startswith(signature)
+        for signature in signatures
+    )
+
+
+def _checked(info):
+    """Descarta cabeceras con dimensiones imposibles"""
+    if info.width <= 0 or info.height <= 0:
+        raise ImageHeaderError('Dimensiones de imagen inválidas')
+    return info
+
+
+def _sniff_png(data):
+    # Firma (8) + longitud (4) + 'IHDR' (4) + ancho (4) + alto (4)
+    if len(data) < 24:
+        return None
+    if data[12:16] != b'IHDR':
+        raise ImageHeaderError('PNG sin cabecera IHDR')
+    width, height = struct.unpack('>II', data[16:24])
+    return _checked(ImageInfo('PNG', width, height))
+
+
+def _sniff_webp(data):
+    if len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b'VP8 ':
+        # Cuadro clave lossy: etiqueta (3) + código de inicio (3) + dimensiones
+        if data[23:26] != b'\x9d\x01\x2a':
+            raise ImageHeaderError('WebP lossy sin código de inicio')
+        width, height = struct.unpack('<HH', data[26:30])
+        return _checked(ImageInfo('WEBP', width & 0x3FFF, height & 0x3FFF))
+    if chunk == b'VP8L':
+        if data[20] != 0x2F:
+            raise ImageHeaderError('WebP lossless sin firma')
+        bits = struct.unpack('<I', data[21:25])[0]
+        return _checked(ImageInfo('WEBP', (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1))
+    if chunk == b'VP8X':
+        # Flags (1) + reservado (3) + ancho-1 (24 bits) + alto-1 (24 bits)
+        width = int.from_bytes(data[24:27], 'little') + 1
+        height = int.from_bytes(data[27:30], 'little') + 1
+        return _checked(ImageInfo('WEBP', width, height))
+    raise ImageHeaderError('WebP con bloque desconocido')
+
+
+def _sniff_jpeg(data):
+    """Recorre los segmentos hasta encontrar el marcador SOF"""
+    offset = 2
+    size = len(data)
+    while True:
+        if offset >= size:
+            return None
+        if data[offset] != 0xFF:
+            raise ImageHeaderError('JPEG con segmentos corruptos')
+        # Saltar bytes de relleno 0xFF antes del marcador
+        while offset < size and data[offset] == 0xFF:
+            offset += 1
+        if offset >= size:
+            return None
+        marker = data[offset]
+        offset += 1
+
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            # Fin de imagen o inicio de datos sin haber visto SOF
+            raise ImageHeaderError('JPEG sin dimensiones')
+        if offset + 2 > size:
+            return None
+        length = struct.unpack('>H', data[offset:offset + 2])[0]
+        if length < 2:
+            raise ImageHeaderError('JPEG con segmentos corruptos')
+
+        if marker in JPEG_SOF_MARKERS:
+            # Longitud (2) + precisión (1) + alto (2) + ancho (2)
+            if offset + 7 > size:
+                return None
+            height, width = struct.unpack('>HH', data[offset + 3:offset + 7])
+            return _checked(ImageInfo('JPEG', width, height))
+        offset += length
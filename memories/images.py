@@ -0,0 +1,249 @@
+"""
+Procesamiento de imágenes de recuerdos: recodificación del original,
+generación de derivados (miniatura para la línea de tiempo y versión media
+para el detalle), con variantes en formatos modernos, y un placeholder
+diminuto que la línea de tiempo incluye en el HTML
+"""
+import base64
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import ExifTags, Image, ImageOps
+
+try:
+    import pillow_avif  # noqa: F401  Opcional: registra AVIF en Pillow
+except ImportError:
+    pass
+
+
+# Anchos fijos (en píxeles) de cada derivado, indexados por el campo del modelo
+RENDITIONS = {
+    'thumbnail': 480,   # Tarjetas de la línea de tiempo (h-48, hasta 3 columnas)
+    'medium': 1280,     # Vista de detalle (max-w-4xl)
+}
+
+JPEG_QUALITY = 82
+
+# Placeholder: la imagen a este ancho, en línea como data URI (unos 200-400 bytes)
+PLACEHOLDER_WIDTH = 20
+PLACEHOLDER_QUALITY = 40
+
+# Campos del recuerdo que llena image_summary
+SUMMARY_FIELDS = ('image_width', 'image_height', 'placeholder')
+
+# Orientaciones EXIF que intercambian ancho y alto
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+FORMAT_EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp', 'AVIF': '.avif'}
+
+# Metadatos que se descartan al recodificar (el perfil ICC se conserva: afecta los colores)
+METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop')
+
+
+def derivative_name(name, suffix, ext):
+    """
+    Ruta del derivado junto al original: memories/abc123.png -> memories/abc123_thumbnail.jpg
+    """
+    stem = os.path.splitext(name)[0]
+    return f'{stem}_{suffix}{ext}'
+
+
+def has_transparency(image):
+    """Indica si la imagen necesita canal alfa en el derivado"""
+    if image.mode in ('RGBA', 'LA'):
+        return True
+    return image.mode == 'P' and 'transparency' in image.info
+
+
+def normalization_options():
+    """settings.IMAGE_NORMALIZATION, o None si está desactivada"""
+    options = getattr(settings, 'IMAGE_NORMALIZATION', None) or {}
+    return options if options.get('ENABLED') else None
+
+
+def variant_formats(options):
+    """{formato: calidad} de VARIANTS que este Pillow puede escribir"""
+    if not options:
+        return {}
+    Image.init()
+    return {
+        image_format: quality
+        for image_format, quality in options.get('VARIANTS', {}).items()
+        if image_format in Image.SAVE and image_format in FORMAT_EXTENSIONS
+    }
+
+
+def encode_image(image, image_format, quality):
+    """Codificar sin metadatos; retorna los bytes"""
+    params = {}
+    if image.info.get('icc_profile'):
+        params['icc_profile'] = image.info['icc_profile']
+    if image_format == 'JPEG':
+        image = image.convert('RGB')
+        params.update(quality=quality, optimize=True, progressive=True)
+    else:
+        image = image.convert('RGBA' if has_transparency(image) else 'RGB')
+        if image_format == 'PNG':
+            params['optimize'] = True
+        else:
+            params['quality'] = quality
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **params)
+    return buffer.getvalue()
+
+
+def normalize_image(source, size, options):
+    """
+    Original recodificado según IMAGE_NORMALIZATION: orientación EXIF
+    aplicada, lado mayor hasta MAX_SIDE y sin metadatos.
+    Retorna (bytes, extensión), o None si conviene conservar el archivo
+    (animaciones, transparencia en JPEG o un ahorro menor a MIN_SAVING).
+    """
+    image_format = options['FORMAT']
+    with Image.open(source) as image:
+        if getattr(image, 'n_frames', 1) > 1:
+            return None
+        if image_format == 'JPEG' and has_transparency(image):
+            return None
+        needs_fixing = (
+            image.getexif().get(ExifTags.Base.Orientation, 1) != 1
+            or max(image.size) > options['MAX_SIDE']
+            or any(key in image.info for key in METADATA_KEYS)
+        )
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    image.thumbnail((options['MAX_SIDE'], options['MAX_SIDE']), Image.LANCZOS)
+    content = encode_image(image, image_format, options['QUALITY'])
+    if not needs_fixing and len(content) > size * (1 - options['MIN_SAVING']):
+        return None
+    return content, FORMAT_EXTENSIONS[image_format]
+
+
+def resize_to_width(image, width):
+    """La imagen con un ancho fijo (sin ampliar)"""
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+    return image
+
+
+def render_rendition(image, width):
+    """
+    Redimensiona la imagen a un ancho fijo (sin ampliar) y la codifica.
+    Retorna una tupla (bytes, extensión).
+    """
+    image = resize_to_width(image, width)
+
+    buffer = BytesIO()
+    if has_transparency(image):
+        image.convert('RGBA').save(buffer, format='PNG', optimize=True)
+        ext = '.png'
+    else:
+        image.convert('RGB').save(
+            buffer, format='JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True
+        )
+        ext = '.jpg'
+    return buffer.getvalue(), ext
+
+
+def render_variants(image, width, formats):
+    """El derivado de ese ancho en cada formato moderno: [(bytes, extensión)]"""
+    image = resize_to_width(image, width)
+    return [
+        (encode_image(image, image_format, quality), FORMAT_EXTENSIONS[image_format])
+        for image_format, quality in formats.items()
+    ]
+
+
+def image_summary(image):
+    """
+    Campos del recuerdo que salen de la imagen ya orientada: tamaño
+    intrínseco y placeholder (data URI de unos pocos píxeles, para pintar la
+    tarjeta antes de que llegue la miniatura)
+    """
+    width, height = image.size
+    small = resize_to_width(image, PLACEHOLDER_WIDTH)
+    Image.init()
+    image_format = 'WEBP' if 'WEBP' in Image.SAVE else 'JPEG'
+    # Sin alfa: el placeholder queda detrás de la imagen
+    content = encode_image(small.convert('RGB'), image_format, PLACEHOLDER_QUALITY)
+    encoded = base64.b64encode(content).decode('ascii')
+    return {
+        'image_width': width,
+        'image_height': height,
+        'placeholder': f'data:image/{image_format.lower()};base64,{encoded}',
+    }
+
+
+def describe_image(source):
+    """image_summary de un archivo (ruta o archivo abierto), decodificando lo mínimo"""
+    with Image.open(source) as image:
+        image.seek(0)  # Primer cuadro en GIF animados
+        width, height = image.size
+        if image.getexif().get(ExifTags.Base.Orientation, 1) in ROTATED_ORIENTATIONS:
+            width, height = height, width
+        # JPEG: decodificar directamente a escala reducida
+        image.draft('RGB', (PLACEHOLDER_WIDTH * 8, PLACEHOLDER_WIDTH * 8))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    summary = image_summary(image)
+    summary.update(image_width=width, image_height=height)
+    return summary
+
+
+def existing_derivatives(name, storage):
+    """
+    Derivados ya presentes en el storage para esa imagen.
+    Con nombres por contenido, los mismos bytes producen los mismos derivados.
+    """
+    names = {}
+    for field_name in RENDITIONS:
+        for ext in ('.jpg', '.png'):
+            candidate = derivative_name(name, field_name, ext)
+            if storage.exists(candidate):
+                names[field_name] = candidate
+                break
+    return names
+
+
+def generate_derivatives(image_file, storage, overwrite=False):
+    """
+    Genera todos los derivados de una imagen ya guardada en el storage, y sus
+    variantes en los formatos de IMAGE_NORMALIZATION['VARIANTS'].
+    Reutiliza los existentes salvo que overwrite sea True.
+    Retorna un diccionario {campo: nombre_guardado}.
+    """
+    formats = variant_formats(normalization_options())
+    if not overwrite:
+        names = existing_derivatives(image_file.name, storage)
+        variants = [
+            derivative_name(image_file.name, field_name, FORMAT_EXTENSIONS[image_format])
+            for field_name in RENDITIONS for image_format in formats
+        ]
+        if len(names) == len(RENDITIONS) and all(storage.exists(name) for name in variants):
+            return names
+
+    # Leer desde el storage sin tocar el archivo abierto del FieldFile
+    with storage.open(image_file.name, 'rb') as stored, Image.open(stored) as source:
+        source.seek(0)  # Primer cuadro en GIF animados
+        # Respetar la orientación EXIF de las fotos de teléfono
+        source = ImageOps.exif_transpose(source)
+        source.load()
+
+    names = {}
+    for field_name, width in RENDITIONS.items():
+        content, ext = render_rendition(source, width)
+        name = derivative_name(image_file.name, field_name, ext)
+        if storage.exists(name):
+            storage.delete(name)
+        names[field_name] = storage.save(name, ContentFile(content))
+        # Variantes con el mismo nombre y otra extensión (ver media.negotiate)
+        for content, ext in render_variants(source, width, formats):
+            name = derivative_name(image_file.name, field_name, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(content))
+    return names
@@ -0,0 +1,183 @@
+"""
+Importación masiva de recuerdos desde un archivo de fotos.
+
+Las funciones de este módulo que procesan imágenes corren en procesos
+separados (ver el comando import_memories): no usan el ORM ni el storage de
+Django, solo escriben archivos bajo MEDIA_ROOT con los mismos nombres por
+contenido que usa ContentAddressedStorage.
+"""
+import csv
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from datetime import date, datetime
+
+from PIL import Image, ImageOps
+
+from .imageinfo import HEADER_LIMIT, sniff_image
+from .images import RENDITIONS, derivative_name, image_summary, render_rendition
+from .storage import content_name, write_once
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+DEFAULT_DESCRIPTION = 'Recuerdo importado desde el archivo de fotos.'
+
+# Etiquetas EXIF con la fecha de la foto
+EXIF_IFD = 0x8769
+EXIF_DATE_TIME_ORIGINAL = 36867
+EXIF_DATE_TIME = 306
+
+ImportEntry = namedtuple('ImportEntry', ['key', 'path', 'title', 'description', 'date'])
+
+
+class ImportSourceError(ValueError):
+    """El directorio o manifiesto de importación no se puede leer"""
+
+
+def read_entries(source):
+    """
+    Entradas a importar desde un directorio, un CSV o un JSON.
+    La clave de cada entrada (ruta relativa) identifica lo ya importado.
+    """
+    if os.path.isdir(source):
+        return list(_directory_entries(source))
+    ext = os.path.splitext(source)[1].lower()
+    if ext == '.csv':
+        with open(source, newline='', encoding='utf-8') as manifest:
+            rows = list(csv.DictReader(manifest))
+    elif ext == '.json':
+        with open(source, encoding='utf-8') as manifest:
+            rows = json.load(manifest)
+        if not isinstance(rows, list):
+            raise ImportSourceError('El manifiesto JSON debe ser una lista de objetos')
+    else:
+        raise ImportSourceError(f'Origen no soportado: {source} (directorio, .csv o .json)')
+    base = os.path.dirname(os.path.abspath(source))
+    return [_manifest_entry(base, row, number) for number, row in enumerate(rows, start=1)]
+
+
+def _directory_entries(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+                path = os.path.join(dirpath, filename)
+                yield ImportEntry(os.path.relpath(path, root), path, None, None, None)
+
+
+def _manifest_entry(base, row, number):
+    image = (row.get('image') or row.get('path') or '').strip()
+    if not image:
+        raise ImportSourceError(f'Fila {number}: falta la columna "image"')
+    entry_date = row.get('date') or None
+    if entry_date:
+        try:
+            entry_date = date.fromisoformat(str(entry_date).strip())
+        except ValueError:
+            raise ImportSourceError(f'Fila {number}: fecha inválida "{entry_date}" (use AAAA-MM-DD)')
+    return ImportEntry(
+        image,
+        os.path.join(base, image),
+        (row.get('title') or '').strip() or None,
+        (row.get('description') or '').strip() or None,
+        entry_date,
+    )
+
+
+def title_from_filename(path):
+    """IMG_2023-viaje_playa.jpg -> 'IMG 2023 viaje playa' (sin caracteres prohibidos)"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    title = re.sub(r'[_\-.]+', ' ', stem)
+    title = re.sub(r'[<>"\'&]', '', title).strip()
+    return title[:200]
+
+
+def ingest_image(entry, media_root, limits):
+    """
+    Validar una imagen, guardarla por contenido y generar sus derivados.
+    Corre en un proceso del pool; retorna un diccionario serializable
+    con el resultado o con el error.
+    """
+    result = {'key': entry.key}
+    try:
+        size = os.path.getsize(entry.path)
+        if size > limits['MAX_FILE_SIZE']:
+            raise ValueError(
+                f'La imagen no puede ser mayor a {limits["MAX_FILE_SIZE"] // (1024 * 1024)}MB'
+            )
+        with open(entry.path, 'rb') as source:
+            content = source.read()
+        info = sniff_image(content[:HEADER_LIMIT])
+        if info is None:
+            raise ValueError('Cabecera de imagen incompleta')
+        _check_dimensions(info, limits)
+
+        digest = hashlib.sha256(content).hexdigest()
+        name = content_name(digest, os.path.splitext(entry.path)[1])
+        write_once(media_root, name, content)
+
+        with Image.open(entry.path) as image:
+            taken = _exif_date(image)
+            image.seek(0)
+            image = ImageOps.exif_transpose(image)
+            image.load()
+            derivatives = _write_derivatives(media_root, name, image)
+            summary = image_summary(image)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        result['error'] = str(e) or e.__class__.__name__
+        return result
+
+    result.update({
+        'name': name,
+        'digest': digest,
+        'size': size,
+        'taken': taken.isoformat() if taken else None,
+        'modified': date.fromtimestamp(os.path.getmtime(entry.path)).isoformat(),
+        **derivatives,
+        **summary,
+    })
+    return result
+
+
+def _check_dimensions(info, limits):
+    allowed = {mime.split('/')[1].upper() for mime in limits['ALLOWED_MIME_TYPES']}
+    if info.format not in allowed:
+        raise ValueError(f'Formato de imagen no permitido: {info.format}')
+    min_width, min_height = limits['MIN_DIMENSIONS']
+    max_width, max_height = limits['MAX_DIMENSIONS']
+    if info.width < min_width or info.height < min_height:
+        raise ValueError(f'La imagen debe tener al menos {min_width}x{min_height} píxeles')
+    if info.width > max_width or info.height > max_height:
+        raise ValueError(f'La imagen no puede ser mayor a {max_width}x{max_height} píxeles')
+
+
+def _write_derivatives(media_root, name, image):
+    """Generar los derivados que falten y retornar {campo: nombre}"""
+    names = {}
+    for field_name, width in RENDITIONS.items():
+        existing = [
+            derivative_name(name, field_name, ext) for ext in ('.jpg', '.png')
+            if os.path.exists(os.path.join(media_root, derivative_name(name, field_name, ext)))
+        ]
+        if existing:
+            names[field_name] = existing[0]
+            continue
+        content, ext = render_rendition(image, width)
+        names[field_name] = derivative_name(name, field_name, ext)
+        write_once(media_root, names[field_name], content)
+    return names
+
+
+def _exif_date(image):
+    """Fecha en que se tomó la foto según EXIF, si la tiene"""
+    try:
+        exif = image.getexif()
+        value = exif.get_ifd(EXIF_IFD).get(EXIF_DATE_TIME_ORIGINAL) or exif.get(EXIF_DATE_TIME)
+        if value:
+            return datetime.strptime(str(value).strip('\x00 ')[:19], '%Y:%m:%d %H:%M:%S').date()
+    except (AttributeError, KeyError, ValueError, TypeError):
+        pass
+    return None
@@ -0,0 +1,109 @@
+"""
+Cola local de trabajos de imagen persistida en base de datos.
+
+Las vistas solo guardan el archivo subido y encolan un ImageJob; el trabajo
+pesado (redimensionado, recodificación, eliminación de EXIF y derivados)
+lo ejecuta `python manage.py image_worker` fuera del ciclo de la petición.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_timeline_version
+from .models import ImageJob, Memory
+
+logger = logging.getLogger('memories')
+
+# Reintentos antes de marcar un trabajo como fallido
+MAX_ATTEMPTS = 3
+
+# Trabajos "en ejecución" más antiguos se consideran abandonados por un worker caído
+STALE_AFTER = timedelta(minutes=10)
+
+
+def enqueue_image_processing(memory):
+    """
+    Encolar el procesamiento de la imagen de un recuerdo.
+    Con IMAGE_PROCESSING_EAGER se procesa en el momento (desarrollo y tests).
+    """
+    if getattr(settings, 'IMAGE_PROCESSING_EAGER', False):
+        process_memory_image(memory)
+        return None
+    return ImageJob.objects.create(memory=memory)
+
+
+def process_memory_image(memory):
+    """Ejecutar todo el procesamiento pesado de la imagen de un recuerdo"""
+    Memory.objects.filter(pk=memory.pk).update(
+        processing_status=Memory.STATUS_PROCESSING, updated_at=timezone.now()
+    )
+    memory.normalize_image()
+    memory.generate_derivatives()
+
+
+def claim_next_job():
+    """
+    Reclamar el siguiente trabajo pendiente de forma atómica.
+    El UPDATE condicionado al estado evita que dos workers tomen el mismo trabajo
+    (funciona igual en SQLite y PostgreSQL).
+    """
+    candidates = ImageJob.objects.filter(
+        status=ImageJob.STATUS_PENDING
+    ).order_by('created_at').values_list('pk', flat=True)[:10]
+
+    for job_id in candidates:
+        claimed = ImageJob.objects.filter(
+            pk=job_id, status=ImageJob.STATUS_PENDING
+        ).update(status=ImageJob.STATUS_RUNNING, started_at=timezone.now())
+        if claimed:
+            return ImageJob.objects.select_related('memory').get(pk=job_id)
+    return None
+
+
+def run_job(job):
+    """Ejecutar un trabajo reclamado y registrar el resultado"""
+    attempts = job.attempts + 1
+    try:
+        with transaction.atomic():
+            process_memory_image(job.memory)
+    except Exception as e:
+        logger.exception('Error procesando imagen del recuerdo %s', job.memory_id)
+        if attempts >= MAX_ATTEMPTS:
+            job_status, memory_status, finished_at = ImageJob.STATUS_FAILED, Memory.STATUS_FAILED, timezone.now()
+        else:
+            job_status, memory_status, finished_at = ImageJob.STATUS_PENDING, Memory.STATUS_PENDING, None
+        Memory.objects.filter(pk=job.memory_id).update(
+            processing_status=memory_status, updated_at=timezone.now()
+        )
+        bump_timeline_version(job.memory.user_id)
+        # update() en lugar de save(): el recuerdo (y su trabajo) pudo borrarse mientras tanto
+        ImageJob.objects.filter(pk=job.pk).update(
+            attempts=attempts, error=str(e), status=job_status, finished_at=finished_at
+        )
+        return False
+
+    ImageJob.objects.filter(pk=job.pk).update(
+        attempts=attempts, error='', status=ImageJob.STATUS_DONE, finished_at=timezone.now()
+    )
+    return True
+
+
+def requeue_stale_jobs():
+    """Devolver a la cola los trabajos que quedaron en ejecución por un worker caído"""
+    return ImageJob.objects.filter(
+        status=ImageJob.STATUS_RUNNING,
+        started_at__lt=timezone.now() - STALE_AFTER
+    ).update(status=ImageJob.STATUS_PENDING)
+
+
+def enqueue_missing_derivatives():
+    """Encolar los recuerdos existentes que aún no tienen derivados"""
+    memories = Memory.objects.filter(thumbnail='').exclude(
+        image_jobs__status__in=[ImageJob.STATUS_PENDING, ImageJob.STATUS_RUNNING]
+    )
+    jobs = [ImageJob(memory_id=memory_id) for memory_id in memories.values_list('pk', flat=True)]
+    ImageJob.objects.bulk_create(jobs)
+    return len(jobs)
@@ -0,0 +1,59 @@
+"""
+Comando para calcular el placeholder y el tamaño de las imágenes subidas
+antes de que existieran esos campos (ver images.image_summary)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from memories.cache import bump_timeline_version
+from memories.images import describe_image
+from memories.models import Memory
+
+
+class Command(BaseCommand):
+    help = 'Calcula el placeholder y el tamaño intrínseco de los recuerdos que no lo tienen'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostrar cuántos recuerdos se actualizarían sin ejecutar cambios',
+        )
+
+    def handle(self, *args, **options):
+        pending = Memory.objects.filter(placeholder='').exclude(image='')
+        self.stdout.write(self.style.SUCCESS('🌫️  Calculando placeholders...'))
+        self.stdout.write(f'   - Recuerdos sin placeholder: {pending.count()}')
+        if options['dry_run']:
+            return
+
+        started = time.perf_counter()
+        storage = Memory._meta.get_field('image').storage
+        updated = failed = 0
+        users = set()
+        # Una vez por archivo: los recuerdos con la misma imagen lo comparten
+        names = pending.order_by().values_list('image', flat=True).distinct()
+        for name in names.iterator():
+            try:
+                with storage.open(name, 'rb') as stored:
+                    summary = describe_image(stored)
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f'   ⚠️  No se pudo leer {name}: {e}'))
+                continue
+            memories = pending.filter(image=name)
+            users.update(memories.values_list('user_id', flat=True))
+            updated += memories.update(**summary)
+
+        # update() no dispara señales: invalidar los fragmentos cacheados
+        for user_id in users:
+            bump_timeline_version(user_id)
+
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {updated} recuerdos actualizados en {elapsed:.1f}s'
+        ))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠️  {failed} imágenes con errores'))
@@ -0,0 +1,231 @@
+"""
+Comando para medir cuántas conexiones lentas aguanta el servidor antes de
+dejar de responder, con workers sync (WSGI) y con uvicorn (ASGI)
+"""
+import asyncio
+import importlib.util
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+PROBE_PATH = '/health/live/'
+SLOW_PATH = '/login/'
+SLOW_BODY_BYTES = 100_000  # Content-Length anunciado por cada subida lenta
+
+
+class Command(BaseCommand):
+    help = (
+        'Mantiene N subidas lentas abiertas y mide si /health/live/ sigue respondiendo; '
+        'con --compare levanta gunicorn en modo sync y en modo asgi'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            default='http://127.0.0.1:8000',
+            help='Servidor ya levantado a medir (default: http://127.0.0.1:8000)',
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Levantar gunicorn.conf.py con SERVER_MODE=wsgi y asgi y comparar',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Workers de gunicorn con --compare (default: 2)',
+        )
+        parser.add_argument(
+            '--slow-clients',
+            type=int,
+            default=50,
+            help='Conexiones que envían el cuerpo de un POST byte a byte (default: 50)',
+        )
+        parser.add_argument(
+            '--probes',
+            type=int,
+            default=10,
+            help='Clientes que consultan /health/live/ en bucle (default: 10)',
+        )
+        parser.add_argument(
+            '--seconds',
+            type=float,
+            default=10.0,
+            help='Duración de cada prueba (default: 10)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=2.0,
+            help='Segundos tras los que un sondeo cuenta como fallido (default: 2)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(
+            f"🐢 {options['slow_clients']} subidas lentas y {options['probes']} sondeos "
+            f"durante {options['seconds']:.0f}s..."
+        ))
+        if not options['compare']:
+            results = asyncio.run(run_load(options['url'], options))
+            self.report(options['url'], results, options['seconds'])
+        else:
+            for package in ('gunicorn', 'uvicorn'):
+                if importlib.util.find_spec(package) is None:
+                    raise CommandError(f'{package} no está instalado (ver requirements.txt)')
+            for mode in ('wsgi', 'asgi'):
+                url = self.start_server(mode, options['workers'])
+                try:
+                    results = asyncio.run(run_load(url, options))
+                finally:
+                    self.stop_server()
+                self.report(f'gunicorn {mode} ({options["workers"]} workers)', results, options['seconds'])
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark completado'))
+
+    def start_server(self, mode, workers):
+        """Levantar gunicorn con la configuración del proyecto en un puerto libre"""
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        env = dict(
+            os.environ,
+            SERVER_MODE=mode,
+            GUNICORN_BIND=f'127.0.0.1:{port}',
+            GUNICORN_WORKERS=str(workers),
+        )
+        self.server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--log-level', 'warning'],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        url = f'http://127.0.0.1:{port}'
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.server.poll() is not None:
+                raise CommandError(
+                    f'gunicorn ({mode}) terminó al arrancar:\n{self.server.stderr.read().decode()[-2000:]}'
+                )
+            status, _ = asyncio.run(request(url, PROBE_PATH, timeout=1.0))
+            if status == 200:
+                return url
+            time.sleep(0.2)
+        self.stop_server()
+        raise CommandError(f'gunicorn ({mode}) no respondió en 30s')
+
+    def stop_server(self):
+        self.server.terminate()
+        try:
+            self.server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.server.kill()
+            self.server.wait()
+
+    def report(self, label, results, seconds):
+        """Sondeos respondidos, latencia y subidas que el servidor llegó a leer"""
+        latencies = sorted(results['latencies'])
+        total = len(latencies) + results['failures']
+        self.stdout.write(f'\n📊 {label}')
+        self.stdout.write(
+            f"   - Subidas lentas abiertas: {results['connected']}/{results['slow_clients']} "
+            f"({results['rejected']} rechazadas o cortadas)"
+        )
+        if not latencies:
+            self.stdout.write(f"   - Sondeos: 0/{total} respondidos")
+            return
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f"   - Sondeos: {len(latencies)}/{total} respondidos ({len(latencies) / total:.0%}) | "
+            f"{len(latencies) / seconds:.0f}/s | p50: {statistics.median(latencies):.1f} ms | "
+            f"p99: {p99:.1f} ms | máx: {latencies[-1]:.1f} ms"
+        )
+
+
+async def run_load(url, options):
+    """Subidas lentas y sondeos en paralelo hasta el plazo"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + options['seconds']
+    slow = asyncio.gather(*(slow_upload(url, deadline) for _ in range(options['slow_clients'])))
+    probes = asyncio.gather(*(probe_loop(url, deadline, options['timeout']) for _ in range(options['probes'])))
+    slow_results, probe_results = await asyncio.gather(slow, probes)
+
+    latencies = [latency for result in probe_results for latency in result[0]]
+    return {
+        'slow_clients': options['slow_clients'],
+        'connected': sum(slow_results),
+        'rejected': len(slow_results) - sum(slow_results),
+        'latencies': latencies,
+        'failures': sum(result[1] for result in probe_results),
+    }
+
+
+async def slow_upload(url, deadline):
+    """
+    POST cuyo cuerpo llega a 1 byte cada 0.5s, como un móvil con mala señal.
+    Retorna True si la conexión siguió abierta hasta el plazo.
+    """
+    parts = urlsplit(url)
+    try:
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    except OSError:
+        return False
+    try:
+        writer.write((
+            f'POST {SLOW_PATH} HTTP/1.1\r\nHost: {parts.hostname}\r\n'
+            f'Content-Type: application/x-www-form-urlencoded\r\n'
+            f'Content-Length: {SLOW_BODY_BYTES}\r\n\r\n'
+        ).encode())
+        loop = asyncio.get_running_loop()
+        while loop.time() < deadline:
+            writer.write(b'a')
+            await writer.drain()
+            await asyncio.sleep(0.5)
+        return True
+    except OSError:
+        return False
+    finally:
+        writer.close()
+
+
+async def probe_loop(url, deadline, timeout):
+    """GET repetidos a /health/live/; retorna (latencias en ms, fallos)"""
+    loop = asyncio.get_running_loop()
+    latencies, failures = [], 0
+    while loop.time() < deadline:
+        status, latency = await request(url, PROBE_PATH, timeout)
+        if status == 200:
+            latencies.append(latency)
+        else:
+            failures += 1
+    return latencies, failures
+
+
+async def request(url, path, timeout):
+    """GET mínimo sobre un socket; retorna (estado o None, latencia en ms)"""
+    started = time.perf_counter()
+    try:
+        status = await asyncio.wait_for(_get_status(url, path), timeout)
+    except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+        status = None
+    return status, (time.perf_counter() - started) * 1000
+
+
+async def _get_status(url, path):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {parts.hostname}\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
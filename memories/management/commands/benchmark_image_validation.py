@@ -0,0 +1,80 @@
+"""
+Comando para medir el costo de validar una imagen subida
+"""
+import io
+import time
+
+from django.core.files.images import get_image_dimensions
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from memories.imageinfo import read_image_info
+from memories.validators import ImageValidator
+
+
+# Formatos de prueba: (formato Pillow, modo, opciones de guardado)
+SAMPLES = [
+    ('JPEG', 'RGB', {'quality': 90}),
+    ('JPEG', 'RGB', {'quality': 90, 'progressive': True}),
+    ('PNG', 'RGBA', {}),
+    ('GIF', 'P', {}),
+    ('WEBP', 'RGB', {'quality': 80}),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compara la lectura de dimensiones con Pillow contra el lector de cabeceras'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=500,
+            help='Validaciones por formato (default: 500)',
+        )
+        parser.add_argument(
+            '--size',
+            default='3000x2000',
+            help='Dimensiones de las imágenes de prueba (default: 3000x2000)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        width, height = (int(value) for value in options['size'].lower().split('x'))
+
+        self.stdout.write(
+            self.style.SUCCESS(f'⏱️  Validando imágenes de {width}x{height} ({iterations} veces)...')
+        )
+
+        validator = ImageValidator(max_dimensions=(max(width, 4000), max(height, 4000)))
+        for image_format, mode, save_options in SAMPLES:
+            content = self.build_sample(image_format, mode, (width, height), save_options)
+            upload = SimpleUploadedFile(f'prueba.{image_format.lower()}', content)
+
+            before = self.measure(lambda: get_image_dimensions(upload), iterations)
+            after = self.measure(lambda: read_image_info(upload), iterations)
+            full = self.measure(lambda: validator(upload), iterations)
+
+            label = image_format + (' progresivo' if save_options.get('progressive') else '')
+            self.stdout.write(
+                f'   - {label:<16} {len(content) / 1024:8.1f} KB | '
+                f'Pillow: {before:8.1f} µs | cabecera: {after:6.1f} µs | '
+                f'validador: {full:6.1f} µs | {before / after:6.1f}x'
+            )
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark completado'))
+
+    def build_sample(self, image_format, mode, size, save_options):
+        """Codificar una imagen de prueba con algo de detalle (no un color plano)"""
+        image = Image.linear_gradient('L').resize(size).convert(mode)
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, **save_options)
+        return buffer.getvalue()
+
+    def measure(self, function, iterations):
+        """Microsegundos promedio por llamada"""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        return (time.perf_counter() - start) / iterations * 1_000_000
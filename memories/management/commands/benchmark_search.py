@@ -0,0 +1,175 @@
+"""
+Comando para medir la búsqueda de texto completo (FTS5) con muchos recuerdos
+"""
+import itertools
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from memories.search import (
+    SEARCH_LIMIT,
+    SQLITE_FTS_SCHEMA,
+    SQLITE_SEARCH_SQL,
+    fts_query,
+    parse_terms,
+)
+
+
+# Palabras que se buscan. En los datos de prueba se ubican en el rango de
+# frecuencia de las palabras de contenido: más comunes que casi todas, pero
+# detrás de artículos y preposiciones, que nadie busca
+WORDS = (
+    'viaje playa montaña cena aniversario cumpleaños navidad boda paseo parque '
+    'concierto película museo lluvia atardecer amanecer café desayuno familia '
+    'amigos perro gato jardín ciudad pueblo río lago bosque nieve verano invierno '
+    'otoño primavera fiesta regalo sorpresa carta canción baile risa abrazo beso '
+    'foto recuerdo domingo sábado vacaciones avión tren carretera estrellas luna '
+    'mar arena helado pizza tacos mercado feria libro biblioteca universidad'
+).split()
+SEARCHED_RANK = 100
+
+# Resto del vocabulario: palabras inventadas con frecuencias tipo Zipf
+VOCABULARY_SIZE = 20000
+SYLLABLES = (
+    'ba be bi bo bu ca ce ci co cu da de di do du fa fe fi fo fu ga ge gi go gu '
+    'la le li lo lu ma me mi mo mu na ne ni no nu pa pe pi po pu ra re ri ro ru '
+    'sa se si so su ta te ti to tu'
+).split()
+
+SCHEMA = """CREATE TABLE memories_memory (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    date TEXT NOT NULL
+)"""
+
+
+class Command(BaseCommand):
+    help = 'Mide la búsqueda FTS5 sobre una base SQLite temporal con N recuerdos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1_000_000,
+            help='Recuerdos de prueba (default: 1000000)',
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1000,
+            help='Usuarios entre los que se reparten los recuerdos (default: 1000)',
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=500,
+            help='Búsquedas a medir (default: 500)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Semilla de los datos de prueba (default: 42)',
+        )
+
+    def handle(self, *args, **options):
+        generator = random.Random(options['seed'])
+        with tempfile.TemporaryDirectory() as directory:
+            database = sqlite3.connect(os.path.join(directory, 'benchmark.sqlite3'))
+            try:
+                self.build(database, generator, options['rows'], options['users'])
+                self.measure(database, generator, options['users'], options['queries'])
+            finally:
+                database.close()
+
+    def build(self, database, generator, rows, users):
+        """Crear la tabla con el mismo esquema FTS5 y los mismos triggers"""
+        self.stdout.write(self.style.SUCCESS(f'🔎 Generando {rows} recuerdos de {users} usuarios...'))
+        started = time.perf_counter()
+        database.execute(SCHEMA)
+        for statement in SQLITE_FTS_SCHEMA:
+            database.execute(statement)
+
+        vocabulary = self.vocabulary(generator)
+        # Pesos acumulados una sola vez: choices(weights=...) los recalcula en cada llamada
+        cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+        with database:
+            database.executemany(
+                'INSERT INTO memories_memory (user_id, title, description, date) VALUES (?, ?, ?, ?)',
+                (
+                    (
+                        generator.randrange(1, users + 1),
+                        ' '.join(generator.choices(vocabulary, cum_weights=cum_weights, k=3)).capitalize(),
+                        ' '.join(generator.choices(vocabulary, cum_weights=cum_weights, k=20)),
+                        f'20{generator.randrange(10, 25)}-01-01',
+                    )
+                    for _ in range(rows)
+                ),
+            )
+        database.execute("INSERT INTO memories_memory_fts(memories_memory_fts) VALUES ('optimize')")
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'   - Indexado en {elapsed:.1f}s ({rows / elapsed:.0f} recuerdos/s)')
+
+    def vocabulary(self, generator):
+        """Palabras ordenadas de la más a la menos frecuente"""
+        searched = set(WORDS)
+        invented = []
+        seen = set(searched)
+        while len(invented) < VOCABULARY_SIZE - len(WORDS):
+            word = ''.join(generator.choices(SYLLABLES, k=generator.randrange(2, 5)))
+            if word not in seen:
+                seen.add(word)
+                invented.append(word)
+        return invented[:SEARCHED_RANK] + list(WORDS) + invented[SEARCHED_RANK:]
+
+    def measure(self, database, generator, users, queries):
+        """
+        Búsquedas de una y dos palabras, completas y por prefijo, con los
+        mismos pasos que search_memories: ids ordenados por bm25() y resultados
+        """
+        search_sql = SQLITE_SEARCH_SQL.replace('%s', '?')
+        timings = []
+        matches = 0
+        for _ in range(queries):
+            words = generator.sample(WORDS, generator.choice((1, 2)))
+            if generator.random() < 0.5:
+                words[-1] = words[-1][:generator.randrange(2, 7)]  # Mientras se escribe
+            user_id = generator.randrange(1, users + 1)
+
+            started = time.perf_counter()
+            terms = parse_terms(' '.join(words))
+            ids = [
+                row[0] for row in
+                database.execute(search_sql, (fts_query(terms, user_id), SEARCH_LIMIT, 0))
+            ]
+            self.select(database, '*', user_id, ids)
+            timings.append((time.perf_counter() - started) * 1000)
+            matches += len(ids)
+
+        timings.sort()
+        percentile = lambda p: timings[min(len(timings) - 1, int(len(timings) * p))]  # noqa: E731
+        self.stdout.write(
+            f'   - {queries} búsquedas, {matches / queries:.1f} resultados promedio'
+        )
+        self.stdout.write(
+            f'   - p50: {statistics.median(timings):.2f} ms | p95: {percentile(0.95):.2f} ms | '
+            f'p99: {percentile(0.99):.2f} ms | máx: {timings[-1]:.2f} ms'
+        )
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark completado'))
+
+    def select(self, database, columns, user_id, ids):
+        """Filas del usuario por id, como el filtro pk__in del ORM"""
+        if not ids:
+            return []
+        placeholders = ', '.join('?' * len(ids))
+        return database.execute(
+            f'SELECT {columns} FROM memories_memory WHERE user_id = ? AND id IN ({placeholders})',
+            (user_id, *ids),
+        ).fetchall()
@@ -0,0 +1,198 @@
+"""
+Comando para medir SQLite con lectores y escritores concurrentes,
+con los valores por defecto y con el perfil de settings.SQLITE_PRAGMAS
+"""
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from memories.sqlite import pragma_statements
+
+
+SCHEMA = [
+    """CREATE TABLE memories_memory (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL,
+        date TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )""",
+    'CREATE INDEX memories_user_timeline_idx ON memories_memory (user_id, date DESC, created_at DESC, id DESC)',
+    """CREATE TABLE memories_usermemorystats (
+        user_id INTEGER PRIMARY KEY,
+        memory_count INTEGER NOT NULL
+    )""",
+]
+
+# Lo que hace una visita a la línea de tiempo y la creación de un recuerdo
+READ_SQL = (
+    'SELECT id, title, description, date FROM memories_memory WHERE user_id = ? '
+    'ORDER BY date DESC, created_at DESC, id DESC LIMIT 12'
+)
+WRITE_SQL = [
+    'INSERT INTO memories_memory (user_id, title, description, date, created_at) VALUES (?, ?, ?, ?, ?)',
+    'UPDATE memories_usermemorystats SET memory_count = memory_count + 1 WHERE user_id = ?',
+]
+
+# Perfil de Django sin ajustes: journal DELETE, synchronous FULL y la espera
+# de 5 segundos del módulo sqlite3
+DEFAULT_PROFILE = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+DEFAULT_TIMEOUT = 5.0
+
+
+class Command(BaseCommand):
+    help = 'Compara SQLite por defecto contra SQLITE_PRAGMAS con lecturas y escrituras concurrentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=8,
+            help='Procesos que leen la línea de tiempo (default: 8)',
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=4,
+            help='Procesos que crean recuerdos (default: 4)',
+        )
+        parser.add_argument(
+            '--seconds',
+            type=float,
+            default=10.0,
+            help='Duración de cada prueba (default: 10)',
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=100_000,
+            help='Recuerdos iniciales (default: 100000)',
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=500,
+            help='Usuarios entre los que se reparten los recuerdos (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        profiles = [
+            ('Por defecto', DEFAULT_PROFILE),
+            ('SQLITE_PRAGMAS', getattr(settings, 'SQLITE_PRAGMAS', {}) or {}),
+        ]
+        self.stdout.write(self.style.SUCCESS(
+            f"🗄️  {options['readers']} lectores y {options['writers']} escritores durante "
+            f"{options['seconds']:.0f}s sobre {options['rows']} recuerdos..."
+        ))
+        for label, pragmas in profiles:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                self.build(path, options['rows'], options['users'])
+                results = self.run_load(path, pragmas, options)
+            self.report(label, pragmas, results, options['seconds'])
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark completado'))
+
+    def build(self, path, rows, users):
+        """Base de prueba con recuerdos repartidos entre usuarios"""
+        generator = random.Random(42)
+        database = sqlite3.connect(path)
+        try:
+            with database:
+                for statement in SCHEMA:
+                    database.execute(statement)
+                database.executemany(
+                    'INSERT INTO memories_usermemorystats (user_id, memory_count) VALUES (?, 0)',
+                    ((user_id,) for user_id in range(1, users + 1)),
+                )
+                database.executemany(
+                    WRITE_SQL[0],
+                    (
+                        (
+                            generator.randrange(1, users + 1),
+                            'Recuerdo de prueba',
+                            'Descripción del recuerdo de prueba ' * 4,
+                            f'20{generator.randrange(10, 25)}-0{generator.randrange(1, 10)}-15',
+                            generator.random(),
+                        )
+                        for _ in range(rows)
+                    ),
+                )
+        finally:
+            database.close()
+
+    def run_load(self, path, pragmas, options):
+        """Lanzar lectores y escritores en procesos separados, como workers de gunicorn"""
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        deadline = time.time() + 1 + options['seconds']  # 1s para que todos arranquen
+        processes = [
+            context.Process(target=_worker, args=(path, pragmas, role, options['users'], deadline, results, seed))
+            for seed, role in enumerate(['read'] * options['readers'] + ['write'] * options['writers'])
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        return collected
+
+    def report(self, label, pragmas, results, seconds):
+        """Operaciones por segundo, latencias y errores de lock por rol"""
+        self.stdout.write(f'\n📊 {label}: {", ".join(pragma_statements(pragmas)) or "sin PRAGMA"}')
+        for role, name in (('read', 'Lecturas'), ('write', 'Escrituras')):
+            latencies = sorted(latency for result in results if result['role'] == role for latency in result['latencies'])
+            errors = sum(result['errors'] for result in results if result['role'] == role)
+            if not latencies:
+                self.stdout.write(f'   - {name}: 0 ops, {errors} errores "database is locked"')
+                continue
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            self.stdout.write(
+                f'   - {name}: {len(latencies) / seconds:8.0f} ops/s | '
+                f'p50: {statistics.median(latencies):7.2f} ms | p99: {p99:8.2f} ms | '
+                f'máx: {latencies[-1]:8.2f} ms | {errors} errores "database is locked"'
+            )
+
+
+def _worker(path, pragmas, role, users, deadline, results, seed):
+    """Proceso de carga: repite lecturas o escrituras hasta el plazo"""
+    generator = random.Random(seed)
+    timeout = pragmas.get('busy_timeout', DEFAULT_TIMEOUT * 1000) / 1000
+    database = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+    for statement in pragma_statements(pragmas):
+        database.execute(statement)
+
+    latencies = []
+    errors = 0
+    while time.time() < deadline - 1:
+        time.sleep(0.001)  # Esperar a que arranquen todos los procesos
+    while time.time() < deadline:
+        user_id = generator.randrange(1, users + 1)
+        started = time.perf_counter()
+        try:
+            if role == 'read':
+                database.execute(READ_SQL, (user_id,)).fetchall()
+            else:
+                # BEGIN IMMEDIATE: sin él, dos transacciones que leen y luego
+                # escriben se bloquean mutuamente sin pasar por busy_timeout
+                database.execute('BEGIN IMMEDIATE')
+                database.execute(WRITE_SQL[0], (user_id, 'Nuevo', 'Descripción', '2024-01-01', time.time()))
+                database.execute(WRITE_SQL[1], (user_id,))
+                database.execute('COMMIT')
+        except sqlite3.OperationalError:
+            errors += 1
+            if database.in_transaction:
+                database.execute('ROLLBACK')
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    database.close()
+    results.put({'role': role, 'latencies': latencies, 'errors': errors})
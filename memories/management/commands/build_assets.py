@@ -0,0 +1,133 @@
+"""
+Comando para generar static/css/app.css con el CLI de Tailwind y las fuentes
+propias (ver memories/assets.py)
+"""
+import gzip
+import os
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from memories import assets
+
+
+class Command(BaseCommand):
+    help = 'Genera el CSS del sitio con las utilidades usadas en plantillas y JS, y recorta las fuentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='No escribir; fallar si static/css/app.css no está al día',
+        )
+        parser.add_argument(
+            '--fonts',
+            action='store_true',
+            help='Regenerar static/fonts desde los paquetes fontpkg-* (ver requirements.txt)',
+        )
+        parser.add_argument(
+            '--font-dir',
+            help='Con --fonts, carpeta con las fuentes originales (.ttf) en lugar de los paquetes',
+        )
+        parser.add_argument(
+            '--report',
+            action='store_true',
+            help='Peticiones, peticiones bloqueantes y bytes de cada página',
+        )
+        parser.add_argument(
+            '--against',
+            metavar='REVISION',
+            help='Con --report, comparar con las plantillas de una revisión de git (p. ej. HEAD)',
+        )
+        parser.add_argument(
+            '--fetch',
+            action='store_true',
+            help='Con --report, descargar los recursos externos para medirlos',
+        )
+
+    def handle(self, *args, **options):
+        if options['fonts'] and not options['check']:
+            self.build_fonts(options['font_dir'])
+        built = assets.built_fonts()
+        missing = [font['family'] for font in assets.FONTS if font not in built]
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  Sin fuente propia para {", ".join(missing)} (build_assets --fonts): '
+                'se usará la del sistema'
+            ))
+
+        try:
+            css = assets.build_bundle()
+        except FileNotFoundError:
+            if options['check']:
+                raise CommandError(f'No se encontró el CLI de Tailwind ({assets.TAILWIND_CLI}): pip install tailwindcss-bin')
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  El CLI de Tailwind no está instalado; se usa el {assets.BUNDLE} ya generado '
+                '(ver requirements.txt)'
+            ))
+            css = None
+        except subprocess.CalledProcessError as e:
+            raise CommandError(f'Tailwind falló: {e.stderr.strip()}')
+
+        path = os.path.join(assets.static_dir(), assets.BUNDLE)
+        if options['check']:
+            try:
+                with open(path, encoding='utf-8') as handle:
+                    current = handle.read()
+            except OSError:
+                current = None
+            if current != css:
+                raise CommandError(f'{assets.BUNDLE} no está al día: ejecuta python manage.py build_assets')
+            self.stdout.write(self.style.SUCCESS(f'✅ {assets.BUNDLE} al día'))
+        elif css is not None:
+            assets.write_bundle(css)
+            encoded = css.encode()
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {assets.BUNDLE}: {len(encoded) / 1024:.1f} KB '
+                f'({len(gzip.compress(encoded, 9)) / 1024:.1f} KB gzip)'
+            ))
+
+        if options['report']:
+            self.report(options['against'], options['fetch'])
+
+    def build_fonts(self, source_dir):
+        """Recortar las fuentes que tengan su original y fontTools"""
+        try:
+            generated = assets.subset_fonts(source_dir)
+        except ImportError:
+            self.stdout.write(self.style.WARNING(
+                '⚠️  fontTools no está instalado; se usan las fuentes ya generadas (ver requirements.txt)'
+            ))
+            return
+        outputs = {output for _, output in generated}
+        for font in assets.FONTS:
+            if os.path.join(assets.static_dir(), font['output']) not in outputs:
+                self.stdout.write(self.style.WARNING(
+                    f'⚠️  Sin fuente original para {font["family"]} ({font["source"]}); se deja la ya generada'
+                ))
+        for source, output in generated:
+            self.stdout.write(
+                f'🔤 {os.path.basename(source)} -> {os.path.relpath(output, settings.BASE_DIR)} '
+                f'({os.path.getsize(source) / 1024:.0f} KB -> {os.path.getsize(output) / 1024:.0f} KB)'
+            )
+
+    def report(self, revision, fetch):
+        """Lo que descarga cada página antes de mostrarse"""
+        columns = [('Antes', revision), ('Ahora', None)] if revision else [('Ahora', None)]
+        for template in assets.page_templates():
+            self.stdout.write(f'\n📄 {template}')
+            for label, source in columns:
+                resources = assets.page_resources(template, source, fetch)
+                blocking = sum(resource['blocking'] for resource in resources)
+                measured = [resource for resource in resources if resource['bytes'] is not None]
+                raw = sum(resource['bytes'] for resource in measured) / 1024
+                compressed = sum(resource['gzip'] for resource in measured) / 1024
+                unmeasured = len(resources) - len(measured)
+                hosts = assets.external_hosts(resources)
+                self.stdout.write(
+                    f'   - {label}: {len(resources)} peticiones ({blocking} bloqueantes) | '
+                    f'{raw:.1f} KB ({compressed:.1f} KB gzip)'
+                    + (f' + {unmeasured} sin medir' if unmeasured else '')
+                    + (f' | externos: {", ".join(hosts)}' if hosts else '')
+                )
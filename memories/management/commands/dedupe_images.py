@@ -0,0 +1,117 @@
+"""
+Comando para pasar las imágenes existentes al storage por contenido
+"""
+
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from memories.blobs import acquire_blob, recount_blobs
+from memories.images import RENDITIONS, derivative_name, existing_derivatives
+from memories.models import Memory
+
+
+class Command(BaseCommand):
+    help = 'Renombra las imágenes por su hash, comparte los duplicados y registra sus referencias'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostrar cuántos recuerdos se migrarían sin ejecutar cambios',
+        )
+        parser.add_argument(
+            '--recount',
+            action='store_true',
+            help='Recalcular además el contador de referencias de todos los archivos',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS('🧬 Migrando imágenes al storage por contenido...')
+        )
+
+        legacy = Memory.objects.filter(blob__isnull=True).exclude(image='')
+        if options['dry_run']:
+            self.stdout.write(f'   🔍 Se migrarían {legacy.count()} recuerdos')
+            return
+
+        migrated = shared = freed = pending = 0
+        for memory in legacy.only('pk', 'image', 'thumbnail', 'medium').iterator():
+            try:
+                reused, released, regenerate = self.migrate_memory(memory)
+            except OSError as e:
+                self.stdout.write(
+                    self.style.WARNING(f'   ⚠️  No se pudo migrar {memory.image.name}: {e}')
+                )
+                continue
+            migrated += 1
+            shared += reused
+            freed += released
+            pending += regenerate
+
+        if pending:
+            self.stdout.write(
+                f'   - {pending} recuerdos sin derivados: '
+                'python manage.py image_worker --enqueue-missing'
+            )
+
+        if options['recount']:
+            updated = recount_blobs()
+            self.stdout.write(f'   - Contadores recalculados: {updated}')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {migrated} recuerdos migrados, {shared} con imagen duplicada '
+                f'({freed / (1024*1024):.2f} MB liberados)'
+            )
+        )
+
+    def migrate_memory(self, memory):
+        """
+        Guardar la imagen con su nombre por contenido y apuntar el recuerdo a ella.
+        Retorna (1 si el archivo ya existía, bytes liberados, 1 si faltan derivados).
+        """
+        storage = memory.image.storage
+        derivative_storage = memory.thumbnail.storage
+        old_name = memory.image.name
+
+        with storage.open(old_name, 'rb') as source:
+            name = storage.save(old_name, File(source))
+        size = storage.size(name)
+        # Otro recuerdo ya migrado tenía los mismos bytes
+        reused = int(Memory.objects.filter(image=name).exclude(pk=memory.pk).exists())
+
+        # Mover los derivados existentes a los nombres del blob (o descartarlos)
+        derivatives = existing_derivatives(name, derivative_storage)
+        freed = 0
+        for field_name in RENDITIONS:
+            field_file = getattr(memory, field_name)
+            if not field_file or not derivative_storage.exists(field_file.name):
+                continue
+            if field_name in derivatives:
+                freed += derivative_storage.size(field_file.name)
+                derivative_storage.delete(field_file.name)
+                continue
+            ext = '.' + field_file.name.rsplit('.', 1)[-1]
+            target = derivative_name(name, field_name, ext)
+            file_move_safe(derivative_storage.path(field_file.name), derivative_storage.path(target))
+            derivatives[field_name] = target
+
+        with transaction.atomic():
+            blob = acquire_blob(name, size)
+            changes = {'image': name, 'blob': blob}
+            complete = len(derivatives) == len(RENDITIONS)
+            if complete:
+                changes.update(derivatives)
+            else:
+                changes.update({field_name: '' for field_name in RENDITIONS})
+                changes['processing_status'] = Memory.STATUS_PENDING
+            Memory.objects.filter(pk=memory.pk).update(**changes)
+
+        if name != old_name:
+            freed += storage.size(old_name)
+            storage.delete(old_name)
+        return reused, freed, int(not complete)
+
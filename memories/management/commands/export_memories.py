@@ -0,0 +1,56 @@
+"""
+Comando para exportar los recuerdos de un usuario a un archivo ZIP
+"""
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from memories.export import stream_export
+
+
+class Command(BaseCommand):
+    help = 'Exporta los recuerdos de un usuario (imágenes y manifiesto JSON/CSV) a un ZIP'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Nombre del usuario a exportar',
+        )
+        parser.add_argument(
+            '--output',
+            help='Archivo ZIP de destino (default: recuerdos-<usuario>.zip)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'No existe el usuario "{options["user"]}"')
+
+        output = os.path.abspath(options['output'] or f'recuerdos-{user.username}.zip')
+        self.stdout.write(self.style.SUCCESS(f'📦 Exportando recuerdos de {user.username}...'))
+
+        started = time.perf_counter()
+        temporary = f'{output}.part'
+        written = 0
+        try:
+            with open(temporary, 'wb') as archive:
+                for chunk in stream_export(user):
+                    archive.write(chunk)
+                    written += len(chunk)
+            os.replace(temporary, output)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        self.stdout.write(f'   - Archivo: {output}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {written / (1024*1024):.1f} MB exportados en {elapsed:.1f}s'
+            )
+        )
@@ -3,11 +3,8 @@ Comando para verificar la salud del sistema
 """
 
 from django.core.management.base import BaseCommand
-from django.db import connection
-from django.core.cache import cache
 from django.conf import settings
-import os
-import psutil
+from memories.health import run_checks
 import time
 
 
@@ -21,6 +18,12 @@ class Command(BaseCommand):
             default='text',
             help='Formato de salida (text o json)',
         )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=10.0,
+            help='Segundos máximos por verificación (default: 10)',
+        )
 
     def handle(self, *args, **options):
         format_type = options['format']
@@ -31,45 +34,19 @@ class Command(BaseCommand):
             )
             self.stdout.write('=' * 50)
 
-        checks = [
-            ('Base de Datos', self.check_database),
-            ('Cache', self.check_cache),
-            ('Archivos Media', self.check_media_storage),
-            ('Memoria del Sistema', self.check_system_memory),
-            ('Espacio en Disco', self.check_disk_space),
-            ('Configuración', self.check_configuration),
-        ]
+        # Las verificaciones del sistema corren en paralelo (ver memories/health.py)
+        all_healthy, results = run_checks(timeout=options['timeout'])
+        results['Configuración'] = self.check_configuration()
+        all_healthy = all_healthy and results['Configuración']['healthy']
 
-        results = {}
-        all_healthy = True
-
-        for check_name, check_function in checks:
-            try:
-                result = check_function()
-                results[check_name] = result
-                
-                if format_type == 'text':
-                    status_icon = '✅' if result['healthy'] else '❌'
-                    self.stdout.write(f"{status_icon} {check_name}: {result['message']}")
-                    
-                    if 'details' in result:
-                        for detail in result['details']:
-                            self.stdout.write(f"   - {detail}")
-                
-                if not result['healthy']:
-                    all_healthy = False
-                    
-            except Exception as e:
-                results[check_name] = {
-                    'healthy': False,
-                    'message': f'Error en verificación: {str(e)}'
-                }
-                all_healthy = False
+        if format_type == 'text':
+            for check_name, result in results.items():
+                status_icon = '✅' if result['healthy'] else '❌'
+                self.stdout.write(f"{status_icon} {check_name}: {result['message']}")
                 
-                if format_type == 'text':
-                    self.stdout.write(
-                        self.style.ERROR(f"❌ {check_name}: Error - {str(e)}")
-                    )
+                if 'details' in result:
+                    for detail in result['details']:
+                        self.stdout.write(f"   - {detail}")
 
         if format_type == 'json':
             import json
@@ -84,156 +61,6 @@ class Command(BaseCommand):
             overall_status = '🟢 SALUDABLE' if all_healthy else '🔴 PROBLEMAS DETECTADOS'
             self.stdout.write(f"Estado general: {overall_status}")
 
-    def check_database(self):
-        """Verificar conexión a la base de datos"""
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
-                result = cursor.fetchone()
-                
-            if result and result[0] == 1:
-                return {
-                    'healthy': True,
-                    'message': 'Conexión exitosa',
-                    'details': [f'Motor: {connection.vendor}']
-                }
-            else:
-                return {
-                    'healthy': False,
-                    'message': 'Respuesta inesperada de la base de datos'
-                }
-        except Exception as e:
-            return {
-                'healthy': False,
-                'message': f'Error de conexión: {str(e)}'
-            }
-
-    def check_cache(self):
-        """Verificar sistema de cache"""
-        try:
-            test_key = 'health_check_test'
-            test_value = 'test_value'
-            
-            cache.set(test_key, test_value, 30)
-            retrieved_value = cache.get(test_key)
-            cache.delete(test_key)
-            
-            if retrieved_value == test_value:
-                return {
-                    'healthy': True,
-                    'message': 'Cache funcionando correctamente'
-                }
-            else:
-                return {
-                    'healthy': False,
-                    'message': 'Cache no está funcionando correctamente'
-                }
-        except Exception as e:
-            return {
-                'healthy': False,
-                'message': f'Error en cache: {str(e)}'
-            }
-
-    def check_media_storage(self):
-        """Verificar almacenamiento de archivos media"""
-        try:
-            media_root = settings.MEDIA_ROOT
-            
-            if not os.path.exists(media_root):
-                return {
-                    'healthy': False,
-                    'message': 'Directorio media no existe'
-                }
-            
-            if not os.access(media_root, os.W_OK):
-                return {
-                    'healthy': False,
-                    'message': 'No hay permisos de escritura en directorio media'
-                }
-            
-            # Verificar espacio disponible
-            stat = os.statvfs(media_root)
-            free_space = stat.f_bavail * stat.f_frsize
-            free_space_mb = free_space / (1024 * 1024)
-            
-            if free_space_mb < 100:  # Menos de 100MB
-                return {
-                    'healthy': False,
-                    'message': f'Poco espacio disponible: {free_space_mb:.1f}MB'
-                }
-            
-            return {
-                'healthy': True,
-                'message': 'Almacenamiento media OK',
-                'details': [f'Espacio libre: {free_space_mb:.1f}MB']
-            }
-            
-        except Exception as e:
-            return {
-                'healthy': False,
-                'message': f'Error verificando media: {str(e)}'
-            }
-
-    def check_system_memory(self):
-        """Verificar memoria del sistema"""
-        try:
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            
-            if memory_percent > 90:
-                return {
-                    'healthy': False,
-                    'message': f'Memoria alta: {memory_percent:.1f}%'
-                }
-            elif memory_percent > 80:
-                return {
-                    'healthy': True,
-                    'message': f'Memoria moderada: {memory_percent:.1f}%'
-                }
-            else:
-                return {
-                    'healthy': True,
-                    'message': f'Memoria OK: {memory_percent:.1f}%',
-                    'details': [
-                        f'Total: {memory.total / (1024**3):.1f}GB',
-                        f'Disponible: {memory.available / (1024**3):.1f}GB'
-                    ]
-                }
-        except Exception as e:
-            return {
-                'healthy': False,
-                'message': f'Error verificando memoria: {str(e)}'
-            }
-
-    def check_disk_space(self):
-        """Verificar espacio en disco"""
-        try:
-            disk_usage = psutil.disk_usage('.')
-            percent_used = (disk_usage.used / disk_usage.total) * 100
-            free_gb = disk_usage.free / (1024**3)
-            
-            if percent_used > 95:
-                return {
-                    'healthy': False,
-                    'message': f'Disco casi lleno: {percent_used:.1f}%'
-                }
-            elif percent_used > 85:
-                return {
-                    'healthy': True,
-                    'message': f'Espacio en disco bajo: {percent_used:.1f}%'
-                }
-            else:
-                return {
-                    'healthy': True,
-                    'message': f'Espacio en disco OK: {percent_used:.1f}%',
-                    'details': [f'Espacio libre: {free_gb:.1f}GB']
-                }
-        except Exception as e:
-            return {
-                'healthy': False,
-                'message': f'Error verificando disco: {str(e)}'
-            }
-
     def check_configuration(self):
         """Verificar configuración crítica"""
         issues = []
@@ -0,0 +1,82 @@
+"""
+Comando worker que procesa la cola de trabajos de imagen
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from memories.jobs import claim_next_job, enqueue_missing_derivatives, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Procesa en segundo plano las imágenes subidas (derivados, EXIF, recodificación)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesar los trabajos pendientes y terminar',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Segundos de espera cuando la cola está vacía',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=0,
+            help='Terminar después de N trabajos (0 = sin límite)',
+        )
+        parser.add_argument(
+            '--enqueue-missing',
+            action='store_true',
+            help='Encolar los recuerdos existentes que no tienen derivados',
+        )
+
+    def handle(self, *args, **options):
+        if options['enqueue_missing']:
+            count = enqueue_missing_derivatives()
+            self.stdout.write(f"📥 Encolados {count} recuerdos sin derivados")
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(
+                self.style.WARNING(f"♻️  Reencolados {requeued} trabajos abandonados")
+            )
+
+        self.stdout.write(self.style.SUCCESS('👷 Worker de imágenes iniciado'))
+
+        processed = 0
+        failed = 0
+        try:
+            while not options['max_jobs'] or processed < options['max_jobs']:
+                close_old_connections()
+                job = claim_next_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                started = time.monotonic()
+                if run_job(job):
+                    self.stdout.write(
+                        f"   ✅ Recuerdo {job.memory_id} procesado "
+                        f"({(time.monotonic() - started) * 1000:.0f} ms)"
+                    )
+                else:
+                    failed += 1
+                    self.stdout.write(
+                        self.style.ERROR(f"   ❌ Error procesando recuerdo {job.memory_id}")
+                    )
+                processed += 1
+        except KeyboardInterrupt:
+            self.stdout.write('\n⏹️  Worker detenido')
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Trabajos procesados: {processed} (fallidos: {failed})")
+        )
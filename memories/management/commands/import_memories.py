@@ -0,0 +1,247 @@
+"""
+Comando para importar recuerdos en masa desde un directorio o manifiesto
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from memories.blobs import recount_blobs
+from memories.cache import bump_timeline_version
+from memories.importer import (
+    DEFAULT_DESCRIPTION,
+    ImportSourceError,
+    ingest_image,
+    read_entries,
+    title_from_filename,
+)
+from memories.models import ImageBlob, Memory
+from memories.stats import rebuild_user_stats
+from memories.validators import (
+    validate_memory_date,
+    validate_memory_description,
+    validate_memory_title,
+)
+
+
+class Command(BaseCommand):
+    help = 'Importa recuerdos desde un directorio de fotos o un manifiesto CSV/JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source',
+            help='Directorio con imágenes o manifiesto .csv/.json (columnas: image, title, description, date)',
+        )
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Nombre del usuario dueño de los recuerdos',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Recuerdos insertados por transacción (default: 500)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Procesos para validar y procesar imágenes; 0 procesa en este proceso',
+        )
+        parser.add_argument(
+            '--state-file',
+            help='Archivo de progreso para reanudar (default: <origen>.import-state.json)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostrar cuántas entradas se importarían sin procesarlas',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'No existe el usuario "{options["user"]}"')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor a 0')
+
+        source = os.path.abspath(options['source'])
+        try:
+            entries = read_entries(source)
+        except (ImportSourceError, OSError) as e:
+            raise CommandError(str(e))
+
+        state_path = options['state_file'] or f'{source.rstrip(os.sep)}.import-state.json'
+        state = self.load_state(state_path)
+        done = set(state['done'])
+        pending = [entry for entry in entries if entry.key not in done]
+
+        self.stdout.write(
+            self.style.SUCCESS(f'📥 Importando recuerdos para {user.username}...')
+        )
+        self.stdout.write(
+            f'   - Entradas: {len(entries)} ({len(entries) - len(pending)} ya importadas)'
+        )
+        if options['dry_run'] or not pending:
+            return
+
+        self.user = user
+        self.imported = self.failed = self.total_bytes = 0
+        started = time.perf_counter()
+        ingest = partial(
+            ingest_image,
+            media_root=str(settings.MEDIA_ROOT),
+            limits=settings.FILE_VALIDATION,
+        )
+
+        entries_by_key = {entry.key: entry for entry in pending}
+        batch = []
+        with self.results(ingest, pending, options['workers']) as results:
+            for result in results:
+                batch.append(result)
+                if len(batch) >= options['batch_size']:
+                    self.flush(batch, entries_by_key, state, state_path)
+                    batch = []
+                    self.report_progress(started, len(pending))
+            if batch:
+                self.flush(batch, entries_by_key, state, state_path)
+
+        # Los recuerdos se insertaron sin señales: estadísticas y cache de una vez
+        rebuild_user_stats(user.pk)
+        bump_timeline_version(user.pk)
+
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {self.imported} recuerdos importados en {elapsed:.1f}s '
+                f'({self.imported / elapsed:.1f} recuerdos/s, '
+                f'{self.total_bytes / (1024*1024) / elapsed:.1f} MB/s)'
+            )
+        )
+        if self.failed:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'⚠️  {self.failed} entradas con errores (se reintentan en la próxima ejecución)'
+                )
+            )
+
+    @contextmanager
+    def results(self, ingest, entries, workers):
+        """Procesar las imágenes en un pool de procesos, en orden"""
+        if workers <= 0:
+            yield map(ingest, entries)
+            return
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            yield executor.map(ingest, entries, chunksize=8)
+        finally:
+            # Si el comando se interrumpe no esperar las imágenes pendientes
+            executor.shutdown(cancel_futures=True)
+
+    def flush(self, batch, entries_by_key, state, state_path):
+        """Insertar un lote en una transacción y registrar el progreso"""
+        memories = []
+        keys = []
+        for result in batch:
+            entry = entries_by_key[result['key']]
+            if 'error' not in result:
+                try:
+                    memories.append(self.build_memory(entry, result))
+                    keys.append(entry.key)
+                    continue
+                except ValidationError as e:
+                    result['error'] = '; '.join(e.messages)
+            self.failed += 1
+            state['failed'][entry.key] = result['error']
+            self.stdout.write(self.style.WARNING(f'   ⚠️  {entry.key}: {result["error"]}'))
+
+        with transaction.atomic():
+            digests = {memory.blob_digest for memory in memories}
+            self.ensure_blobs(memories, digests)
+            Memory.objects.bulk_create(memories, batch_size=len(memories) or 1)
+            recount_blobs(ImageBlob.objects.filter(digest__in=digests))
+
+        self.imported += len(memories)
+        self.total_bytes += sum(memory.image_size for memory in memories)
+        state['done'].extend(keys)
+        for key in keys:
+            state['failed'].pop(key, None)
+        self.save_state(state_path, state)
+
+    def build_memory(self, entry, result):
+        """Memory sin guardar a partir de la entrada y del resultado del worker"""
+        title = entry.title or title_from_filename(entry.path)
+        memory_date = entry.date or date.fromisoformat(result['taken'] or result['modified'])
+        if len(title) < 3 or title.isdigit():
+            title = f'Recuerdo del {memory_date:%d/%m/%Y}'
+        description = entry.description or DEFAULT_DESCRIPTION
+
+        # Mismas reglas que Memory.full_clean para los campos que vienen del archivo
+        validate_memory_title(title)
+        validate_memory_description(description)
+        validate_memory_date(memory_date)
+
+        memory = Memory(
+            user=self.user,
+            title=title,
+            description=description,
+            date=memory_date,
+            image=result['name'],
+            thumbnail=result['thumbnail'],
+            medium=result['medium'],
+            image_size=result['size'],
+            image_width=result['image_width'],
+            image_height=result['image_height'],
+            placeholder=result['placeholder'],
+            processing_status=Memory.STATUS_READY,
+        )
+        memory.blob_digest = result['digest']
+        return memory
+
+    def ensure_blobs(self, memories, digests):
+        """Crear los blobs que falten y asignarlos a los recuerdos del lote"""
+        names = {memory.blob_digest: memory.image.name for memory in memories}
+        sizes = {memory.blob_digest: memory.image_size for memory in memories}
+        ImageBlob.objects.bulk_create(
+            [ImageBlob(digest=digest, name=names[digest], size=sizes[digest]) for digest in digests],
+            ignore_conflicts=True,
+        )
+        blob_ids = dict(
+            ImageBlob.objects.filter(digest__in=digests).values_list('digest', 'pk')
+        )
+        for memory in memories:
+            memory.blob_id = blob_ids[memory.blob_digest]
+
+    def report_progress(self, started, total):
+        elapsed = time.perf_counter() - started
+        processed = self.imported + self.failed
+        rate = self.imported / elapsed if elapsed else 0
+        self.stdout.write(f'   - {processed}/{total} procesadas ({rate:.1f} recuerdos/s)')
+
+    def load_state(self, path):
+        try:
+            with open(path) as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault('done', [])
+        state.setdefault('failed', {})
+        return state
+
+    def save_state(self, path, state):
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as state_file:
+            json.dump(state, state_file)
+        os.replace(temporary, path)
+
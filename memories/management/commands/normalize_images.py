@@ -0,0 +1,140 @@
+"""
+Comando para recodificar las imágenes ya subidas según IMAGE_NORMALIZATION
+(ver memories/backfill.py)
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from memories.backfill import normalize_stored_image
+from memories.blobs import purge_blob, recount_blobs
+from memories.cache import bump_timeline_version
+from memories.images import normalization_options, variant_formats
+from memories.models import ImageBlob, Memory
+from memories.stats import rebuild_user_stats
+from memories.storage import digest_from_name
+
+
+class Command(BaseCommand):
+    help = 'Recodifica los originales existentes (formato, tamaño y metadatos) y genera las variantes modernas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Procesos para recodificar imágenes; 0 procesa en este proceso',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Procesar como máximo esta cantidad de imágenes',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostrar cuántas imágenes se procesarían sin ejecutar cambios',
+        )
+
+    def handle(self, *args, **options):
+        normalization = normalization_options()
+        if normalization is None:
+            raise CommandError('IMAGE_NORMALIZATION está desactivada (ENABLED = False)')
+
+        blobs = ImageBlob.objects.filter(ref_count__gt=0).order_by('pk')
+        if options['limit']:
+            blobs = blobs[:options['limit']]
+        blobs = list(blobs.values_list('pk', 'name'))
+
+        formats = ', '.join(variant_formats(normalization)) or 'ninguna'
+        self.stdout.write(self.style.SUCCESS(
+            f'🗜️  Recodificando {len(blobs)} imágenes a {normalization["FORMAT"]} '
+            f'(variantes: {formats})...'
+        ))
+        legacy = Memory.objects.filter(blob__isnull=True).exclude(image='').count()
+        if legacy:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {legacy} recuerdos sin blob se omiten: python manage.py dedupe_images'
+            ))
+        if options['dry_run'] or not blobs:
+            return
+
+        started = time.perf_counter()
+        normalize = partial(normalize_stored_image, media_root=str(settings.MEDIA_ROOT), options=normalization)
+        replaced = skipped = failed = saved = variant_bytes = 0
+        users = set()
+        with self.results(normalize, blobs, options['workers']) as results:
+            for result in results:
+                if 'error' in result:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(
+                        f'   ⚠️  No se pudo procesar {result["old_name"]}: {result["error"]}'
+                    ))
+                    continue
+                if result.get('skipped'):
+                    skipped += 1
+                    continue
+                variant_bytes += result['variant_bytes']
+                if result['name'] != result['old_name']:
+                    users.update(self.replace_blob(result))
+                    replaced += 1
+                    saved += result['old_size'] - result['size']
+
+        # Los recuerdos se actualizaron sin señales: estadísticas y cache de una vez
+        for user_id in users:
+            rebuild_user_stats(user_id)
+            bump_timeline_version(user_id)
+
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {replaced} originales recodificados en {elapsed:.1f}s '
+            f'({saved / (1024*1024):.2f} MB ahorrados, '
+            f'{variant_bytes / (1024*1024):.2f} MB en variantes), {skipped} ya al día'
+        ))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠️  {failed} imágenes con errores'))
+
+    @contextmanager
+    def results(self, normalize, blobs, workers):
+        """Procesar las imágenes en un pool de procesos, en orden"""
+        if workers <= 0:
+            yield map(normalize, blobs)
+            return
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            yield executor.map(normalize, blobs, chunksize=8)
+        finally:
+            # Si el comando se interrumpe no esperar las imágenes pendientes
+            executor.shutdown(cancel_futures=True)
+
+    def replace_blob(self, result):
+        """
+        Apuntar los recuerdos del blob anterior al archivo recodificado y
+        purgar el anterior. Retorna los ids de los usuarios afectados.
+        """
+        with transaction.atomic():
+            blob, _ = ImageBlob.objects.get_or_create(
+                digest=digest_from_name(result['name']),
+                defaults={'name': result['name'], 'size': result['size'], 'ref_count': 0},
+            )
+            memories = Memory.objects.filter(blob_id=result['blob'])
+            users = set(memories.values_list('user_id', flat=True))
+            memories.update(
+                image=result['name'],
+                image_size=result['size'],
+                blob=blob,
+                processing_status=Memory.STATUS_READY,
+                updated_at=timezone.now(),
+                **result['derivatives'],
+                **result['summary'],
+            )
+            recount_blobs(ImageBlob.objects.filter(pk__in=[blob.pk, result['blob']]))
+        purge_blob(result['blob'])
+        return users
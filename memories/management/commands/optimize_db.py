@@ -2,9 +2,13 @@
 Comando para optimizar la base de datos
 """
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.db import connection
-from memories.models import Memory
+from django.db.models import Count, Sum
+from memories.cache import timeline_cache_stats
+from memories.models import ImageBlob, Memory, UserMemoryStats
+from memories.sweeper import OrphanSweeper, load_checkpoint
 from django.contrib.auth.models import User
 
 
@@ -22,6 +26,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Ejecutar VACUUM en la base de datos (SQLite)',
         )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Revisar todos los archivos, no solo los nuevos desde el último barrido',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Hilos para recorrer y eliminar archivos (default: CPUs + 4)',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(
@@ -42,7 +57,7 @@ class Command(BaseCommand):
         self.clean_expired_sessions(dry_run)
 
         # Optimizar imágenes huérfanas
-        self.clean_orphaned_images(dry_run)
+        self.clean_orphaned_images(dry_run, full=options['full'], workers=options['workers'])
 
         # Actualizar estadísticas de la base de datos
         if options['vacuum']:
@@ -64,17 +79,35 @@ class Command(BaseCommand):
         self.stdout.write(f"   - Usuarios: {total_users}")
         self.stdout.write(f"   - Recuerdos: {total_memories}")
 
-        # Estadísticas de archivos
-        try:
-            import os
-            media_size = sum(
-                os.path.getsize(os.path.join(dirpath, filename))
-                for dirpath, dirnames, filenames in os.walk('media')
-                for filename in filenames
+        cache_stats = timeline_cache_stats()
+        self.stdout.write(
+            f"   - Cache de timeline: {cache_stats['hits']} hits / "
+            f"{cache_stats['misses']} misses ({cache_stats['hit_ratio']:.0%})"
+        )
+
+        # Estadísticas de archivos (desde la base de datos, sin recorrer media)
+        blobs = ImageBlob.objects.aggregate(files=Count('pk'), total=Sum('size'))
+        legacy = Memory.objects.filter(blob__isnull=True).aggregate(
+            files=Count('pk'), total=Sum('image_size')
+        )
+        stored = (blobs['total'] or 0) + (legacy['total'] or 0)
+        uploaded = UserMemoryStats.objects.aggregate(total=Sum('total_image_bytes'))['total'] or 0
+        self.stdout.write(
+            f"   - Imágenes originales: {stored / (1024*1024):.2f} MB "
+            f"en {blobs['files'] + legacy['files']} archivos"
+        )
+        if uploaded > stored:
+            self.stdout.write(
+                f"   - Ahorro por duplicados: {(uploaded - stored) / (1024*1024):.2f} MB"
+            )
+
+        checkpoint = load_checkpoint(settings.ORPHAN_SWEEP_CHECKPOINT)
+        if 'media_bytes' in checkpoint:
+            self.stdout.write(
+                f"   - Tamaño media (último barrido completo): "
+                f"{checkpoint['media_bytes'] / (1024*1024):.2f} MB "
+                f"en {checkpoint['media_files']} archivos"
             )
-            self.stdout.write(f"   - Tamaño media: {media_size / (1024*1024):.2f} MB")
-        except Exception:
-            pass
 
     def clean_expired_sessions(self, dry_run):
         """Limpiar sesiones expiradas"""
@@ -87,50 +120,60 @@ class Command(BaseCommand):
         else:
             self.stdout.write("   🔍 Se eliminarían las sesiones expiradas")
 
-    def clean_orphaned_images(self, dry_run):
+    def clean_orphaned_images(self, dry_run, full=False, workers=None):
         """Limpiar imágenes huérfanas"""
         self.stdout.write("🖼️  Verificando imágenes huérfanas...")
         
-        import os
-        from django.conf import settings
-        
-        media_root = settings.MEDIA_ROOT
-        memories_path = os.path.join(media_root, 'memories')
+        # Imágenes por contenido: los huérfanos son blobs sin referencias (consulta indexada)
+        from memories.blobs import purge_orphaned_blobs
         
-        if not os.path.exists(memories_path):
-            self.stdout.write("   ℹ️  Directorio de imágenes no existe")
-            return
-
-        # Obtener todas las imágenes en uso
-        used_images = set()
-        for memory in Memory.objects.all():
-            if memory.image:
-                used_images.add(os.path.basename(memory.image.name))
-
-        # Verificar archivos en el directorio
-        orphaned_files = []
-        for filename in os.listdir(memories_path):
-            if filename not in used_images:
-                orphaned_files.append(filename)
-
-        if orphaned_files:
-            self.stdout.write(f"   🗑️  Encontradas {len(orphaned_files)} imágenes huérfanas")
-            
-            if not dry_run:
-                for filename in orphaned_files:
-                    file_path = os.path.join(memories_path, filename)
-                    try:
-                        os.remove(file_path)
-                        self.stdout.write(f"      - Eliminado: {filename}")
-                    except Exception as e:
-                        self.stdout.write(
-                            self.style.ERROR(f"      - Error eliminando {filename}: {e}")
-                        )
-            else:
-                for filename in orphaned_files:
-                    self.stdout.write(f"      - Se eliminaría: {filename}")
+        orphaned_blobs = ImageBlob.objects.filter(ref_count__lte=0)
+        if dry_run:
+            count = orphaned_blobs.count()
+            if count:
+                self.stdout.write(f"   🔍 Se eliminarían {count} archivos sin referencias")
         else:
+            purged, freed = purge_orphaned_blobs()
+            if purged:
+                self.stdout.write(
+                    f"   🗑️  Eliminados {purged} archivos sin referencias "
+                    f"({freed / (1024*1024):.2f} MB)"
+                )
+        
+        self.sweep_orphaned_files(dry_run, full, workers)
+
+    def sweep_orphaned_files(self, dry_run, full, workers):
+        """Buscar archivos que ningún recuerdo ni blob referencia (ver memories/sweeper.py)"""
+        import time
+        
+        sweeper = OrphanSweeper(
+            settings.MEDIA_ROOT,
+            settings.ORPHAN_SWEEP_CHECKPOINT,
+            full=full,
+            dry_run=dry_run,
+            workers=workers,
+        )
+        started = time.perf_counter()
+        result = sweeper.run()
+        elapsed = time.perf_counter() - started
+        
+        mode = 'completo' if result.full else 'incremental'
+        self.stdout.write(
+            f"   🔎 Barrido {mode}: {result.scanned} archivos revisados, "
+            f"{result.skipped_dirs} directorios sin cambios ({elapsed:.2f}s)"
+        )
+        
+        if not result.orphaned:
             self.stdout.write("   ✅ No se encontraron imágenes huérfanas")
+        elif dry_run:
+            self.stdout.write(f"   🔍 Se eliminarían {result.orphaned} archivos huérfanos:")
+            for path in sweeper.orphans:
+                self.stdout.write(f"      - {path}")
+        else:
+            self.stdout.write(
+                f"   🗑️  Eliminados {result.orphaned} archivos huérfanos "
+                f"({result.freed_bytes / (1024*1024):.2f} MB)"
+            )
 
     def vacuum_database(self, dry_run):
         """Ejecutar VACUUM en SQLite"""
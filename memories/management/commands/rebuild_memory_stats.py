@@ -0,0 +1,61 @@
+"""
+Comando para reparar las estadísticas desnormalizadas de recuerdos
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from memories.models import Memory
+from memories.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las estadísticas por usuario (conteo, fechas y bytes de imágenes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Recalcular solo las estadísticas de este nombre de usuario',
+        )
+        parser.add_argument(
+            '--fill-sizes',
+            action='store_true',
+            help='Leer del storage el tamaño de las imágenes que aún no lo tienen registrado',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS('📊 Recalculando estadísticas de recuerdos...')
+        )
+
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+
+        if options['fill_sizes']:
+            self.fill_image_sizes(users)
+
+        rebuilt = 0
+        for user_id in users.values_list('pk', flat=True).iterator():
+            rebuild_user_stats(user_id)
+            rebuilt += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Estadísticas recalculadas para {rebuilt} usuarios')
+        )
+
+    def fill_image_sizes(self, users):
+        """Completar image_size de recuerdos anteriores a este campo"""
+        memories = Memory.objects.filter(user__in=users, image_size=0).exclude(image='')
+        filled = 0
+        for memory in memories.only('pk', 'image').iterator():
+            try:
+                size = memory.image.size
+            except OSError:
+                self.stdout.write(
+                    self.style.WARNING(f'   ⚠️  Imagen no encontrada: {memory.image.name}')
+                )
+                continue
+            Memory.objects.filter(pk=memory.pk).update(image_size=size)
+            filled += 1
+        self.stdout.write(f'   - Tamaños completados: {filled}')
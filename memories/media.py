@@ -0,0 +1,248 @@
+"""
+Envío de los archivos de media (imágenes de recuerdos) con control de acceso.
+
+Las URLs de las imágenes llevan el usuario dueño, un vencimiento y un HMAC de
+ambos con el nombre (ver media_url). SignedMediaMiddleware comprueba la firma
+antes de cargar la sesión y envía el archivo sin consultar la base; las URLs
+sin firma o vencidas siguen hasta MediaFileView, que sí consulta.
+
+El archivo lo envía el servidor web si MEDIA_SENDFILE está configurado
+(X-Accel-Redirect en Nginx, X-Sendfile en Apache / Passenger); si no, Django
+con FileResponse, que responde a Range, If-Range e If-Modified-Since.
+
+Los nombres por contenido (memories/ab/<sha256>..., ver storage.py) nunca
+cambian de bytes, así que el navegador los cachea un año como immutable. De
+los derivados se envía la variante AVIF o WebP si el navegador la acepta
+(ver images.generate_derivatives).
+"""
+import mimetypes
+import os
+import re
+import stat
+import time
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.signing import Signer
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+
+SIGNATURE_SALT = 'memories.media'
+
+# Original o derivado con nombre por contenido (ver storage.content_name e images.derivative_name)
+CONTENT_NAME_RE = re.compile(r'^memories/[0-9a-f]{2}/[0-9a-f]{64}(?:_[a-z]+)?\.[a-z0-9]+$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+DEFAULT_MAX_AGE = 3600  # Nombres antiguos (uuid): un derivado regenerado conserva el nombre
+
+# Derivados (abc_thumbnail.jpg) y sus variantes, en orden de preferencia
+DERIVATIVE_RE = re.compile(r'_[a-z]+\.(?:jpg|png)$')
+VARIANT_TYPES = (
+    ('image/avif', '.avif'),
+    ('image/webp', '.webp'),
+)
+
+# Solo un rango; con varios se envía el archivo completo (lo permite RFC 9110)
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+BLOCK_SIZE = 64 * 1024
+
+SENDFILE_HEADERS = {
+    'x-accel-redirect': 'X-Accel-Redirect',
+    'x-sendfile': 'X-Sendfile',
+}
+
+
+def url_window(now=None):
+    """Período de MEDIA_URL_TTL en curso; las páginas lo incluyen en su ETag"""
+    return int((now if now is not None else time.time()) // settings.MEDIA_URL_TTL)
+
+
+def url_expiry(now=None):
+    """
+    Vencimiento de las URLs firmadas ahora: el final del período siguiente.
+    Dentro de un período la URL no cambia (el navegador reutiliza la imagen
+    cacheada) y siempre le quedan al menos MEDIA_URL_TTL segundos.
+    """
+    return (url_window(now) + 2) * settings.MEDIA_URL_TTL
+
+
+def media_signature(name, user_id, expires, key=None):
+    """HMAC de (usuario, vencimiento, archivo) con SECRET_KEY"""
+    return Signer(salt=SIGNATURE_SALT).signature(f'{user_id}:{expires}:{name}', key=key)
+
+
+def media_url(name, user_id, expires=None):
+    """URL firmada de un archivo de media para su dueño"""
+    expires = url_expiry() if expires is None else expires
+    query = urlencode({'u': user_id, 'e': expires, 's': media_signature(name, user_id, expires)})
+    return f'{settings.MEDIA_URL}{quote(name)}?{query}'
+
+
+def signed_owner(request, name):
+    """Id (str) del usuario para el que se firmó la URL, o None si no es válida o venció"""
+    user_id, expires, signature = (request.GET.get(param, '') for param in ('u', 'e', 's'))
+    if not user_id.isdigit() or not expires.isdigit() or not signature:
+        return None
+    if int(expires) < time.time():
+        return None
+    # También las claves de SECRET_KEY_FALLBACKS, para rotar la clave sin romper páginas cacheadas
+    keys = [settings.SECRET_KEY, *settings.SECRET_KEY_FALLBACKS]
+    if any(constant_time_compare(signature, media_signature(name, user_id, expires, key)) for key in keys):
+        return user_id
+    return None
+
+
+def media_path(name):
+    """Ruta absoluta de un archivo de MEDIA_ROOT y su stat (404 si no existe)"""
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+        stat_result = os.stat(path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404()
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404()
+    return path, stat_result
+
+
+def negotiate(request, name):
+    """
+    Nombre, ruta y stat del archivo a enviar: la mejor variante guardada del
+    derivado que acepte el navegador, o el propio archivo
+    """
+    if DERIVATIVE_RE.search(name):
+        accept = request.headers.get('Accept', '')
+        stem = os.path.splitext(name)[0]
+        for content_type, ext in VARIANT_TYPES:
+            if content_type in accept:
+                try:
+                    return (stem + ext, *media_path(stem + ext))
+                except Http404:
+                    continue  # Derivado anterior a las variantes, o formato no soportado
+    return (name, *media_path(name))
+
+
+def serve_media(request, name):
+    """Respuesta con un archivo de MEDIA_ROOT, ya autorizado por el llamador"""
+    negotiable = bool(DERIVATIVE_RE.search(name))
+    name, path, stat_result = negotiate(request, name)
+    etag = quote_etag(f'{int(stat_result.st_mtime):x}-{stat_result.st_size:x}')
+    last_modified = int(stat_result.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        sendfile = settings.MEDIA_SENDFILE
+        if sendfile:
+            response = sendfile_response(name, path, content_type, sendfile)
+        else:
+            response = file_response(request, path, stat_result.st_size, content_type, etag, last_modified)
+
+    if response.status_code in (200, 206, 304):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        add_cache_headers(response, name)
+        if negotiable:
+            patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def sendfile_response(name, path, content_type, mode):
+    """Respuesta vacía: el servidor web lee el archivo (y atiende Range) por su cuenta"""
+    if mode not in SENDFILE_HEADERS:
+        raise ValueError(f'MEDIA_SENDFILE no válido: {mode!r} (usar {", ".join(SENDFILE_HEADERS)})')
+    response = HttpResponse(content_type=content_type)
+    if mode == 'x-accel-redirect':
+        # location internal de Nginx con alias a MEDIA_ROOT
+        response['X-Accel-Redirect'] = settings.MEDIA_SENDFILE_PREFIX + quote(name)
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+def file_response(request, path, size, content_type, etag, last_modified):
+    """Archivo completo (200), un rango (206) o 416 si el rango no existe"""
+    byte_range = requested_range(request, size, etag, last_modified)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = open(path, 'rb')
+    if byte_range is None:
+        # Con un archivo real, gunicorn lo envía con sendfile(2) (wsgi.file_wrapper)
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(RangeFile(file, end - start + 1), content_type=content_type, status=206)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response.block_size = BLOCK_SIZE
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def requested_range(request, size, etag, last_modified):
+    """
+    (inicio, fin) inclusivos del encabezado Range; None para enviar el archivo
+    completo; False si el rango queda fuera del archivo (416)
+    """
+    header = request.headers.get('Range')
+    if not header or request.method not in ('GET', 'HEAD'):
+        return None
+    # If-Range: el rango solo vale si el cliente tiene esta misma versión
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            return None  # Rango mal formado: se ignora
+        if start >= size:
+            return False
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        suffix = int(last)  # bytes=-N: los últimos N bytes
+        if suffix == 0 or size == 0:
+            return False
+        start, end = max(0, size - suffix), size - 1
+    return start, end
+
+
+def add_cache_headers(response, name):
+    """Privada (solo el dueño); un año e immutable si el nombre es el hash del contenido"""
+    if CONTENT_NAME_RE.match(name):
+        patch_cache_control(response, private=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, private=True, max_age=DEFAULT_MAX_AGE)
+
+
+class RangeFile:
+    """
+    Lector limitado a length bytes desde la posición actual. Sin fileno(): el
+    servidor no debe usar sendfile(2), que enviaría hasta el final del archivo.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
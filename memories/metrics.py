@@ -0,0 +1,340 @@
+"""
+Métricas de rendimiento por vista en formato de texto de Prometheus.
+
+Cada proceso acumula contadores e histogramas en memoria (dicts protegidos
+por un lock, sin E/S en la petición) y cada METRICS_FLUSH_INTERVAL segundos los vuelca a su
+propio archivo en settings.MONITORING['METRICS_DIR']. /metrics/ suma los
+archivos de todos los workers de gunicorn, así que cualquier worker puede
+responder. Cuando un worker termina (child_exit de gunicorn, o al leer si el
+proceso ya no existe) su archivo se suma a aggregate.json y se borra, como
+mark_process_dead de prometheus_client: los contadores nunca retroceden y el
+directorio no crece con cada worker reciclado por max_requests. Cada host
+necesita su propio METRICS_DIR (los pid solo valen en su máquina).
+"""
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock entre procesos
+    fcntl = None
+
+from django.conf import settings
+
+
+PREFIX = 'timeline'
+
+# Límites superiores de los histogramas (+Inf se agrega al exportar)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Descripción y tipo de cada métrica, en el orden en que se exportan
+METRICS = {
+    'http_requests_total': ('counter', 'Peticiones atendidas por vista, método y estado'),
+    'http_request_duration_seconds': ('histogram', 'Tiempo de respuesta por vista'),
+    'db_queries_per_request': ('histogram', 'Consultas SQL por petición'),
+    'db_query_duration_seconds_total': ('counter', 'Tiempo total en consultas SQL por vista'),
+    'cache_requests_total': ('counter', 'Lecturas del cache de la línea de tiempo por resultado'),
+    'http_response_size_bytes': ('histogram', 'Tamaño de las respuestas no streaming'),
+}
+BUCKETS = {
+    'http_request_duration_seconds': LATENCY_BUCKETS,
+    'db_queries_per_request': QUERY_COUNT_BUCKETS,
+    'http_response_size_bytes': SIZE_BUCKETS,
+}
+
+AGGREGATE_FILE = 'aggregate.json'
+WORKER_FILE_RE = re.compile(r'^worker-(\d+)\.json$')
+
+# Peticiones en curso: lo que otros módulos anotan (p. ej. hits de cache)
+_current = ContextVar('metrics_request', default=None)
+
+
+class Registry:
+    """Contadores e histogramas de un proceso, volcados a un archivo propio"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = 0.0
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        key = (name, labels)
+        buckets = BUCKETS[name]
+        with self.lock:
+            # [cuenta por límite..., +Inf, suma]
+            row = self.histograms.get(key)
+            if row is None:
+                row = self.histograms[key] = [0] * (len(buckets) + 2)
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    row[index] += 1
+                    break
+            else:
+                row[len(buckets)] += 1
+            row[-1] += value
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(labels), list(row)] for (name, labels), row in self.histograms.items()],
+            }
+
+    def maybe_flush(self):
+        """Volcar al archivo del proceso si pasó el intervalo"""
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+        now = time.monotonic()
+        if now - self.last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        directory = metrics_dir()
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        _write_snapshot(worker_path(directory, os.getpid()), self.snapshot())
+
+
+registry = Registry()
+
+
+def metrics_dir():
+    return getattr(settings, 'MONITORING', {}).get('METRICS_DIR')
+
+
+def worker_path(directory, pid):
+    return os.path.join(directory, f'worker-{pid}.json')
+
+
+def _write_snapshot(path, snapshot):
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as handle:
+        json.dump(snapshot, handle)
+    os.replace(temporary, path)  # Atómico: el lector nunca ve un archivo a medias
+
+
+def _read_snapshot(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+@contextmanager
+def _directory_lock(directory):
+    """Lock exclusivo entre procesos para modificar aggregate.json"""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, '.lock'), 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def mark_process_dead(pid, directory=None):
+    """
+    Sumar el archivo de un worker terminado a aggregate.json y borrarlo.
+    Retorna True si había archivo. Lo llama child_exit en gunicorn.conf.py.
+    """
+    directory = directory or metrics_dir()
+    if not directory:
+        return False
+    path = worker_path(directory, pid)
+    with _directory_lock(directory):
+        try:
+            snapshot = _read_snapshot(path)
+        except FileNotFoundError:
+            return False  # Ya lo sumó otro proceso
+        except ValueError:
+            snapshot = None  # Dañado: no se puede recuperar
+        if snapshot is not None:
+            aggregate_path = os.path.join(directory, AGGREGATE_FILE)
+            try:
+                aggregate = _read_snapshot(aggregate_path)
+            except (OSError, ValueError):
+                aggregate = {'counters': [], 'histograms': []}
+            _write_snapshot(aggregate_path, _to_snapshot(*_sum_snapshots([aggregate, snapshot])))
+        os.remove(path)
+    return True
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True  # Existe, de otro usuario (o no se puede saber)
+    return True
+
+
+def prune_dead_workers(directory):
+    """Sumar al acumulado los archivos de procesos que ya no existen"""
+    pruned = 0
+    for filename in os.listdir(directory):
+        match = WORKER_FILE_RE.match(filename)
+        if match and not _process_alive(int(match.group(1))):
+            pruned += mark_process_dead(int(match.group(1)), directory)
+    return pruned
+
+
+class RequestMetrics:
+    """Lo medido durante una petición"""
+
+    __slots__ = ('queries', 'query_time', 'cache')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.cache = {}
+
+
+def count_query(execute, sql, params, many, context):
+    """
+    execute_wrapper instalado en cada conexión: cuenta y mide las consultas
+    de la petición en curso. Con ASGI el ORM corre en otro hilo, pero
+    sync_to_async copia el contexto, así que _current sigue visible.
+    """
+    request_metrics = _current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.queries += 1
+        request_metrics.query_time += time.perf_counter() - started
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """Receptor de connection_created"""
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def record_cache(outcome):
+    """Anotar un hit o miss de cache en la petición en curso"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache[outcome] = metrics.cache.get(outcome, 0) + 1
+
+
+def record_request(view, method, status, duration, metrics, size=None):
+    """Acumular las métricas de una petición terminada"""
+    registry.inc('http_requests_total', (('view', view), ('method', method), ('status', str(status))))
+    labels = (('view', view),)
+    registry.observe('http_request_duration_seconds', labels, duration)
+    registry.observe('db_queries_per_request', labels, metrics.queries)
+    registry.inc('db_query_duration_seconds_total', labels, metrics.query_time)
+    for outcome, count in metrics.cache.items():
+        registry.inc('cache_requests_total', (('view', view), ('outcome', outcome)), count)
+    if size is not None:
+        registry.observe('http_response_size_bytes', labels, size)
+    registry.maybe_flush()
+
+
+def collect():
+    """Sumar las métricas de todos los workers"""
+    snapshots = []
+    directory = metrics_dir()
+    if directory and os.path.isdir(directory):
+        registry.flush()
+        prune_dead_workers(directory)
+        # Con el lock: un archivo no puede pasar al acumulado mientras se lee
+        with _directory_lock(directory):
+            for filename in os.listdir(directory):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    snapshots.append(_read_snapshot(os.path.join(directory, filename)))
+                except (OSError, ValueError):
+                    continue  # Archivo dañado: se omite esta vez
+    else:
+        snapshots.append(registry.snapshot())
+    return _sum_snapshots(snapshots)
+
+
+def _sum_snapshots(snapshots):
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, row in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(row))
+            for index, value in enumerate(row):
+                total[index] += value
+    return counters, histograms
+
+
+def _to_snapshot(counters, histograms):
+    """Inverso de _sum_snapshots: el formato de los archivos"""
+    return {
+        'counters': [[name, list(map(list, labels)), value] for (name, labels), value in counters.items()],
+        'histograms': [[name, list(map(list, labels)), row] for (name, labels), row in histograms.items()],
+    }
+
+
+def render_prometheus():
+    """Texto de exposición de Prometheus (versión 0.0.4)"""
+    counters, histograms = collect()
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        full_name = f'{PREFIX}_{name}'
+        lines.append(f'# HELP {full_name} {help_text}')
+        lines.append(f'# TYPE {full_name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{full_name}{_labels(labels)} {_number(value)}')
+            continue
+        bounds = BUCKETS[name]
+        for (metric, labels), row in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(bounds + ('+Inf',), row):
+                cumulative += count
+                lines.append(f'{full_name}_bucket{_labels(labels + (("le", str(bound)),))} {cumulative}')
+            lines.append(f'{full_name}_sum{_labels(labels)} {_number(row[-1])}')
+            lines.append(f'{full_name}_count{_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -3,7 +3,16 @@ Middleware personalizado para seguridad adicional
 """
 
 import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.module_loading import import_string
+
+from . import metrics
+from .media import serve_media, signed_owner
+from .routers import get_replicas, mark_primary_sticky
 
 # Importación condicional para compatibilidad
 try:
@@ -14,17 +23,61 @@ except ImportError:
         status_code = 429
 
 
-class SecurityHeadersMiddleware:
+class HybridMiddleware:
     """
-    Middleware que añade headers de seguridad adicionales
+    Base para middleware que funciona igual con WSGI y con ASGI.
+    Con ASGI los hooks corren en el event loop; solo pasan a un hilo cuando
+    needs_thread() indica que harán E/S (cache, sesión, base de datos).
+    Un middleware solo síncrono obligaría a Django a ejecutar toda la
+    cadena en un hilo por petición.
     """
+    sync_capable = True
+    async_capable = True
     
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        response = self.get_response(request)
-        
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.process_request(request)
+        if response is None:
+            response = self.get_response(request)
+        return self.process_response(request, response)
+    
+    async def __acall__(self, request):
+        blocking = self.needs_thread(request)
+        response = await self.run_hook(blocking, self.process_request, request)
+        if response is None:
+            response = await self.get_response(request)
+        return await self.run_hook(blocking, self.process_response, request, response)
+    
+    async def run_hook(self, blocking, hook, *args):
+        if blocking:
+            return await sync_to_async(hook, thread_sensitive=True)(*args)
+        return hook(*args)
+    
+    def needs_thread(self, request):
+        """Los hooks hacen E/S con esta petición"""
+        return False
+    
+    def process_request(self, request):
+        """Retornar una respuesta corta el resto de la cadena"""
+        return None
+    
+    def process_response(self, request, response):
+        return response
+
+
+class SecurityHeadersMiddleware(HybridMiddleware):
+    """
+    Middleware que añade headers de seguridad adicionales
+    """
+    
+    def process_response(self, request, response):
         # Headers de seguridad adicionales
         response['X-Content-Type-Options'] = 'nosniff'
         response['X-Frame-Options'] = 'DENY'
@@ -34,9 +87,9 @@ class SecurityHeadersMiddleware:
         # Content Security Policy básico
         response['Content-Security-Policy'] = (
             "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com; "
-            "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
-            "font-src 'self' https://fonts.gstatic.com; "
+            "script-src 'self' 'unsafe-inline'; "
+            "style-src 'self' 'unsafe-inline'; "
+            "font-src 'self'; "
             "img-src 'self' data: blob:; "
             "connect-src 'self';"
         )
@@ -44,54 +97,135 @@ class SecurityHeadersMiddleware:
         return response
 
 
-class RateLimitMiddleware:
+class RateLimitMiddleware(HybridMiddleware):
     """
-    Middleware básico de rate limiting para formularios
+    Middleware de rate limiting para formularios.
+    Aplica los límites de settings.RATE_LIMITING por endpoint usando el
+    backend de settings.RATE_LIMIT_BACKEND (ver memories/ratelimit.py).
     """
     
+    # Nombre de URL -> regla de RATE_LIMITING; el resto de POST usa 'DEFAULT'
+    SCOPES = {
+        'login': 'LOGIN_ATTEMPTS',
+        'register': 'REGISTRATION_ATTEMPTS',
+        'create_memory': 'MEMORY_CREATION',
+        'new_memory': 'MEMORY_CREATION',
+    }
+    
     def __init__(self, get_response):
-        self.get_response = get_response
-        self.attempts = {}  # En producción usar Redis o base de datos
+        super().__init__(get_response)
+        self.rules = getattr(settings, 'RATE_LIMITING', {})
+        backend_class = import_string(
+            getattr(settings, 'RATE_LIMIT_BACKEND', 'memories.ratelimit.LocalRateLimitBackend')
+        )
+        self.backend = backend_class()
 
-    def __call__(self, request):
-        # Rate limiting básico para POST requests
+    def needs_thread(self, request):
+        # El backend puede consultar el cache compartido
+        return request.method == 'POST'
+    
+    def process_request(self, request):
+        # Rate limiting para POST requests
         if request.method == 'POST':
-            ip = self.get_client_ip(request)
-            current_time = time.time()
-            
-            # Limpiar intentos antiguos (más de 1 hora)
-            self.attempts = {
-                k: v for k, v in self.attempts.items() 
-                if current_time - v['last_attempt'] < 3600
-            }
-            
-            if ip in self.attempts:
-                attempts_data = self.attempts[ip]
-                time_diff = current_time - attempts_data['last_attempt']
-                
-                # Máximo 10 intentos por hora
-                if attempts_data['count'] >= 10 and time_diff < 3600:
+            scope = self.get_scope(request)
+            rule = self.rules.get(scope)
+            if rule:
+                key = f'{scope}:{self.get_client_ip(request)}'
+                if not self.backend.hit(key, **rule):
                     return HttpResponseTooManyRequests(
                         "Demasiados intentos. Intenta de nuevo más tarde."
                     )
-                
-                # Reset counter si ha pasado más de 1 hora
-                if time_diff >= 3600:
-                    self.attempts[ip] = {'count': 1, 'last_attempt': current_time}
-                else:
-                    self.attempts[ip]['count'] += 1
-                    self.attempts[ip]['last_attempt'] = current_time
-            else:
-                self.attempts[ip] = {'count': 1, 'last_attempt': current_time}
-        
-        response = self.get_response(request)
-        return response
+        return None
+    
+    def get_scope(self, request):
+        """Regla de rate limiting que corresponde a la URL"""
+        try:
+            url_name = resolve(request.path_info).url_name
+        except Resolver404:
+            url_name = None
+        return self.SCOPES.get(url_name, 'DEFAULT')
     
     def get_client_ip(self, request):
         """Obtener IP del cliente"""
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
+            ip = x_forwarded_for.split(',')[0].strip()
         else:
             ip = request.META.get('REMOTE_ADDR')
-        return ip
\ No newline at end of file
+        return ip
+
+
+class SignedMediaMiddleware(HybridMiddleware):
+    """
+    Middleware que envía las imágenes con URL firmada vigente (ver
+    memories/media.py) sin pasar por la sesión, el usuario ni la base: una
+    línea de tiempo con 12 imágenes cuesta 12 HMAC y ninguna consulta.
+    Va antes de SessionMiddleware; el resto sigue hasta MediaFileView.
+    """
+    
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.prefix = settings.MEDIA_URL
+    
+    def needs_thread(self, request):
+        # stat() y open() del archivo
+        return request.path_info.startswith(self.prefix)
+    
+    def process_request(self, request):
+        if request.method not in ('GET', 'HEAD') or not request.path_info.startswith(self.prefix):
+            return None
+        name = request.path_info[len(self.prefix):]
+        if signed_owner(request, name) is None:
+            return None
+        request.resolver_match = resolve(request.path_info)  # Para agrupar las métricas
+        return serve_media(request, name)
+
+
+class ReplicaStickyMiddleware(HybridMiddleware):
+    """
+    Middleware que, tras un POST de un usuario autenticado, marca en la
+    sesión que sus lecturas vayan a la primaria por unos segundos
+    (ver memories/routers.py). Va después de SessionMiddleware y
+    AuthenticationMiddleware.
+    """
+    
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+    
+    def needs_thread(self, request):
+        # Sin réplicas no hace falta tocar la sesión
+        return request.method not in self.SAFE_METHODS and bool(get_replicas())
+    
+    def process_response(self, request, response):
+        if self.needs_thread(request):
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                mark_primary_sticky(request)
+        
+        return response
+
+
+class MetricsMiddleware(HybridMiddleware):
+    """
+    Middleware que mide cada petición: latencia, consultas SQL y su tiempo,
+    hits/misses de cache y tamaño de respuesta, agrupados por vista
+    (ver memories/metrics.py). Va primero para medir a todos los demás.
+    """
+    
+    def process_request(self, request):
+        # Las consultas se cuentan en metrics.count_query, instalado en cada conexión
+        request._metrics_started = time.perf_counter()
+        request._metrics, request._metrics_token = metrics.start_request()
+        return None
+    
+    def process_response(self, request, response):
+        request_metrics = request._metrics
+        metrics.end_request(request._metrics_token)
+        
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        size = None if response.streaming else len(response.content)
+        metrics.record_request(
+            view, request.method, response.status_code,
+            time.perf_counter() - request._metrics_started, request_metrics, size
+        )
+        return response
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:32
+
+from django.db import migrations, models
+import memories.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memories', '0003_alter_memory_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memory',
+            name='medium',
+            field=models.ImageField(blank=True, editable=False, help_text='Versión intermedia para la vista de detalle', upload_to=memories.models.memory_image_upload_path, verbose_name='Imagen mediana'),
+        ),
+        migrations.AddField(
+            model_name='memory',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, help_text='Versión reducida para la línea de tiempo', upload_to=memories.models.memory_image_upload_path, verbose_name='Miniatura'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memories', '0004_memory_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memory',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('processing', 'Procesando'), ('ready', 'Lista'), ('failed', 'Error')], default='ready', editable=False, help_text='Estado de la generación de derivados de la imagen', max_length=20, verbose_name='Estado de procesamiento'),
+        ),
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En ejecución'), ('done', 'Terminado'), ('failed', 'Fallido')], default='pending', max_length=20, verbose_name='Estado')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('error', models.TextField(blank=True, verbose_name='Último error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Inicio')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fin')),
+                ('memory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_jobs', to='memories.memory', verbose_name='Recuerdo')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de imagen',
+                'verbose_name_plural': 'Trabajos de imagen',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='memories_im_status_08e063_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memories', '0005_image_jobs'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='memory',
+            name='memories_me_user_id_ec584d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='memory',
+            index=models.Index(fields=['user', '-date', '-created_at', '-id'], name='memories_user_timeline_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('memories', '0006_timeline_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memory',
+            name='image_size',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Tamaño en bytes de la imagen original', verbose_name='Tamaño de la imagen'),
+        ),
+        migrations.CreateModel(
+            name='UserMemoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('memory_count', models.IntegerField(default=0, verbose_name='Cantidad de recuerdos')),
+                ('earliest_date', models.DateField(blank=True, null=True, verbose_name='Recuerdo más antiguo')),
+                ('latest_date', models.DateField(blank=True, null=True, verbose_name='Recuerdo más reciente')),
+                ('total_image_bytes', models.BigIntegerField(default=0, verbose_name='Bytes totales de imágenes')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='memory_stats', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Estadísticas de usuario',
+                'verbose_name_plural': 'Estadísticas de usuarios',
+            },
+        ),
+    ]
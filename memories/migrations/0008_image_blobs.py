@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:51
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import memories.models
+import memories.storage
+import memories.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memories', '0007_user_memory_stats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='memory',
+            name='image',
+            field=models.ImageField(help_text='Imagen del recuerdo (JPG, PNG, GIF, WEBP - máximo 5MB)', storage=memories.storage.ContentAddressedStorage(), upload_to=memories.models.memory_image_upload_path, validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png', 'gif', 'webp']), memories.validators.ImageValidator()], verbose_name='Imagen'),
+        ),
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('name', models.CharField(max_length=255, verbose_name='Nombre en el storage')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='Tamaño en bytes')),
+                ('ref_count', models.IntegerField(default=0, verbose_name='Referencias')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+            ],
+            options={
+                'verbose_name': 'Archivo de imagen',
+                'verbose_name_plural': 'Archivos de imagen',
+                'indexes': [models.Index(condition=models.Q(('ref_count__lte', 0)), fields=['ref_count'], name='memories_orphan_blob_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='memory',
+            name='blob',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Archivo de imagen (compartido entre recuerdos con los mismos bytes)', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='memories', to='memories.imageblob', verbose_name='Archivo compartido'),
+        ),
+    ]
@@ -0,0 +1,83 @@
+from django.db import migrations
+
+
+FTS_TABLE = 'memories_memory_fts'
+
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, description, owner,
+        content='', prefix='2 3 4', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON memories_memory BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, owner)
+        VALUES (new.id, new.title, new.description, 'u' || new.user_id);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON memories_memory BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, owner)
+        VALUES ('delete', old.id, old.title, old.description, 'u' || old.user_id);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF title, description, user_id
+        ON memories_memory BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, owner)
+        VALUES ('delete', old.id, old.title, old.description, 'u' || old.user_id);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, owner)
+        VALUES (new.id, new.title, new.description, 'u' || new.user_id);
+    END""",
+    f"""INSERT INTO {FTS_TABLE}(rowid, title, description, owner)
+        SELECT id, title, description, 'u' || user_id FROM memories_memory""",
+]
+
+SQLITE_BACKWARD = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+POSTGRES_FORWARD = [
+    """CREATE INDEX memories_memory_search_idx ON memories_memory USING gin (
+        to_tsvector('spanish', coalesce(title, '') || ' ' || coalesce(description, ''))
+    )""",
+]
+
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS memories_memory_search_idx',
+]
+
+
+def sqlite_has_fts5(cursor):
+    cursor.execute('PRAGMA compile_options')
+    return any('FTS5' in row[0] for row in cursor.fetchall())
+
+
+def run_statements(schema_editor, sqlite, postgres):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = postgres
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            # Sin FTS5 la búsqueda usa icontains (ver memories/search.py)
+            statements = sqlite if sqlite_has_fts5(cursor) else []
+    else:
+        statements = []
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    run_statements(schema_editor, SQLITE_FORWARD, POSTGRES_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    run_statements(schema_editor, SQLITE_BACKWARD, POSTGRES_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memories', '0008_image_blobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memories', '0009_memory_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memory',
+            name='image_height',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Alto en píxeles de la imagen original', verbose_name='Alto de la imagen'),
+        ),
+        migrations.AddField(
+            model_name='memory',
+            name='image_width',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Ancho en píxeles de la imagen original', verbose_name='Ancho de la imagen'),
+        ),
+        migrations.AddField(
+            model_name='memory',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False, help_text='Versión diminuta de la imagen (data URI) que se muestra mientras carga', verbose_name='Placeholder'),
+        ),
+    ]
@@ -12,6 +12,16 @@ from .validators import (
     validate_memory_title,
     validate_memory_description
 )
+from .images import (
+    RENDITIONS,
+    SUMMARY_FIELDS,
+    describe_image,
+    generate_derivatives,
+    normalization_options,
+    normalize_image,
+)
+from .storage import ContentAddressedStorage
+from .media import media_url
 
 
 def memory_image_upload_path(instance, filename):
@@ -33,6 +43,17 @@ class Memory(models.Model):
     Modelo que representa un recuerdo con foto, título, descripción y fecha.
     Cada recuerdo pertenece a un usuario específico.
     """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    PROCESSING_STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_PROCESSING, 'Procesando'),
+        (STATUS_READY, 'Lista'),
+        (STATUS_FAILED, 'Error'),
+    ]
+
     user = models.ForeignKey(
         User, 
         on_delete=models.CASCADE,
@@ -53,8 +74,10 @@ class Memory(models.Model):
         validators=[validate_memory_description]
     )
     
+    # El storage renombra el archivo con el hash de su contenido (ver memories/storage.py)
     image = models.ImageField(
         upload_to=memory_image_upload_path,
+        storage=ContentAddressedStorage(),
         verbose_name="Imagen",
         help_text="Imagen del recuerdo (JPG, PNG, GIF, WEBP - máximo 5MB)",
         validators=[
@@ -63,6 +86,72 @@ class Memory(models.Model):
         ]
     )
     
+    blob = models.ForeignKey(
+        'ImageBlob',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='memories',
+        verbose_name="Archivo compartido",
+        help_text="Archivo de imagen (compartido entre recuerdos con los mismos bytes)"
+    )
+    
+    # Derivados generados al subir la imagen (ver memories/images.py)
+    thumbnail = models.ImageField(
+        upload_to=memory_image_upload_path,
+        blank=True,
+        editable=False,
+        verbose_name="Miniatura",
+        help_text="Versión reducida para la línea de tiempo"
+    )
+    
+    medium = models.ImageField(
+        upload_to=memory_image_upload_path,
+        blank=True,
+        editable=False,
+        verbose_name="Imagen mediana",
+        help_text="Versión intermedia para la vista de detalle"
+    )
+    
+    image_size = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Tamaño de la imagen",
+        help_text="Tamaño en bytes de la imagen original"
+    )
+    
+    # Tamaño intrínseco (ya orientado) y placeholder de la imagen (ver images.image_summary)
+    image_width = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Ancho de la imagen",
+        help_text="Ancho en píxeles de la imagen original"
+    )
+    
+    image_height = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Alto de la imagen",
+        help_text="Alto en píxeles de la imagen original"
+    )
+    
+    placeholder = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Placeholder",
+        help_text="Versión diminuta de la imagen (data URI) que se muestra mientras carga"
+    )
+    
+    processing_status = models.CharField(
+        max_length=20,
+        choices=PROCESSING_STATUS_CHOICES,
+        default=STATUS_READY,
+        editable=False,
+        verbose_name="Estado de procesamiento",
+        help_text="Estado de la generación de derivados de la imagen"
+    )
+    
     date = models.DateField(
         verbose_name="Fecha del recuerdo",
         help_text="Fecha en que ocurrió el recuerdo",
@@ -84,12 +173,20 @@ class Memory(models.Model):
         verbose_name_plural = "Recuerdos"
         ordering = ['-date', '-created_at']  # Ordenar por fecha del recuerdo (más reciente primero)
         indexes = [
-            models.Index(fields=['user', '-date']),  # Índice para consultas por usuario y fecha
+            # Índice para consultas por usuario y fecha; created_at e id permiten paginar por cursor
+            models.Index(fields=['user', '-date', '-created_at', '-id'], name='memories_user_timeline_idx'),
         ]
 
     def __str__(self):
         return f"{self.title} - {self.date}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Recordar los valores cargados para calcular diferencias al guardar"""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def get_absolute_url(self):
         return reverse('memories:timeline')
 
@@ -104,6 +201,303 @@ class Memory(models.Model):
             })
 
     def save(self, *args, **kwargs):
-        """Sobrescribir save para ejecutar validaciones"""
-        self.full_clean()
+        """
+        Sobrescribir save para ejecutar validaciones y generar derivados
+        cuando se sube una imagen nueva.
+        Los guardados parciales (update_fields) no modifican campos validados.
+        """
+        from .blobs import acquire_blob, release_blob, shared_derivatives
+        from .jobs import enqueue_image_processing
+
+        if kwargs.get('update_fields') is None:
+            self.full_clean()
+        image_changed = bool(self.image) and not self.image._committed
+        previous_blob_id = self.blob_id
+        shared = None
+        if image_changed:
+            if previous_blob_id is None:
+                # Imagen anterior sin blob: sus derivados no son compartidos
+                for field_name in RENDITIONS:
+                    previous = getattr(self, field_name)
+                    if previous:
+                        previous.delete(save=False)
+            # Guardar el archivo ahora: su nombre depende del contenido
+            self.image.save(self.image.name, self.image.file, save=False)
+            self.image_size = self.image.size
+            self.blob = acquire_blob(self.image.name, self.image_size)
+            # Si otro recuerdo ya procesó los mismos bytes, reutilizar sus derivados
+            shared = shared_derivatives(self.blob_id, exclude_pk=self.pk)
+            for field_name in (*RENDITIONS, *SUMMARY_FIELDS):
+                default = self._meta.get_field(field_name).get_default()
+                setattr(self, field_name, shared[field_name] if shared else default)
+            self.processing_status = self.STATUS_READY if shared else self.STATUS_PENDING
         super().save(*args, **kwargs)
+        self._loaded_values = {
+            'user_id': self.user_id,
+            'date': self.date,
+            'image_size': self.image_size,
+        }
+        if image_changed:
+            if previous_blob_id is not None:
+                release_blob(previous_blob_id)
+            if not shared:
+                enqueue_image_processing(self)
+
+    def normalize_image(self):
+        """
+        Reemplazar el original por su versión recodificada (ver
+        images.normalize_image). Retorna True si se reemplazó.
+        """
+        from django.core.files.base import ContentFile
+        from .blobs import acquire_blob, release_blob
+
+        options = normalization_options()
+        if options is None:
+            return False
+        storage = self.image.storage
+        with storage.open(self.image.name, 'rb') as stored:
+            result = normalize_image(stored, storage.size(self.image.name), options)
+        if result is None:
+            return False
+
+        content, ext = result
+        previous_blob_id = self.blob_id
+        # El nombre sale del hash de los bytes nuevos: la misma foto normalizada se comparte
+        self.image = storage.save(f'memories/normalized{ext}', ContentFile(content))
+        self.image_size = len(content)
+        self.blob = acquire_blob(self.image.name, self.image_size)
+        self.save(update_fields=['image', 'image_size', 'blob', 'updated_at'])
+        if previous_blob_id is not None:
+            release_blob(previous_blob_id)
+        return True
+
+    def generate_derivatives(self):
+        """Generar miniatura, versión media y placeholder a partir de la imagen original"""
+        names = generate_derivatives(self.image, self.thumbnail.storage)
+        for field_name, name in names.items():
+            setattr(self, field_name, name)
+        with self.image.storage.open(self.image.name, 'rb') as stored:
+            summary = describe_image(stored)
+        for field_name, value in summary.items():
+            setattr(self, field_name, value)
+        self.processing_status = self.STATUS_READY
+        # updated_at cambia para invalidar validadores HTTP (ETag / Last-Modified)
+        self.save(update_fields=[*names, *summary, 'processing_status', 'updated_at'])
+
+    def release_image(self):
+        """
+        Soltar la imagen al eliminar el recuerdo: los archivos compartidos solo
+        se borran cuando ningún otro recuerdo los usa
+        """
+        from .blobs import release_blob
+
+        if self.blob_id is not None:
+            release_blob(self.blob_id)
+        else:
+            self.delete_image_files()
+
+    def delete_image_files(self):
+        """Eliminar del storage la imagen original y sus derivados (sin mirar referencias)"""
+        for field_name in ('image', *RENDITIONS):
+            field_file = getattr(self, field_name)
+            if field_file:
+                field_file.delete(save=False)
+
+    @property
+    def is_processing(self):
+        """Indica si la imagen aún se está procesando en segundo plano"""
+        return self.processing_status in (self.STATUS_PENDING, self.STATUS_PROCESSING)
+
+    def signed_url(self, field_file):
+        """URL de un archivo del recuerdo, firmada para su dueño (ver memories/media.py)"""
+        return media_url(field_file.name, self.user_id)
+
+    @property
+    def image_url(self):
+        """URL de la imagen original"""
+        return self.signed_url(self.image)
+
+    @property
+    def thumbnail_url(self):
+        """URL de la miniatura, o del original si aún no existe"""
+        return self.signed_url(self.thumbnail or self.image)
+
+    @property
+    def medium_url(self):
+        """URL de la versión media, o del original si aún no existe"""
+        return self.signed_url(self.medium or self.image)
+
+    @property
+    def srcset(self):
+        """Atributo srcset con los derivados disponibles"""
+        candidates = [
+            f'{self.signed_url(getattr(self, field_name))} {width}w'
+            for field_name, width in RENDITIONS.items()
+            if getattr(self, field_name)
+        ]
+        return ', '.join(candidates)
+
+
+
+class ImageBlob(models.Model):
+    """
+    Archivo de imagen guardado una sola vez y compartido por todos los
+    recuerdos con los mismos bytes. Ver memories/blobs.py.
+    """
+    digest = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name="SHA-256"
+    )
+    
+    name = models.CharField(
+        max_length=255,
+        verbose_name="Nombre en el storage"
+    )
+    
+    size = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Tamaño en bytes"
+    )
+    
+    ref_count = models.IntegerField(
+        default=0,
+        verbose_name="Referencias"
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Fecha de creación"
+    )
+
+    class Meta:
+        verbose_name = "Archivo de imagen"
+        verbose_name_plural = "Archivos de imagen"
+        indexes = [
+            # Solo los huérfanos: la limpieza no recorre el directorio de media
+            models.Index(
+                fields=['ref_count'],
+                name='memories_orphan_blob_idx',
+                condition=models.Q(ref_count__lte=0),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.ref_count} referencias)"
+
+
+class UserMemoryStats(models.Model):
+    """
+    Estadísticas desnormalizadas de los recuerdos de cada usuario.
+    Se mantienen con señales de Memory (ver memories/stats.py) para que contar
+    recuerdos sea una lectura O(1) en lugar de un COUNT(*) por petición.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='memory_stats',
+        verbose_name="Usuario"
+    )
+    
+    memory_count = models.IntegerField(
+        default=0,
+        verbose_name="Cantidad de recuerdos"
+    )
+    
+    earliest_date = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name="Recuerdo más antiguo"
+    )
+    
+    latest_date = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name="Recuerdo más reciente"
+    )
+    
+    total_image_bytes = models.BigIntegerField(
+        default=0,
+        verbose_name="Bytes totales de imágenes"
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Fecha de actualización"
+    )
+
+    class Meta:
+        verbose_name = "Estadísticas de usuario"
+        verbose_name_plural = "Estadísticas de usuarios"
+
+    def __str__(self):
+        return f"{self.user} - {self.memory_count} recuerdos"
+
+
+class ImageJob(models.Model):
+    """
+    Trabajo de procesamiento de imagen en la cola persistida en base de datos.
+    Lo consume el comando `python manage.py image_worker`.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_RUNNING, 'En ejecución'),
+        (STATUS_DONE, 'Terminado'),
+        (STATUS_FAILED, 'Fallido'),
+    ]
+
+    memory = models.ForeignKey(
+        Memory,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name="Recuerdo"
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name="Estado"
+    )
+    
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Intentos"
+    )
+    
+    error = models.TextField(
+        blank=True,
+        verbose_name="Último error"
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Fecha de creación"
+    )
+    
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Inicio"
+    )
+    
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Fin"
+    )
+
+    class Meta:
+        verbose_name = "Trabajo de imagen"
+        verbose_name_plural = "Trabajos de imagen"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),  # Búsqueda del siguiente trabajo pendiente
+        ]
+
+    def __str__(self):
+        return f"Trabajo {self.pk} ({self.get_status_display()}) - {self.memory_id}"
@@ -0,0 +1,74 @@
+"""
+Paginación por cursor (keyset) para la línea de tiempo.
+
+En lugar de OFFSET + COUNT(*), cada página continúa desde la última fila
+vista usando el índice (user, -date, -created_at, -id), por lo que la página
+N cuesta lo mismo que la primera.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+# Orden total de la línea de tiempo: el id desempata recuerdos creados a la vez
+TIMELINE_ORDERING = ('-date', '-created_at', '-id')
+
+
+class InvalidCursor(ValueError):
+    """Cursor de paginación mal formado o manipulado"""
+
+
+def encode_cursor(memory):
+    """Codificar la posición de un recuerdo como cursor opaco"""
+    payload = [memory.date.isoformat(), memory.created_at.isoformat(), memory.pk]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decodificar un cursor a la tupla (date, created_at, id)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        memory_date, created_at, pk = json.loads(raw)
+        return date.fromisoformat(memory_date), datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursor(f'Cursor no válido: {cursor!r}') from e
+
+
+def keyset_page(queryset, cursor, page_size):
+    """
+    Obtener una página a partir de un cursor (None para la primera).
+    Retorna una tupla (recuerdos, cursor_siguiente o None).
+    """
+    queryset = queryset.order_by(*TIMELINE_ORDERING)
+    if cursor:
+        memory_date, created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(date__lt=memory_date)
+            | Q(date=memory_date, created_at__lt=created_at)
+            | Q(date=memory_date, created_at=created_at, pk__lt=pk)
+        )
+
+    # Una fila extra indica si existe página siguiente sin contar el total
+    memories = list(queryset[:page_size + 1])
+    if len(memories) > page_size:
+        memories = memories[:page_size]
+        return memories, encode_cursor(memories[-1])
+    return memories, None
+
+
+class KnownCountPaginator(Paginator):
+    """
+    Paginador que recibe el total ya conocido (UserMemoryStats)
+    en lugar de ejecutar COUNT(*) sobre el queryset.
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            # Sustituye a la cached_property Paginator.count
+            self.__dict__['count'] = count
@@ -0,0 +1,116 @@
+"""
+Backends de rate limiting para RateLimitMiddleware.
+
+- LocalRateLimitBackend: ventana deslizante en memoria del proceso, con
+  expiración amortizada O(1) y número máximo de claves. Útil en desarrollo
+  o con un único worker.
+- CacheRateLimitBackend: contadores en el cache de Django (Redis en
+  producción) con incrementos atómicos, compartidos entre todos los
+  workers de gunicorn.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class BaseRateLimitBackend:
+    """
+    Interfaz de los backends: `hit` registra un intento y dice si se permite
+    """
+
+    def hit(self, key, limit, window, block_duration=0, now=None):
+        """
+        Registrar un intento para `key`.
+        Retorna False si se superaron `limit` intentos en `window` segundos
+        o si la clave está bloqueada durante `block_duration` segundos.
+        """
+        raise NotImplementedError
+
+
+class LocalRateLimitBackend(BaseRateLimitBackend):
+    """
+    Ventana deslizante exacta en memoria del proceso
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        # clave -> [ventana, deque de marcas de tiempo, bloqueado_hasta]
+        # Ordenado por último acceso: las entradas más viejas quedan al principio
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window, block_duration=0, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.pop(key, None) or [window, deque(), 0]
+            self._entries[key] = entry  # Mover al final (acceso más reciente)
+            self._evict(now)
+
+            _, hits, blocked_until = entry
+            if now < blocked_until:
+                return False
+
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+
+            if len(hits) >= limit:
+                if block_duration:
+                    entry[2] = now + block_duration
+                return False
+
+            hits.append(now)
+            return True
+
+    def _evict(self, now):
+        """
+        Expiración amortizada: solo se revisan las entradas del principio
+        (las de acceso más antiguo) y se detiene en la primera vigente.
+        """
+        while len(self._entries) > 1:
+            key, (window, hits, blocked_until) = next(iter(self._entries.items()))
+            expired = (not hits or hits[-1] <= now - window) and blocked_until <= now
+            if not expired and len(self._entries) <= self.max_keys:
+                break
+            del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CacheRateLimitBackend(BaseRateLimitBackend):
+    """
+    Ventana deslizante aproximada con dos contadores de ventana fija en el
+    cache compartido: estimado = anterior * (fracción restante) + actual.
+    """
+
+    def __init__(self, alias=None):
+        self.cache = caches[alias or getattr(settings, 'RATE_LIMIT_CACHE', 'default')]
+
+    def hit(self, key, limit, window, block_duration=0, now=None):
+        now = time.time() if now is None else now
+        block_key = f'ratelimit:block:{key}'
+        if self.cache.get(block_key):
+            return False
+
+        bucket = int(now // window)
+        current_key = f'ratelimit:{key}:{bucket}'
+        # add() no sobrescribe si otro worker ya creó el contador
+        self.cache.add(current_key, 0, timeout=window * 2)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # El contador expiró entre add() e incr()
+            self.cache.add(current_key, 1, timeout=window * 2)
+            current = 1
+        previous = self.cache.get(f'ratelimit:{key}:{bucket - 1}', 0)
+
+        elapsed = (now % window) / window
+        estimated = previous * (1 - elapsed) + current
+        if estimated > limit:
+            if block_duration:
+                self.cache.set(block_key, 1, timeout=block_duration)
+            return False
+        return True
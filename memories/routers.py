@@ -0,0 +1,75 @@
+"""
+Enrutamiento de lecturas a réplicas de la base de datos.
+
+Las escrituras y la mayoría de las lecturas van a 'default' (la primaria).
+Solo las vistas de lectura marcadas con ReplicaReadMixin (ver views.py)
+leen de una réplica de settings.DATABASE_REPLICAS, y únicamente si el
+usuario no escribió nada en los últimos REPLICA_STICKY_SECONDS: tras un
+POST la sesión guarda hasta cuándo leer de la primaria, para que el
+usuario vea sus propios cambios aunque la réplica vaya atrasada.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+# Clave de sesión con el instante hasta el que se lee de la primaria
+STICKY_SESSION_KEY = '_db_primary_until'
+
+# contextvars en lugar de threading.local: también aísla peticiones ASGI
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def get_replicas():
+    """Alias de las réplicas configuradas"""
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+@contextmanager
+def replica_reads():
+    """Dentro del bloque, las lecturas van a una réplica"""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def mark_primary_sticky(request):
+    """Leer de la primaria durante un tiempo tras una escritura del usuario"""
+    window = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+    request.session[STICKY_SESSION_KEY] = time.time() + window
+
+
+def is_primary_sticky(request):
+    """El usuario escribió hace poco y debe leer de la primaria"""
+    session = getattr(request, 'session', None)
+    if session is None:
+        return False
+    return session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+
+class ReplicaRouter:
+    """
+    Router de Django: lecturas a réplica solo dentro de replica_reads(),
+    todo lo demás a la primaria
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if replicas and _replica_reads.get():
+            return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaria y réplicas tienen los mismos datos
+        databases = {'default', *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
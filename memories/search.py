@@ -0,0 +1,230 @@
+"""
+Búsqueda de texto completo en títulos y descripciones de recuerdos.
+
+- SQLite: tabla virtual FTS5 sin contenido (memories_memory_fts) que los
+  triggers de la migración 0009 mantienen al insertar, editar o eliminar
+  recuerdos, también desde bulk_create o SQL directo. Cada fila lleva el
+  token del dueño (u<id>) para filtrar por usuario dentro del mismo índice.
+- PostgreSQL: índice GIN sobre to_tsvector('spanish', ...), que la base
+  actualiza sola.
+- Otras bases: icontains por término (sin índice).
+
+Los términos se combinan con AND; el último se busca como prefijo para
+encontrar resultados mientras se escribe ("viaj" encuentra "viaje").
+
+En SQLite se ordena con bm25() de FTS5 dentro de la misma consulta, con el
+dueño en la expresión MATCH: solo se puntúan las coincidencias del usuario,
+todas, y la base devuelve ya la página pedida (ver benchmark_search).
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Memory
+
+
+FTS_TABLE = 'memories_memory_fts'
+
+# Peso de cada columna en bm25(): el título pesa más que la descripción
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Configuración de texto de PostgreSQL (debe coincidir con el índice)
+POSTGRES_CONFIG = 'spanish'
+POSTGRES_DOCUMENT = (
+    f"to_tsvector('{POSTGRES_CONFIG}', "
+    "coalesce(memories_memory.title, '') || ' ' || coalesce(memories_memory.description, ''))"
+)
+
+# Límites para que una búsqueda no pueda volverse costosa
+MAX_TERMS = 8
+MIN_TERM_LENGTH = 2
+SEARCH_LIMIT = 48
+
+# Esquema FTS5 (copiado en la migración 0009 y usado por benchmark_search)
+SQLITE_FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, description, owner,
+        content='', prefix='2 3 4', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON memories_memory BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, owner)
+        VALUES (new.id, new.title, new.description, 'u' || new.user_id);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON memories_memory BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, owner)
+        VALUES ('delete', old.id, old.title, old.description, 'u' || old.user_id);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF title, description, user_id
+        ON memories_memory BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, owner)
+        VALUES ('delete', old.id, old.title, old.description, 'u' || old.user_id);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, owner)
+        VALUES (new.id, new.title, new.description, 'u' || new.user_id);
+    END""",
+]
+
+SQLITE_REINDEX_SQL = [
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')",
+    f"""INSERT INTO {FTS_TABLE}(rowid, title, description, owner)
+        SELECT id, title, description, 'u' || user_id FROM memories_memory""",
+]
+
+# Peso 0 para la columna del dueño; empates: el más reciente primero
+SQLITE_SEARCH_SQL = (
+    f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+    f'ORDER BY bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}, 0.0), rowid DESC '
+    'LIMIT %s OFFSET %s'
+)
+
+
+def normalize(text):
+    """Minúsculas y sin tildes, igual que el tokenizador de FTS5"""
+    text = (text or '').lower()
+    if text.isascii():
+        return text
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def parse_terms(query):
+    """Palabras de la búsqueda normalizadas, sin operadores ni comillas"""
+    terms = [term for term in re.findall(r'\w+', normalize(query)) if len(term) >= MIN_TERM_LENGTH]
+    return list(dict.fromkeys(terms))[:MAX_TERMS]
+
+
+def fts_query(terms, user_id=None):
+    """
+    Expresión MATCH de FTS5: cada término entre comillas (así AND, OR o
+    NEAR se buscan como palabras) y el último como prefijo completo. Los
+    prefijos de 2 a 4 letras usan su índice (prefix='2 3 4'); los más largos
+    recorren el rango de términos del índice principal.
+    """
+    phrases = [f'"{term}"' for term in terms[:-1]]
+    phrases.append(f'"{terms[-1]}"*')
+    expression = '{title description} : (' + ' AND '.join(phrases) + ')'
+    if user_id is not None:
+        expression = f'owner : u{int(user_id)} AND {expression}'
+    return expression
+
+
+def tsquery(terms):
+    """Expresión para to_tsquery de PostgreSQL con prefijos"""
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def search_backend():
+    """'fts5', 'postgresql' o 'basic' según la base de datos en uso"""
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite' and fts_table_exists():
+        return 'fts5'
+    return 'basic'
+
+
+_fts_table_exists = {}
+
+
+def fts_table_exists():
+    """La tabla FTS5 existe (la migración la omite si SQLite no tiene FTS5)"""
+    name = connection.settings_dict['NAME']
+    if name not in _fts_table_exists:
+        _fts_table_exists[name] = FTS_TABLE in connection.introspection.table_names()
+    return _fts_table_exists[name]
+
+
+def ensure_search_triggers(using='default'):
+    """
+    Recrear los triggers FTS5 si faltan y reindexar. SQLite reconstruye la
+    tabla memories_memory en algunos AlterField y con ella borra sus
+    triggers; se llama después de cada migrate (ver signals.py).
+    """
+    from django.db import connections
+
+    database = connections[using]
+    if database.vendor != 'sqlite':
+        return False
+    with database.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            [f'{FTS_TABLE}%'],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE not in existing:
+            return False
+        missing = [
+            statement for statement in SQLITE_FTS_SCHEMA[1:]
+            if statement.split()[2] not in existing
+        ]
+        if not missing:
+            return False
+        for statement in missing + SQLITE_REINDEX_SQL:
+            cursor.execute(statement)
+    return True
+
+
+def search_memories(user, query, limit=SEARCH_LIMIT, offset=0):
+    """
+    Recuerdos del usuario que contienen todas las palabras de la búsqueda,
+    los más relevantes primero
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return []
+
+    queryset = Memory.objects.filter(user=user)
+    backend = search_backend()
+    if backend == 'fts5':
+        with connection.cursor() as cursor:
+            cursor.execute(SQLITE_SEARCH_SQL, [fts_query(terms, user.pk), limit, offset])
+            ids = [row[0] for row in cursor.fetchall()]
+        memories = queryset.in_bulk(ids)
+        return [memories[pk] for pk in ids if pk in memories]
+
+    if backend == 'postgresql':
+        queryset = queryset.filter(postgres_match(terms)).annotate(
+            search_rank=RawSQL(
+                f"ts_rank({POSTGRES_DOCUMENT}, to_tsquery('{POSTGRES_CONFIG}', %s))",
+                [tsquery(terms)],
+                output_field=FloatField(),
+            )
+        ).order_by('-search_rank', '-date', '-id')
+    else:
+        queryset = queryset.filter(basic_match(terms)).order_by('-date', '-id')
+    return list(queryset[offset:offset + limit])
+
+
+def filter_search(queryset, query):
+    """
+    Filtrar un queryset de Memory por las palabras de la búsqueda, sin
+    ordenar por relevancia (para el admin, que busca en todos los usuarios)
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return queryset
+    backend = search_backend()
+    if backend == 'fts5':
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [fts_query(terms)]
+        ))
+    if backend == 'postgresql':
+        return queryset.filter(postgres_match(terms))
+    return queryset.filter(basic_match(terms))
+
+
+def postgres_match(terms):
+    return RawSQL(
+        f"{POSTGRES_DOCUMENT} @@ to_tsquery('{POSTGRES_CONFIG}', %s)",
+        [tsquery(terms)],
+        output_field=BooleanField(),
+    )
+
+
+def basic_match(terms):
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return condition
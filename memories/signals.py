@@ -0,0 +1,46 @@
+"""
+Señales de la aplicación de recuerdos
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .cache import bump_timeline_version
+from .models import Memory
+from .stats import record_memory_deleted, record_memory_saved
+
+
+def invalidate_timeline(user_id):
+    """
+    Invalidar la línea de tiempo cacheada del usuario.
+    Se repite al confirmar la transacción para que una petición concurrente
+    no vuelva a cachear el estado anterior con la versión nueva.
+    """
+    bump_timeline_version(user_id)
+    transaction.on_commit(lambda: bump_timeline_version(user_id))
+
+
+@receiver(post_save, sender=Memory)
+def memory_saved(sender, instance, created, raw=False, **kwargs):
+    """Mantener las estadísticas del usuario al guardar un recuerdo"""
+    if raw:
+        return  # Carga de fixtures
+    record_memory_saved(instance, created)
+    invalidate_timeline(instance.user_id)
+
+
+@receiver(post_delete, sender=Memory)
+def memory_deleted(sender, instance, **kwargs):
+    """Mantener estadísticas y referencias de imagen al eliminar un recuerdo"""
+    record_memory_deleted(instance)
+    instance.release_image()
+    invalidate_timeline(instance.user_id)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using='default', **kwargs):
+    """Recrear los triggers de búsqueda si una migración reconstruyó la tabla"""
+    if sender.name != 'memories':
+        return
+    from .search import ensure_search_triggers
+    ensure_search_triggers(using)
@@ -0,0 +1,54 @@
+"""
+Ajustes de SQLite por conexión (PRAGMA) para servir con varios workers.
+
+Django abre una conexión por worker e hilo; al crearla se aplican los
+PRAGMA de settings.SQLITE_PRAGMAS (ver timeline_love/optimizations.py):
+
+- journal_mode=WAL: los lectores no bloquean al escritor ni al revés.
+- synchronous=NORMAL: con WAL no corrompe la base; solo fsync en checkpoints.
+- busy_timeout: espera al lock de escritura en vez de fallar con
+  "database is locked".
+- mmap_size, cache_size y temp_store: menos lecturas de disco por consulta.
+"""
+from django.conf import settings
+
+
+# Orden en que se aplican: journal_mode primero, porque synchronous=NORMAL
+# solo es seguro en modo WAL
+PRAGMA_ORDER = ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size', 'temp_store')
+
+
+def pragma_statements(pragmas):
+    """Sentencias PRAGMA para un diccionario {nombre: valor}"""
+    names = sorted(pragmas, key=lambda name: (
+        PRAGMA_ORDER.index(name) if name in PRAGMA_ORDER else len(PRAGMA_ORDER), name
+    ))
+    statements = []
+    for name in names:
+        value = pragmas[name]
+        if value is None:
+            continue
+        if not name.replace('_', '').isalnum() or not str(value).lstrip('-').replace('_', '').isalnum():
+            raise ValueError(f'PRAGMA no válido: {name}={value!r}')
+        statements.append(f'PRAGMA {name}={value}')
+    return statements
+
+
+def apply_pragmas(cursor, pragmas):
+    """Ejecutar los PRAGMA en una conexión abierta"""
+    for statement in pragma_statements(pragmas):
+        cursor.execute(statement)
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Receptor de connection_created: ajustar cada conexión SQLite nueva"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if not pragmas:
+        return
+    # Las bases en memoria (tests) no admiten WAL ni mmap
+    if connection.is_in_memory_db():
+        pragmas = {name: value for name, value in pragmas.items() if name not in ('journal_mode', 'mmap_size')}
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, pragmas)
@@ -0,0 +1,98 @@
+"""
+Mantenimiento de las estadísticas desnormalizadas por usuario (UserMemoryStats).
+
+Cada cambio de Memory se traduce en un UPDATE atómico con expresiones F(),
+de modo que escrituras concurrentes de distintos workers no pierden conteos.
+"""
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from .models import Memory, UserMemoryStats
+
+
+def rebuild_user_stats(user_id):
+    """Recalcular desde cero las estadísticas de un usuario"""
+    totals = Memory.objects.filter(user_id=user_id).aggregate(
+        memory_count=Count('pk'),
+        earliest_date=Min('date'),
+        latest_date=Max('date'),
+        total_image_bytes=Coalesce(Sum('image_size'), 0),
+    )
+    stats, _ = UserMemoryStats.objects.update_or_create(user_id=user_id, defaults=totals)
+    return stats
+
+
+def get_user_stats(user):
+    """Obtener las estadísticas de un usuario, creándolas si aún no existen"""
+    stats = UserMemoryStats.objects.filter(user=user).first()
+    if stats is None:
+        stats = rebuild_user_stats(user.pk)
+    return stats
+
+
+async def aget_user_stats(user):
+    """Versión async de get_user_stats (vistas ASGI)"""
+    stats = await UserMemoryStats.objects.filter(user=user).afirst()
+    if stats is None:
+        stats = await sync_to_async(rebuild_user_stats)(user.pk)
+    return stats
+
+
+def _refresh_date_bounds(user_id):
+    """Recalcular fecha mínima y máxima (dos búsquedas sobre el índice user, -date)"""
+    bounds = Memory.objects.filter(user_id=user_id).aggregate(
+        earliest_date=Min('date'),
+        latest_date=Max('date'),
+    )
+    UserMemoryStats.objects.filter(user_id=user_id).update(**bounds)
+
+
+def record_memory_saved(memory, created):
+    """Actualizar las estadísticas tras crear o modificar un recuerdo"""
+    loaded = getattr(memory, '_loaded_values', {})
+
+    with transaction.atomic():
+        if not UserMemoryStats.objects.filter(user_id=memory.user_id).exists():
+            # Primer registro del usuario: el agregado ya incluye este recuerdo
+            rebuild_user_stats(memory.user_id)
+            return
+
+        if created:
+            UserMemoryStats.objects.filter(user_id=memory.user_id).update(
+                memory_count=F('memory_count') + 1,
+                total_image_bytes=F('total_image_bytes') + memory.image_size,
+                earliest_date=Least(Coalesce('earliest_date', Value(memory.date)), Value(memory.date)),
+                latest_date=Greatest(Coalesce('latest_date', Value(memory.date)), Value(memory.date)),
+                updated_at=timezone.now(),
+            )
+            return
+
+        previous_user_id = loaded.get('user_id', memory.user_id)
+        if previous_user_id != memory.user_id:
+            # Reasignado a otro usuario desde el admin
+            rebuild_user_stats(previous_user_id)
+            rebuild_user_stats(memory.user_id)
+            return
+
+        size_delta = memory.image_size - loaded.get('image_size', memory.image_size)
+        UserMemoryStats.objects.filter(user_id=memory.user_id).update(
+            total_image_bytes=F('total_image_bytes') + size_delta,
+            updated_at=timezone.now(),
+        )
+        if loaded.get('date', memory.date) != memory.date:
+            _refresh_date_bounds(memory.user_id)
+
+
+def record_memory_deleted(memory):
+    """Actualizar las estadísticas tras eliminar un recuerdo"""
+    with transaction.atomic():
+        updated = UserMemoryStats.objects.filter(user_id=memory.user_id).update(
+            memory_count=F('memory_count') - 1,
+            total_image_bytes=F('total_image_bytes') - memory.image_size,
+            updated_at=timezone.now(),
+        )
+        if updated:
+            _refresh_date_bounds(memory.user_id)
@@ -0,0 +1,90 @@
+"""
+Storage direccionado por contenido para las imágenes originales.
+
+El nombre de cada archivo es el SHA-256 de sus bytes, así la misma foto
+subida dos veces (o por dos usuarios) se guarda una sola vez.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+# Extensiones equivalentes que no deben duplicar el archivo
+EXTENSION_ALIASES = {'.jpeg': '.jpg'}
+
+
+def file_digest(content):
+    """SHA-256 de un archivo leído por bloques"""
+    hasher = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+def content_name(digest, ext, prefix='memories'):
+    """memories/ab/abcdef...123.jpg (dos niveles para no llenar un directorio)"""
+    ext = ext.lower()
+    ext = EXTENSION_ALIASES.get(ext, ext)
+    return f'{prefix}/{digest[:2]}/{digest}{ext}'
+
+
+def digest_from_name(name):
+    """Hash contenido en un nombre generado por content_name"""
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def write_once(media_root, name, content):
+    """Escribir un archivo por contenido si todavía no existe (de forma atómica)"""
+    path = os.path.join(media_root, name)
+    if os.path.exists(path):
+        return
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix='.import')
+    try:
+        with os.fdopen(descriptor, 'wb') as output:
+            output.write(content)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)  # Otro proceso pudo escribir los mismos bytes: da igual
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage que ignora el nombre propuesto y usa el hash del contenido
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        # El upload handler ya calculó el hash mientras recibía el archivo
+        digest = getattr(content, 'content_hash', None) or file_digest(content)
+        name = content_name(digest, os.path.splitext(name)[1])
+        if self.exists(name):
+            return name
+        try:
+            return super().save(name, content, max_length=max_length)
+        except FileExistsError:
+            # Otro proceso guardó los mismos bytes entre medio
+            return name
+
+    def get_available_name(self, name, max_length=None):
+        # El mismo nombre implica el mismo contenido: nunca buscar uno alternativo
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
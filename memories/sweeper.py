@@ -0,0 +1,226 @@
+"""
+Barrido de archivos huérfanos en media/memories.
+
+Los blobs sin referencias se purgan con una consulta (ver memories/blobs.py);
+este barrido encuentra lo que la base de datos no conoce: archivos del
+esquema anterior, derivados de blobs ya eliminados y subidas interrumpidas.
+
+Es incremental: guarda un checkpoint con la marca de tiempo del último
+barrido y en las siguientes ejecuciones solo lista los directorios
+modificados desde entonces y solo considera los archivos más nuevos.
+"""
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .blobs import image_file_names
+from .models import ImageBlob, Memory
+from .upload_handlers import INCOMING_DIR
+
+
+# Archivos más nuevos que esto pueden pertenecer a un guardado en curso
+GRACE_PERIOD = 60 * 60
+
+# Subidas interrumpidas que quedaron en el directorio de recepción
+INCOMING_MAX_AGE = 24 * 60 * 60
+
+# Filas leídas por consulta al cargar los nombres en uso
+CHUNK_SIZE = 5000
+
+SweepResult = namedtuple(
+    'SweepResult',
+    ['scanned', 'scanned_bytes', 'skipped_dirs', 'orphaned', 'freed_bytes', 'full'],
+)
+
+
+def load_checkpoint(path):
+    """Datos del último barrido, o {} si nunca se ejecutó"""
+    try:
+        with open(path) as checkpoint:
+            return json.load(checkpoint)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_checkpoint(path, data):
+    """Escribir el checkpoint de forma atómica"""
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as checkpoint:
+        json.dump(data, checkpoint)
+    os.replace(temporary, path)
+
+
+def referenced_names():
+    """
+    Hashes de los blobs y nombres de archivos sin blob que siguen en uso.
+    Se leen por bloques para no cargar modelos completos en memoria.
+    """
+    digests = set(
+        ImageBlob.objects.values_list('digest', flat=True).iterator(chunk_size=CHUNK_SIZE)
+    )
+    legacy = set()
+    rows = Memory.objects.filter(blob__isnull=True).values_list('image', 'thumbnail', 'medium')
+    for image, *derivatives in rows.iterator(chunk_size=CHUNK_SIZE):
+        legacy.update(name for name in derivatives if name)
+        if image:
+            # Todos los derivados posibles del original, no solo los que guarda el recuerdo
+            legacy.update(image_file_names(image))
+    return digests, legacy
+
+
+def file_digest_part(name):
+    """abcdef_thumbnail.jpg -> abcdef (hash del blob al que pertenece)"""
+    return os.path.splitext(name)[0].split('_', 1)[0]
+
+
+class OrphanSweeper:
+    """
+    Busca y elimina archivos huérfanos de media/memories en paralelo
+    """
+
+    def __init__(self, media_root, checkpoint_path, full=False, dry_run=False,
+                 workers=None, grace_period=None, prefix='memories'):
+        self.media_root = str(media_root)
+        self.prefix = prefix
+        self.checkpoint_path = str(checkpoint_path)
+        self.dry_run = dry_run
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.grace_period = GRACE_PERIOD if grace_period is None else grace_period
+        self.checkpoint = {} if full else load_checkpoint(self.checkpoint_path)
+        self.watermark = self.checkpoint.get('watermark', 0)
+        self.orphans = []
+
+    @property
+    def full(self):
+        return not self.watermark
+
+    def run(self, now=None):
+        """Ejecutar el barrido y retornar un SweepResult"""
+        now = time.time() if now is None else now
+        cutoff = now - self.grace_period
+        root = os.path.join(self.media_root, self.prefix)
+        self.digests, self.legacy = referenced_names()
+
+        scanned = scanned_bytes = skipped = 0
+        orphans = []
+        if os.path.isdir(root):
+            directories, files = self.list_directory(root)
+            # Cada subdirectorio (memories/ab, .incoming) se recorre en un hilo
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                results = [self.scan_files(self.prefix, files, cutoff, now)]
+                results += executor.map(
+                    lambda entry: self.scan_directory(
+                        entry, f'{self.prefix}/{entry.name}', cutoff, now
+                    ),
+                    directories,
+                )
+                for result in results:
+                    if result is None:
+                        skipped += 1
+                        continue
+                    count, size, found = result
+                    scanned += count
+                    scanned_bytes += size
+                    orphans.extend(found)
+
+                freed = 0 if self.dry_run else sum(executor.map(self.delete_file, orphans))
+
+        else:
+            freed = 0
+        self.orphans = orphans
+
+        if not self.dry_run:
+            data = {
+                'watermark': cutoff,
+                'finished_at': time.time(),
+                'scanned': scanned,
+                'orphaned': len(orphans),
+                'freed_bytes': freed,
+            }
+            if self.full:
+                data['media_bytes'] = scanned_bytes
+                data['media_files'] = scanned
+            else:
+                # Conservar la medición del último barrido completo
+                for key in ('media_bytes', 'media_files'):
+                    if key in self.checkpoint:
+                        data[key] = self.checkpoint[key]
+            save_checkpoint(self.checkpoint_path, data)
+
+        return SweepResult(scanned, scanned_bytes, skipped, len(orphans), freed, self.full)
+
+    def list_directory(self, path):
+        """Separar subdirectorios y archivos de un directorio"""
+        directories, files = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry)
+                elif entry.is_file(follow_symlinks=False):
+                    files.append(entry)
+        return directories, files
+
+    def scan_directory(self, directory, relative, cutoff, now):
+        """
+        Recorrer un subdirectorio. Retorna None si no cambió desde el último
+        barrido (crear o eliminar archivos actualiza el mtime del directorio).
+        """
+        incoming = relative == INCOMING_DIR
+        if self.watermark and not incoming and directory.stat().st_mtime <= self.watermark:
+            return None
+        subdirectories, files = self.list_directory(directory.path)
+        count, size, orphans = self.scan_files(relative, files, cutoff, now)
+        for subdirectory in subdirectories:
+            result = self.scan_directory(
+                subdirectory, f'{relative}/{subdirectory.name}', cutoff, now
+            )
+            if result is not None:
+                count += result[0]
+                size += result[1]
+                orphans.extend(result[2])
+        return count, size, orphans
+
+    def scan_files(self, relative, files, cutoff, now):
+        """Retorna (archivos vistos, bytes, huérfanos) de una lista de DirEntry"""
+        count = size = 0
+        orphans = []
+        incoming = relative == INCOMING_DIR
+        for entry in files:
+            stat = entry.stat()
+            # ctime cambia también al mover un archivo (que conserva su mtime)
+            changed = max(stat.st_mtime, stat.st_ctime)
+            if incoming:
+                # Las subidas interrumpidas se revisan siempre hasta que caducan
+                if stat.st_mtime < now - INCOMING_MAX_AGE:
+                    orphans.append(entry.path)
+                continue
+            if changed <= self.watermark:
+                continue
+            count += 1
+            size += stat.st_size
+            if changed > cutoff:
+                continue  # Puede ser un guardado que todavía no llegó a la base de datos
+            if not self.is_referenced(f'{relative}/{entry.name}'):
+                orphans.append(entry.path)
+        return count, size, orphans
+
+    def is_referenced(self, name):
+        """Indica si un archivo (relativo a MEDIA_ROOT) sigue en uso"""
+        if name in self.legacy:
+            return True
+        parts = name.split('/')
+        if len(parts) == 3:
+            # memories/ab/<hash>[_derivado].ext
+            return file_digest_part(parts[2]) in self.digests
+        return False
+
+    def delete_file(self, path):
+        """Eliminar un archivo y retornar los bytes liberados"""
+        try:
+            size = os.stat(path).st_size
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        return size
@@ -0,0 +1,19 @@
+"""
+Etiquetas para los recursos generados por build_assets
+"""
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from memories.assets import built_fonts
+
+register = template.Library()
+
+
+@register.simple_tag
+def font_preloads():
+    """<link rel="preload"> de las fuentes propias que ya se generaron"""
+    return format_html_join(
+        '\n', '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin>',
+        ((static(font['output']),) for font in built_fonts() if font['preload']),
+    )
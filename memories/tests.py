@@ -1,18 +1,35 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.core.management import call_command
+from django.db import connection
+from django.conf import settings
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from django.core.exceptions import ValidationError
 from datetime import date, timedelta
-from .models import Memory
+from .models import Memory, ImageBlob, ImageJob, UserMemoryStats
+from .ratelimit import CacheRateLimitBackend, LocalRateLimitBackend
+from .cache import timeline_cache_stats
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+from .jobs import MAX_ATTEMPTS, claim_next_job, enqueue_missing_derivatives, run_job
 from .forms import RegistrationForm, MemoryForm
+from .blobs import purge_orphaned_blobs, recount_blobs
+from .imageinfo import ImageHeaderError, sniff_image
+from .upload_handlers import ABORT_BODY_FACTOR, INCOMING_DIR, ImageUploadHandler
 from .validators import (
+    ImageValidator,
     validate_memory_date, 
     validate_memory_title, 
     validate_memory_description,
     validate_username_custom
 )
+import os
+import shutil
+import json
 import tempfile
+import time
 from PIL import Image
 import io
 
@@ -186,6 +203,461 @@ class MemoryModelTest(TestCase):
             memory.full_clean()
 
 
+class ImageDerivativesTest(TestCase):
+    """
+    Tests para la generación de miniaturas y versiones medias
+    """
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+    
+    def create_test_image(self, size=(1600, 1200), mode='RGB', image_format='JPEG', name='big.jpg'):
+        """Crear imagen de prueba con el tamaño indicado"""
+        image = Image.new(mode, size, color='purple')
+        image_file = io.BytesIO()
+        image.save(image_file, format=image_format)
+        return SimpleUploadedFile(
+            name=name,
+            content=image_file.getvalue(),
+            content_type=f'image/{image_format.lower()}'
+        )
+    
+    def create_memory(self, image):
+        """Crear recuerdo con la imagen indicada"""
+        memory = Memory(
+            user=self.user,
+            title='Recuerdo grande',
+            description='Descripción del recuerdo con imagen grande',
+            image=image,
+            date=date.today()
+        )
+        memory.save()
+        return memory
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def test_derivatives_generated_on_upload(self):
+        """Test de generación de derivados al subir una imagen"""
+        memory = self.create_memory(self.create_test_image())
+        memory.refresh_from_db()
+        
+        self.assertTrue(memory.thumbnail)
+        self.assertTrue(memory.medium)
+        with Image.open(memory.thumbnail.path) as thumbnail:
+            self.assertEqual(thumbnail.size, (480, 360))
+        with Image.open(memory.medium.path) as medium:
+            self.assertEqual(medium.size, (1280, 960))
+    
+    def test_derivatives_stored_next_to_original(self):
+        """Test de que los derivados se guardan junto al original"""
+        memory = self.create_memory(self.create_test_image())
+        stem = os.path.splitext(memory.image.name)[0]
+        
+        self.assertEqual(memory.thumbnail.name, f'{stem}_thumbnail.jpg')
+        self.assertEqual(memory.medium.name, f'{stem}_medium.jpg')
+    
+    def test_small_image_not_upscaled(self):
+        """Test de que las imágenes pequeñas no se amplían"""
+        memory = self.create_memory(self.create_test_image(size=(300, 200)))
+        
+        with Image.open(memory.medium.path) as medium:
+            self.assertEqual(medium.size, (300, 200))
+    
+    def test_transparent_image_keeps_alpha(self):
+        """Test de que las imágenes con transparencia generan PNG"""
+        image = self.create_test_image(mode='RGBA', image_format='PNG', name='alpha.png')
+        memory = self.create_memory(image)
+        
+        self.assertTrue(memory.thumbnail.name.endswith('_thumbnail.png'))
+    
+    def test_srcset_and_urls(self):
+        """Test de las URLs y el srcset expuestos a las plantillas"""
+        memory = self.create_memory(self.create_test_image())
+        
+        self.assertEqual(memory.thumbnail_url, memory.signed_url(memory.thumbnail))
+        self.assertEqual(memory.medium_url, memory.signed_url(memory.medium))
+        self.assertTrue(memory.thumbnail_url.startswith(f'{memory.thumbnail.url}?u={self.user.pk}&e='))
+        self.assertEqual(
+            memory.srcset,
+            f'{memory.thumbnail_url} 480w, {memory.medium_url} 1280w'
+        )
+    
+    def test_urls_fall_back_to_original(self):
+        """Test de que sin derivados se usa la imagen original"""
+        memory = self.create_memory(self.create_test_image())
+        Memory.objects.filter(pk=memory.pk).update(thumbnail='', medium='')
+        memory.refresh_from_db()
+        
+        self.assertEqual(memory.thumbnail_url, memory.image_url)
+        self.assertEqual(memory.srcset, '')
+    
+    def test_timeline_renders_thumbnail(self):
+        """Test de que la línea de tiempo usa la miniatura"""
+        memory = self.create_memory(self.create_test_image())
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('memories:timeline'))
+        
+        self.assertContains(response, memory.thumbnail.url)
+        self.assertNotContains(response, f'src="{memory.image.url}')
+    
+    def test_delete_removes_derivatives(self):
+        """Test de que eliminar el recuerdo borra los derivados"""
+        memory = self.create_memory(self.create_test_image())
+        paths = [memory.image.path, memory.thumbnail.path, memory.medium.path]
+        self.client.login(username='testuser', password='testpass123')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('memories:delete_memory', kwargs={'pk': memory.pk}))
+        
+        for path in paths:
+            self.assertFalse(os.path.exists(path))
+
+
+class ContentAddressedStorageTest(TestCase):
+    """
+    Tests para el almacenamiento por contenido y el conteo de referencias
+    """
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.partner = User.objects.create_user(
+            username='partner',
+            email='partner@example.com',
+            password='testpass123'
+        )
+        self.image_bytes = self.encode_image('teal')
+    
+    def encode_image(self, color):
+        """Bytes de una imagen JPEG de prueba"""
+        image_file = io.BytesIO()
+        Image.new('RGB', (300, 200), color=color).save(image_file, format='JPEG')
+        return image_file.getvalue()
+    
+    def create_memory(self, user, content=None, name='foto.jpg'):
+        """Crear recuerdo con los bytes indicados"""
+        return Memory.objects.create(
+            user=user,
+            title='Recuerdo compartido',
+            description='La misma foto subida por los dos',
+            image=SimpleUploadedFile(name, content or self.image_bytes),
+            date=date.today()
+        )
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def test_same_bytes_share_one_file(self):
+        """Test de que la misma foto subida dos veces se guarda una vez"""
+        import hashlib
+        first = self.create_memory(self.user)
+        second = self.create_memory(self.partner, name='copia.JPEG')
+        digest = hashlib.sha256(self.image_bytes).hexdigest()
+        
+        self.assertEqual(first.image.name, f'memories/{digest[:2]}/{digest}.jpg')
+        self.assertEqual(second.image.name, first.image.name)
+        self.assertEqual(ImageBlob.objects.get().ref_count, 2)
+        self.assertEqual(first.blob_id, second.blob_id)
+    
+    def test_second_upload_reuses_derivatives(self):
+        """Test de que los derivados del primer recuerdo se reutilizan sin encolar trabajo"""
+        first = self.create_memory(self.user)
+        first.refresh_from_db()
+        
+        with override_settings(IMAGE_PROCESSING_EAGER=False):
+            second = self.create_memory(self.partner)
+        
+        self.assertEqual(second.processing_status, Memory.STATUS_READY)
+        self.assertEqual(second.thumbnail.name, first.thumbnail.name)
+        self.assertFalse(ImageJob.objects.filter(memory=second).exists())
+    
+    def test_delete_keeps_shared_file_until_last_reference(self):
+        """Test de que eliminar un recuerdo solo decrementa el contador"""
+        first = self.create_memory(self.user)
+        second = self.create_memory(self.partner)
+        path = first.image.path
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
+        
+        second.refresh_from_db()
+        thumbnail_path = second.thumbnail.path
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(thumbnail_path))
+        self.assertFalse(ImageBlob.objects.exists())
+    
+    def test_changing_image_releases_previous_blob(self):
+        """Test de que cambiar la imagen libera la referencia anterior"""
+        memory = self.create_memory(self.user)
+        old_blob = memory.blob
+        
+        memory.image = SimpleUploadedFile('nueva.jpg', self.encode_image('navy'))
+        memory.save()
+        
+        old_blob.refresh_from_db()
+        self.assertEqual(old_blob.ref_count, 0)
+        self.assertNotEqual(memory.blob_id, old_blob.pk)
+        self.assertEqual(purge_orphaned_blobs()[0], 1)
+        self.assertFalse(ImageBlob.objects.filter(pk=old_blob.pk).exists())
+    
+    def test_purge_repairs_drifted_counter(self):
+        """Test de que un contador desfasado no borra archivos en uso"""
+        memory = self.create_memory(self.user)
+        ImageBlob.objects.update(ref_count=0)
+        
+        self.assertEqual(purge_orphaned_blobs(), (0, 0))
+        self.assertTrue(os.path.exists(memory.image.path))
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
+        
+        ImageBlob.objects.update(ref_count=5)
+        recount_blobs()
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
+    
+    def test_dedupe_images_command_migrates_legacy_files(self):
+        """Test de migración de imágenes con nombre aleatorio"""
+        from django.core.files.storage import default_storage
+        from io import StringIO
+        from django.core.files.base import ContentFile
+        memory = self.create_memory(self.user)
+        legacy_name = default_storage.save('memories/legacy1234.jpg', ContentFile(self.image_bytes))
+        Memory.objects.filter(pk=memory.pk).update(image=legacy_name, blob=None, thumbnail='', medium='')
+        ImageBlob.objects.all().delete()
+        
+        out = StringIO()
+        call_command('dedupe_images', stdout=out)
+        
+        memory.refresh_from_db()
+        self.assertIn('1 recuerdos migrados', out.getvalue())
+        self.assertTrue(memory.image.name.startswith('memories/'))
+        self.assertEqual(memory.blob.ref_count, 1)
+        self.assertEqual(memory.processing_status, Memory.STATUS_READY)
+        self.assertFalse(default_storage.exists(legacy_name))
+
+
+@override_settings(IMAGE_PROCESSING_EAGER=False)
+class ImageJobQueueTest(TestCase):
+    """
+    Tests para la cola de procesamiento de imágenes en segundo plano
+    """
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def create_test_image(self, content=None):
+        """Crear imagen de prueba"""
+        if content is None:
+            image = Image.new('RGB', (800, 600), color='orange')
+            image_file = io.BytesIO()
+            image.save(image_file, format='JPEG')
+            content = image_file.getvalue()
+        return SimpleUploadedFile(name='queued.jpg', content=content, content_type='image/jpeg')
+    
+    def create_memory(self):
+        """Crear recuerdo con imagen encolada"""
+        memory = Memory(
+            user=self.user,
+            title='Recuerdo en cola',
+            description='Descripción del recuerdo que se procesa después',
+            image=self.create_test_image(),
+            date=date.today()
+        )
+        memory.save()
+        return memory
+    
+    def test_upload_enqueues_job(self):
+        """Test de que subir una imagen encola un trabajo sin generar derivados"""
+        memory = self.create_memory()
+        memory.refresh_from_db()
+        
+        self.assertEqual(memory.processing_status, Memory.STATUS_PENDING)
+        self.assertFalse(memory.thumbnail)
+        self.assertEqual(memory.image_jobs.filter(status=ImageJob.STATUS_PENDING).count(), 1)
+    
+    def test_worker_processes_pending_jobs(self):
+        """Test de que el worker genera los derivados y marca el recuerdo como listo"""
+        memory = self.create_memory()
+        
+        call_command('image_worker', '--once', stdout=io.StringIO())
+        memory.refresh_from_db()
+        
+        self.assertEqual(memory.processing_status, Memory.STATUS_READY)
+        self.assertTrue(memory.thumbnail)
+        self.assertEqual(memory.image_jobs.get().status, ImageJob.STATUS_DONE)
+    
+    def test_claim_is_exclusive(self):
+        """Test de que un trabajo reclamado no se entrega dos veces"""
+        self.create_memory()
+        
+        self.assertIsNotNone(claim_next_job())
+        self.assertIsNone(claim_next_job())
+    
+    def test_failed_job_is_retried_then_marked_failed(self):
+        """Test de reintentos y fallo definitivo con una imagen corrupta"""
+        memory = self.create_memory()
+        with open(memory.image.path, 'wb') as broken:
+            broken.write(b'no es una imagen')
+        
+        with self.assertLogs('memories', level='ERROR'):
+            for _ in range(MAX_ATTEMPTS):
+                run_job(claim_next_job())
+        memory.refresh_from_db()
+        job = memory.image_jobs.get()
+        
+        self.assertEqual(job.status, ImageJob.STATUS_FAILED)
+        self.assertEqual(job.attempts, MAX_ATTEMPTS)
+        self.assertEqual(memory.processing_status, Memory.STATUS_FAILED)
+    
+    def test_timeline_shows_processing_state(self):
+        """Test de que la línea de tiempo indica las imágenes en proceso"""
+        memory = self.create_memory()
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('memories:timeline'))
+        
+        self.assertContains(response, 'Procesando imagen')
+        self.assertContains(response, memory.image.url)
+    
+    def test_enqueue_missing_derivatives(self):
+        """Test del backfill de recuerdos existentes sin derivados"""
+        memory = self.create_memory()
+        ImageJob.objects.all().delete()
+        
+        self.assertEqual(enqueue_missing_derivatives(), 1)
+        self.assertEqual(enqueue_missing_derivatives(), 0)
+
+
+@override_settings(IMAGE_PROCESSING_EAGER=False)
+class UserMemoryStatsTest(TestCase):
+    """
+    Tests para las estadísticas desnormalizadas por usuario
+    """
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def create_memory(self, memory_date):
+        """Crear recuerdo con la fecha indicada"""
+        image = Image.new('RGB', (150, 150), color='teal')
+        image_file = io.BytesIO()
+        image.save(image_file, format='JPEG')
+        memory = Memory(
+            user=self.user,
+            title='Recuerdo con estadísticas',
+            description='Descripción para probar las estadísticas',
+            image=SimpleUploadedFile('stats.jpg', image_file.getvalue(), 'image/jpeg'),
+            date=memory_date
+        )
+        memory.save()
+        return memory
+    
+    def stats(self):
+        """Estadísticas actuales del usuario"""
+        return UserMemoryStats.objects.get(user=self.user)
+    
+    def test_stats_follow_creations(self):
+        """Test de estadísticas al crear recuerdos"""
+        first = self.create_memory(date(2022, 5, 1))
+        second = self.create_memory(date(2020, 3, 1))
+        stats = self.stats()
+        
+        self.assertEqual(stats.memory_count, 2)
+        self.assertEqual(stats.earliest_date, date(2020, 3, 1))
+        self.assertEqual(stats.latest_date, date(2022, 5, 1))
+        self.assertEqual(stats.total_image_bytes, first.image_size + second.image_size)
+        self.assertGreater(first.image_size, 0)
+    
+    def test_stats_follow_date_changes(self):
+        """Test de estadísticas al cambiar la fecha de un recuerdo"""
+        self.create_memory(date(2022, 5, 1))
+        memory = self.create_memory(date(2020, 3, 1))
+        
+        memory = Memory.objects.get(pk=memory.pk)
+        memory.date = date(2023, 1, 1)
+        memory.save()
+        stats = self.stats()
+        
+        self.assertEqual(stats.earliest_date, date(2022, 5, 1))
+        self.assertEqual(stats.latest_date, date(2023, 1, 1))
+    
+    def test_stats_follow_deletions(self):
+        """Test de estadísticas al eliminar recuerdos"""
+        keep = self.create_memory(date(2022, 5, 1))
+        memory = self.create_memory(date(2020, 3, 1))
+        memory.delete_image_files()
+        memory.delete()
+        stats = self.stats()
+        
+        self.assertEqual(stats.memory_count, 1)
+        self.assertEqual(stats.earliest_date, date(2022, 5, 1))
+        self.assertEqual(stats.total_image_bytes, keep.image_size)
+    
+    def test_rebuild_command_repairs_stats(self):
+        """Test del comando de reparación"""
+        self.create_memory(date(2022, 5, 1))
+        UserMemoryStats.objects.filter(user=self.user).update(memory_count=99, total_image_bytes=0)
+        
+        call_command('rebuild_memory_stats', stdout=io.StringIO())
+        
+        self.assertEqual(self.stats().memory_count, 1)
+        self.assertGreater(self.stats().total_image_bytes, 0)
+    
+    def test_views_do_not_count(self):
+        """Test de que la línea de tiempo y la API no cuentan los recuerdos"""
+        self.create_memory(date(2022, 5, 1))
+        self.client.login(username='testuser', password='testpass123')
+        
+        for url in (reverse('memories:timeline'), reverse('memories:memory_count_api')):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            # Solo el índice año → mes (cacheado) agrupa con COUNT; el total sale de las estadísticas
+            counts = [
+                query['sql'] for query in queries.captured_queries
+                if 'COUNT(' in query['sql']
+                and not ('"memories_memory"' in query['sql'] and 'GROUP BY' in query['sql'])
+            ]
+            self.assertEqual(counts, [])
+        
+        self.assertEqual(response.json()['count'], 1)
+
+
 class ValidatorsTest(TestCase):
     """
     Tests para validadores personalizados
@@ -282,116 +754,816 @@ class ValidatorsTest(TestCase):
         
         with self.assertRaises(ValidationError):
             validate_username_custom(reserved_username)
+    
+    def encode_image(self, size, image_format='JPEG', **options):
+        """Archivo subido con una imagen de prueba"""
+        image_file = io.BytesIO()
+        Image.new('RGB', size, color='green').save(image_file, format=image_format, **options)
+        return SimpleUploadedFile(f'prueba.{image_format.lower()}', image_file.getvalue())
+    
+    def test_image_validator_valid(self):
+        """Test de imagen válida leyendo solo la cabecera"""
+        image = self.encode_image((800, 600))
+        ImageValidator()(image)
+        self.assertEqual(image.tell(), 0)
+    
+    def test_image_validator_keeps_dimension_message(self):
+        """Test de que los errores propios no se convierten en error genérico"""
+        with self.assertRaisesMessage(ValidationError, 'al menos 100x100'):
+            ImageValidator()(self.encode_image((50, 500)))
+        with self.assertRaisesMessage(ValidationError, 'mayor a 4000x4000'):
+            ImageValidator()(self.encode_image((4100, 120), 'PNG'))
+    
+    def test_image_validator_rejects_format_and_garbage(self):
+        """Test de formato no permitido y de archivos que no son imágenes"""
+        with self.assertRaisesMessage(ValidationError, 'Formato de imagen no permitido: GIF'):
+            ImageValidator(allowed_formats=['JPEG'])(self.encode_image((200, 200), 'GIF'))
+        with self.assertRaisesMessage(ValidationError, 'No se pudo procesar la imagen'):
+            ImageValidator()(SimpleUploadedFile('falsa.jpg', b'GIF89' + b'x' * 2000))
+    
+    def test_read_image_info_with_large_metadata(self):
+        """Test de cabecera JPEG después de un bloque EXIF grande"""
+        from .imageinfo import read_image_info
+        image = self.encode_image((640, 480), icc_profile=b'\0' * 60000)
+        self.assertEqual(read_image_info(image), ('JPEG', 640, 480))
 
 
-class MemoryFormTest(TestCase):
+class SQLitePragmasTest(TestCase):
     """
-    Tests para formularios de recuerdos
+    Tests para los PRAGMA aplicados a cada conexión SQLite
+    """
+    
+    def test_statements_apply_journal_mode_first(self):
+        """Test de que WAL se activa antes de synchronous=NORMAL"""
+        from .sqlite import pragma_statements
+        statements = pragma_statements({'synchronous': 'NORMAL', 'cache_size': -2000, 'journal_mode': 'WAL', 'mmap_size': None})
+        self.assertEqual(statements, ['PRAGMA journal_mode=WAL', 'PRAGMA synchronous=NORMAL', 'PRAGMA cache_size=-2000'])
+    
+    def test_statements_reject_injection(self):
+        """Test de que un valor con SQL no se ejecuta"""
+        from .sqlite import pragma_statements
+        with self.assertRaises(ValueError):
+            pragma_statements({'journal_mode': 'WAL; DROP TABLE memories_memory'})
+    
+    def test_connection_uses_configured_pragmas(self):
+        """Test de que la conexión abierta tiene busy_timeout y temp_store"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('Solo aplica a SQLite')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)  # MEMORY
+
+
+class OrphanSweeperTest(TestCase):
+    """
+    Tests para el barrido incremental de archivos huérfanos
     """
     
     def setUp(self):
-        """Configuración inicial"""
+        """Árbol de media temporal con archivos en uso y huérfanos"""
+        import shutil
         self.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.test_image = self.create_test_image()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.checkpoint = os.path.join(self.media_root, 'checkpoint.json')
+        
+        used = 'a' * 64
+        ImageBlob.objects.create(digest=used, name=f'memories/aa/{used}.jpg', ref_count=1)
+        Memory.objects.bulk_create([Memory(
+            user=self.user,
+            title='Recuerdo anterior',
+            description='Recuerdo con nombre aleatorio',
+            image='memories/keep.jpg',
+            date=date.today()
+        )])
+        self.kept = [
+            self.touch(f'memories/aa/{used}.jpg'),
+            self.touch(f'memories/aa/{used}_thumbnail.jpg'),
+            self.touch('memories/keep.jpg'),
+            self.touch('memories/.incoming/tmp123.upload'),
+        ]
+        self.orphans = [
+            self.touch(f'memories/bb/{"b" * 64}.jpg'),
+            self.touch('memories/abandonada.jpg'),
+        ]
     
-    def create_test_image(self):
-        """Crear imagen de prueba"""
-        image = Image.new('RGB', (200, 200), color='blue')
-        image_file = io.BytesIO()
-        image.save(image_file, format='JPEG')
-        image_file.seek(0)
-        return SimpleUploadedFile(
-            name='form.jpg',
-            content=image_file.getvalue(),
-            content_type='image/jpeg'
-        )
+    def touch(self, name, age=0):
+        """Crear un archivo relativo al MEDIA_ROOT temporal"""
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'x' * 10)
+        if age:
+            old = time.time() - age
+            os.utime(path, (old, old))
+        return path
     
-    def test_memory_form_valid_data(self):
-        """Test de formulario con datos válidos"""
-        form_data = {
-            'title': 'Recuerdo de prueba',
-            'description': 'Esta es una descripción válida para el formulario',
-            'date': date.today()
-        }
-        
-        form = MemoryForm(data=form_data, files={'image': self.test_image})
-        self.assertTrue(form.is_valid())
+    def sweep(self, **kwargs):
+        """Ejecutar el barrido sin período de gracia"""
+        from .sweeper import OrphanSweeper
+        sweeper = OrphanSweeper(self.media_root, self.checkpoint, grace_period=0, **kwargs)
+        return sweeper, sweeper.run(now=time.time())
     
-    def test_memory_form_invalid_title(self):
-        """Test de formulario con título inválido"""
-        form_data = {
-            'title': 'AB',  # Muy corto
-            'description': 'Descripción válida para el test',
-            'date': date.today()
-        }
-        
-        form = MemoryForm(data=form_data, files={'image': self.test_image})
-        self.assertFalse(form.is_valid())
-        self.assertIn('title', form.errors)
+    def test_full_sweep_removes_only_orphans(self):
+        """Test de que solo se eliminan archivos sin referencias"""
+        sweeper, result = self.sweep()
+        
+        self.assertTrue(result.full)
+        self.assertEqual(result.orphaned, 2)
+        self.assertEqual(result.freed_bytes, 20)
+        for path in self.orphans:
+            self.assertFalse(os.path.exists(path))
+        for path in self.kept:
+            self.assertTrue(os.path.exists(path))
     
-    def test_memory_form_invalid_description(self):
-        """Test de formulario con descripción inválida"""
-        form_data = {
-            'title': 'Título válido',
-            'description': 'Corta',  # Muy corta
-            'date': date.today()
-        }
+    def test_full_sweep_keeps_legacy_variants(self):
+        """Test de que los derivados de un recuerdo sin blob no son huérfanos, en cualquier extensión"""
+        from .blobs import DERIVATIVE_EXTENSIONS
+        variants = [
+            self.touch(f'memories/keep_{field_name}{ext}')
+            for field_name in ('thumbnail', 'medium') for ext in DERIVATIVE_EXTENSIONS
+        ]
+        orphan = self.touch(f'memories/abandonada_thumbnail{DERIVATIVE_EXTENSIONS[-1]}')
         
-        form = MemoryForm(data=form_data, files={'image': self.test_image})
-        self.assertFalse(form.is_valid())
-        self.assertIn('description', form.errors)
-    
-    def test_memory_form_missing_required_fields(self):
-        """Test de formulario con campos requeridos faltantes"""
-        form_data = {
-            'title': 'Título válido'
-            # Faltan description, date e image
-        }
+        sweeper, result = self.sweep()
         
-        form = MemoryForm(data=form_data)
-        self.assertFalse(form.is_valid())
-        self.assertIn('description', form.errors)
-        self.assertIn('date', form.errors)
-        self.assertIn('image', form.errors)
+        self.assertEqual(result.orphaned, 3)
+        self.assertFalse(os.path.exists(orphan))
+        for path in variants:
+            self.assertTrue(os.path.exists(path))
+    
+    def test_incremental_sweep_only_checks_new_files(self):
+        """Test del checkpoint: la segunda pasada solo mira lo nuevo"""
+        from .sweeper import load_checkpoint
+        self.sweep()
+        self.assertEqual(load_checkpoint(self.checkpoint)['media_files'], 5)
+        
+        time.sleep(0.01)
+        new_orphan = self.touch(f'memories/cc/{"c" * 64}.png')
+        sweeper, result = self.sweep()
+        
+        self.assertFalse(result.full)
+        self.assertEqual(result.scanned, 1)
+        self.assertGreaterEqual(result.skipped_dirs, 1)  # memories/aa no cambió
+        self.assertEqual(result.orphaned, 1)
+        self.assertFalse(os.path.exists(new_orphan))
+        # La medición del barrido completo se conserva
+        self.assertEqual(load_checkpoint(self.checkpoint)['media_files'], 5)
+    
+    def test_stale_incoming_uploads_removed(self):
+        """Test de limpieza de subidas interrumpidas"""
+        from .sweeper import INCOMING_MAX_AGE
+        stale = self.touch('memories/.incoming/old.upload', age=INCOMING_MAX_AGE + 60)
+        self.sweep()
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(self.kept[3]))
+    
+    def test_dry_run_changes_nothing(self):
+        """Test de que dry-run no elimina ni guarda checkpoint"""
+        sweeper, result = self.sweep(dry_run=True)
+        
+        self.assertEqual(result.orphaned, 2)
+        self.assertEqual(sorted(sweeper.orphans), sorted(self.orphans))
+        self.assertTrue(all(os.path.exists(path) for path in self.orphans))
+        self.assertFalse(os.path.exists(self.checkpoint))
+    
+    def test_optimize_db_reports_sweep(self):
+        """Test del comando con estadísticas desde la base de datos"""
+        from unittest import mock
+        out = io.StringIO()
+        with override_settings(MEDIA_ROOT=self.media_root, ORPHAN_SWEEP_CHECKPOINT=self.checkpoint), \
+                mock.patch('memories.sweeper.GRACE_PERIOD', 0):
+            call_command('optimize_db', '--dry-run', stdout=out)
+        
+        self.assertIn('Barrido completo', out.getvalue())
+        self.assertIn('Se eliminarían 2 archivos huérfanos', out.getvalue())
+        self.assertIn('Imágenes originales', out.getvalue())
 
 
-class RegistrationFormTest(TestCase):
+class ImportMemoriesTest(TestCase):
     """
-    Tests para formulario de registro
+    Tests para la importación masiva de recuerdos
     """
     
-    def test_registration_form_valid_data(self):
-        """Test de formulario de registro con datos válidos"""
-        form_data = {
-            'username': 'nuevo_usuario',
-            'email': 'nuevo@example.com',
-            'password1': 'contraseña_segura123',
-            'password2': 'contraseña_segura123'
-        }
-        
-        form = RegistrationForm(data=form_data)
-        self.assertTrue(form.is_valid())
+    def setUp(self):
+        """Archivo de fotos temporal"""
+        import shutil
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.archive = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive)
+        self.state_file = os.path.join(self.archive, 'state.json')
+        
+        photo = self.write_image('viaje_a_la_playa.jpg', (300, 200), 'JPEG')
+        with open(photo, 'rb') as source, open(os.path.join(self.archive, 'copia.jpg'), 'wb') as copy:
+            copy.write(source.read())
+        self.write_image('album/cena-aniversario.png', (200, 200), 'PNG')
+        self.write_image('chica.png', (40, 40), 'PNG')
     
-    def test_registration_form_invalid_username(self):
-        """Test de formulario con username inválido"""
-        form_data = {
-            'username': '123usuario',  # Empieza con número
-            'email': 'test@example.com',
-            'password1': 'contraseña_segura123',
-            'password2': 'contraseña_segura123'
-        }
-        
-        form = RegistrationForm(data=form_data)
-        self.assertFalse(form.is_valid())
-        self.assertIn('username', form.errors)
+    def write_image(self, name, size, image_format, **options):
+        """Guardar una imagen en el archivo temporal"""
+        path = os.path.join(self.archive, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Image.new('RGB', size, color='olive').save(path, format=image_format, **options)
+        return path
     
-    def test_registration_form_duplicate_email(self):
-        """Test de formulario con email duplicado"""
-        # Crear usuario existente
+    def run_import(self, source=None, *args):
+        """Ejecutar el comando y retornar su salida"""
+        out = io.StringIO()
+        call_command(
+            'import_memories', source or self.archive, '--user', 'testuser',
+            '--state-file', self.state_file, *args, stdout=out
+        )
+        return out.getvalue()
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def test_import_directory(self):
+        """Test de importación de un directorio con duplicados y errores"""
+        output = self.run_import(None, '--workers', '0', '--batch-size', '2')
+        
+        self.assertIn('3 recuerdos importados', output)
+        self.assertIn('chica.png', output)
+        self.assertEqual(Memory.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(
+            sorted(ImageBlob.objects.values_list('ref_count', flat=True)), [1, 2]
+        )
+        memory = Memory.objects.get(title='viaje a la playa')
+        self.assertEqual(memory.processing_status, Memory.STATUS_READY)
+        self.assertTrue(os.path.exists(memory.thumbnail.path))
+        self.assertEqual((memory.image_width, memory.image_height), (300, 200))
+        self.assertTrue(memory.placeholder.startswith('data:image/'))
+        self.assertEqual(self.user.memory_stats.memory_count, 3)
+    
+    def test_import_resumes_from_state(self):
+        """Test de que una segunda ejecución no duplica lo ya importado"""
+        self.run_import(None, '--workers', '0')
+        output = self.run_import(None, '--workers', '0')
+        
+        self.assertIn('3 ya importadas', output)
+        self.assertEqual(Memory.objects.count(), 3)
+        with open(self.state_file) as state_file:
+            self.assertIn('chica.png', json.load(state_file)['failed'])
+    
+    def test_import_manifest_with_process_pool(self):
+        """Test de manifiesto CSV procesado en varios procesos"""
+        import csv
+        manifest = os.path.join(self.archive, 'manifiesto.csv')
+        with open(manifest, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['image', 'title', 'description', 'date'])
+            writer.writerow(['viaje_a_la_playa.jpg', 'Nuestro viaje', 'Un día de sol en la playa', '2020-01-15'])
+            writer.writerow(['album/cena-aniversario.png', 'Aniversario', 'Cena del primer aniversario', '2021-03-02'])
+        
+        self.run_import(manifest, '--workers', '2')
+        
+        memory = Memory.objects.get(title='Nuestro viaje')
+        self.assertEqual(memory.date, date(2020, 1, 15))
+        self.assertEqual(Memory.objects.count(), 2)
+
+
+class MemorySearchTest(TestCase):
+    """
+    Tests para la búsqueda de texto completo
+    """
+    
+    def setUp(self):
+        """Usuario con tres recuerdos y otro usuario con uno parecido"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.client = Client()
+        self.client.login(username='testuser', password='testpass123')
+        self.beach = self.create_memory(self.user, 'Viaje a la playa', 'Un día de sol y arena')
+        self.mountain = self.create_memory(self.user, 'Montaña', 'Nuestro viaje a la montaña con nieve')
+        self.dinner = self.create_memory(self.user, 'Cena de aniversario', 'Restaurante junto al río')
+        self.create_memory(self.other, 'Viaje ajeno', 'Otro viaje a la playa')
+    
+    def create_memory(self, user, title, description):
+        buffer = io.BytesIO()
+        Image.new('RGB', (120, 120), color='red').save(buffer, format='JPEG')
+        return Memory.objects.create(
+            user=user,
+            title=title,
+            description=description,
+            date=date(2021, 1, 1),
+            image=SimpleUploadedFile('search.jpg', buffer.getvalue(), content_type='image/jpeg'),
+        )
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def test_search_ranks_title_matches_first(self):
+        """Test de que un título que coincide pesa más que la descripción"""
+        from .search import search_memories
+        results = search_memories(self.user, 'viaje')
+        self.assertEqual(results, [self.beach, self.mountain])
+    
+    def test_search_is_scoped_to_user(self):
+        """Test de que no aparecen recuerdos de otros usuarios"""
+        from .search import search_memories
+        self.assertEqual(search_memories(self.other, 'playa')[0].user, self.other)
+        self.assertNotIn(self.beach, search_memories(self.other, 'playa'))
+    
+    def test_search_prefix_and_accents(self):
+        """Test de prefijo en el último término y búsqueda sin tildes"""
+        from .search import search_memories
+        self.assertEqual(search_memories(self.user, 'aniver'), [self.dinner])
+        self.assertEqual(search_memories(self.user, 'montana nie'), [self.mountain])
+        self.assertEqual(search_memories(self.user, 'viaje OR cena'), [])
+    
+    def test_search_long_prefix_with_many_shorter_matches(self):
+        """Test de un prefijo largo con muchas coincidencias recientes de sus primeras letras"""
+        from .search import search_memories
+        birthday = self.create_memory(self.user, 'Cumpleaños de Ana', 'Fiesta sorpresa')
+        # Sin save(): los triggers de FTS5 indexan igual las filas de bulk_create
+        Memory.objects.bulk_create([
+            Memory(
+                user=self.user,
+                title=f'Cumplimos {index} meses',
+                description='Otro mes juntos',
+                date=date(2021, 1, 1),
+                image='memories/cumplimos.jpg',
+            )
+            for index in range(250)
+        ])
+        
+        self.assertEqual(search_memories(self.user, 'cumpleaños'), [birthday])
+        self.assertEqual(search_memories(self.user, 'ana cumplea'), [birthday])
+    
+    def test_search_ranks_all_matches(self):
+        """Test de que el más relevante gana aunque haya cientos de coincidencias más recientes"""
+        from .search import SEARCH_LIMIT, search_memories
+        surprise = self.create_memory(self.user, 'Sorpresa', 'Globos de colores')
+        Memory.objects.bulk_create([
+            Memory(
+                user=self.user,
+                title=f'Tarde {index}',
+                description='Una tarde tranquila en casa con una pequeña sorpresa al final del día',
+                date=date(2021, 1, 1),
+                image='memories/tarde.jpg',
+            )
+            for index in range(250)
+        ])
+        
+        results = search_memories(self.user, 'sorpresa')
+        self.assertEqual(len(results), SEARCH_LIMIT)
+        self.assertEqual(results[0], surprise)
+        # Páginas siguientes desde la base, sin repetir
+        page = search_memories(self.user, 'sorpresa', offset=SEARCH_LIMIT)
+        self.assertEqual(len(page), SEARCH_LIMIT)
+        self.assertFalse({memory.pk for memory in page} & {memory.pk for memory in results})
+    
+    def test_search_index_follows_edits_and_deletes(self):
+        """Test de que el índice se actualiza al editar y eliminar"""
+        from .search import search_memories
+        self.dinner.title = 'Cena en la playa'
+        self.dinner.save()
+        self.assertIn(self.dinner, search_memories(self.user, 'playa'))
+        self.assertEqual(search_memories(self.user, 'aniversario'), [])
+        
+        self.beach.delete()
+        self.assertNotIn(self.beach.pk, [memory.pk for memory in search_memories(self.user, 'playa')])
+    
+    def test_search_view(self):
+        """Test de la página de resultados"""
+        response = self.client.get(reverse('memories:search_memories'), {'q': 'playa'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['memories']), [self.beach])
+        self.assertNotContains(response, 'Viaje ajeno')
+        
+        self.client.logout()
+        response = self.client.get(reverse('memories:search_memories'), {'q': 'playa'})
+        self.assertEqual(response.status_code, 302)
+
+
+class ExportMemoriesTest(TestCase):
+    """
+    Tests para la exportación de recuerdos en ZIP
+    """
+    
+    def setUp(self):
+        """Usuario con dos recuerdos y otro usuario con uno"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.client = Client()
+        self.client.login(username='testuser', password='testpass123')
+        self.first = self.create_memory(self.user, 'Primera cita', date(2020, 2, 14), 'red')
+        self.second = self.create_memory(self.user, 'Viaje, largo y ñandú', date(2021, 7, 1), 'blue')
+        self.create_memory(other, 'Recuerdo ajeno', date(2022, 1, 1), 'green')
+    
+    def create_memory(self, user, title, memory_date, color):
+        buffer = io.BytesIO()
+        Image.new('RGB', (120, 120), color=color).save(buffer, format='JPEG')
+        return Memory.objects.create(
+            user=user,
+            title=title,
+            description='Descripción del recuerdo para exportar',
+            date=memory_date,
+            image=SimpleUploadedFile(f'{color}.jpg', buffer.getvalue(), content_type='image/jpeg'),
+        )
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def test_export_streams_zip_with_manifest(self):
+        """Test de que la descarga es un ZIP con imágenes y manifiestos"""
+        import csv
+        import zipfile
+        response = self.client.get(reverse('memories:export_memories'))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn('recuerdos-testuser-', response['Content-Disposition'])
+        self.assertEqual(response['Accept-Ranges'], 'none')
+        
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        manifest = json.loads(archive.read('manifest.json'))
+        self.assertEqual([row['title'] for row in manifest], [self.second.title, self.first.title])
+        self.assertEqual(manifest[1]['date'], '2020-02-14')
+        with self.first.image.open('rb') as image:
+            self.assertEqual(archive.read(manifest[1]['image']), image.read())
+        
+        rows = list(csv.DictReader(io.StringIO(archive.read('manifest.csv').decode('utf-8-sig'))))
+        self.assertEqual(rows[0]['title'], self.second.title)
+        self.assertNotIn('Recuerdo ajeno', archive.read('manifest.json').decode('utf-8'))
+    
+    def test_export_queries_do_not_grow_with_memories(self):
+        """Test de que se recorre la base por bloques y no por recuerdo"""
+        from .export import stream_export
+        with CaptureQueriesContext(connection) as baseline:
+            list(stream_export(self.user))
+        self.create_memory(self.user, 'Tercer recuerdo', date(2022, 5, 5), 'yellow')
+        with CaptureQueriesContext(connection) as queries:
+            list(stream_export(self.user))
+        
+        self.assertEqual(len(queries), len(baseline))
+    
+    def test_export_requires_login(self):
+        """Test de que la exportación requiere sesión"""
+        self.client.logout()
+        response = self.client.get(reverse('memories:export_memories'))
+        self.assertEqual(response.status_code, 302)
+    
+    def test_export_command(self):
+        """Test del comando export_memories"""
+        import shutil
+        import zipfile
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        output = os.path.join(directory, 'recuerdos.zip')
+        out = io.StringIO()
+        
+        call_command('export_memories', '--user', 'testuser', '--output', output, stdout=out)
+        
+        self.assertIn('MB exportados', out.getvalue())
+        with zipfile.ZipFile(output) as archive:
+            names = archive.namelist()
+        self.assertEqual(len([name for name in names if name.startswith('imagenes/')]), 2)
+        self.assertIn('manifest.csv', names)
+
+
+class ImageUploadHandlerTest(TestCase):
+    """
+    Tests para la validación de imágenes durante la subida
+    """
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client = Client()
+        self.client.login(username='testuser', password='testpass123')
+    
+    def image_bytes(self, size=(200, 150), mode='RGB', image_format='JPEG', **options):
+        """Codificar una imagen de prueba"""
+        image_file = io.BytesIO()
+        Image.new(mode, size, color='orange').save(image_file, format=image_format, **options)
+        return image_file.getvalue()
+    
+    def incoming_files(self):
+        """Archivos que quedaron en el directorio de recepción"""
+        directory = os.path.join(settings.MEDIA_ROOT, INCOMING_DIR)
+        return os.listdir(directory) if os.path.isdir(directory) else []
+    
+    def start_upload(self, name='foto.jpg'):
+        """Handler listo para recibir un archivo"""
+        request = RequestFactory().post('/')
+        handler = ImageUploadHandler(request)
+        handler.new_file('image', name, 'image/jpeg', None)
+        return request, handler
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def test_sniff_image_formats(self):
+        """Test de formato y dimensiones leídos de la cabecera"""
+        cases = [
+            ('JPEG', 'RGB', {}),
+            ('JPEG', 'RGB', {'progressive': True}),
+            ('PNG', 'RGBA', {}),
+            ('GIF', 'P', {}),
+            ('WEBP', 'RGB', {}),
+            ('WEBP', 'RGB', {'lossless': True}),
+            ('WEBP', 'RGBA', {}),
+        ]
+        for image_format, mode, options in cases:
+            with self.subTest(image_format=image_format, mode=mode, options=options):
+                info = sniff_image(self.image_bytes((321, 123), mode, image_format, **options))
+                self.assertEqual(info, (image_format, 321, 123))
+    
+    def test_sniff_image_needs_more_data(self):
+        """Test de cabecera incompleta y de archivos que no son imágenes"""
+        data = self.image_bytes(image_format='PNG')
+        self.assertIsNone(sniff_image(data[:4]))
+        self.assertIsNone(sniff_image(data[:20]))
+        self.assertEqual(sniff_image(data[:24]).width, 200)
+        
+        with self.assertRaises(ImageHeaderError):
+            sniff_image(b'<html><body>no soy una imagen</body></html>')
+    
+    def test_handler_hashes_and_keeps_file_in_media_root(self):
+        """Test de hash y ubicación del archivo aceptado"""
+        import hashlib
+        data = self.image_bytes()
+        request, handler = self.start_upload()
+        
+        for start in range(0, len(data), 100):
+            handler.receive_data_chunk(data[start:start + 100], start)
+        uploaded = handler.file_complete(len(data))
+        
+        self.assertEqual(uploaded.content_hash, hashlib.sha256(data).hexdigest())
+        self.assertEqual(uploaded.image_info, ('JPEG', 200, 150))
+        self.assertEqual(uploaded.content_type, 'image/jpeg')
+        self.assertTrue(uploaded.temporary_file_path().startswith(str(settings.MEDIA_ROOT)))
+        self.assertFalse(hasattr(request, 'upload_rejections'))
+        uploaded.close()
+        self.assertEqual(self.incoming_files(), [])
+    
+    def test_handler_rejects_oversized_mid_stream(self):
+        """Test de corte de la subida al superar el tamaño máximo"""
+        from django.core.files.uploadhandler import SkipFile
+        limits = dict(settings.FILE_VALIDATION, MAX_FILE_SIZE=1000)
+        data = self.image_bytes(size=(400, 400))
+        
+        with override_settings(FILE_VALIDATION=limits):
+            request, handler = self.start_upload()
+            handler.receive_data_chunk(data[:600], 0)
+            with self.assertRaises(SkipFile):
+                handler.receive_data_chunk(data[600:1200], 600)
+        
+        self.assertIn('image', request.upload_rejections)
+        self.assertEqual(self.incoming_files(), [])
+    
+    def test_handler_rejects_wrong_type_on_first_chunk(self):
+        """Test de rechazo por contenido que no es imagen"""
+        from django.core.files.uploadhandler import SkipFile
+        request, handler = self.start_upload()
+        with self.assertRaises(SkipFile):
+            handler.receive_data_chunk(b'%PDF-1.7 documento disfrazado de foto', 0)
+        self.assertIn('JPG, PNG, GIF o WEBP', request.upload_rejections['image'])
+    
+    def test_create_view_shows_rejection(self):
+        """Test de error en el formulario cuando la imagen es muy pequeña"""
+        image = SimpleUploadedFile('chica.png', self.image_bytes((50, 50), image_format='PNG'))
+        response = self.client.post(reverse('memories:create_memory'), {
+            'title': 'Recuerdo chico',
+            'description': 'Descripción con imagen muy pequeña',
+            'image': image,
+            'date': date.today().isoformat(),
+        })
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'al menos 100x100')
+        self.assertFalse(Memory.objects.exists())
+        self.assertEqual(self.incoming_files(), [])
+    
+    def test_edit_view_does_not_keep_old_image_silently(self):
+        """Test de rechazo en edición (la imagen no es requerida)"""
+        memory = Memory.objects.create(
+            user=self.user,
+            title='Recuerdo original',
+            description='Descripción del recuerdo original',
+            image=SimpleUploadedFile('original.jpg', self.image_bytes()),
+            date=date.today()
+        )
+        fake = SimpleUploadedFile('falsa.jpg', b'texto plano con extension de imagen')
+        response = self.client.post(reverse('memories:edit_memory', args=[memory.pk]), {
+            'title': 'Recuerdo editado',
+            'description': 'Descripción del recuerdo editado',
+            'image': fake,
+            'date': date.today().isoformat(),
+        })
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'JPG, PNG, GIF o WEBP')
+        memory.refresh_from_db()
+        self.assertEqual(memory.title, 'Recuerdo original')
+    
+    def test_other_uploads_use_django_handlers(self):
+        """Test de que fuera de las vistas de recuerdos los archivos no se tratan como imágenes"""
+        from django.conf import global_settings
+        self.assertEqual(settings.FILE_UPLOAD_HANDLERS, global_settings.FILE_UPLOAD_HANDLERS)
+        request = RequestFactory().post('/admin/', {
+            'documento': SimpleUploadedFile('notas.txt', b'texto plano', content_type='text/plain'),
+        })
+        
+        self.assertEqual(request.FILES['documento'].read(), b'texto plano')
+        self.assertFalse(hasattr(request, 'upload_rejections'))
+    
+    def test_create_view_still_checks_csrf(self):
+        """Test de CSRF en la vista exenta del middleware"""
+        client = Client(enforce_csrf_checks=True)
+        client.login(username='testuser', password='testpass123')
+        data = {
+            'title': 'Recuerdo válido',
+            'description': 'Descripción del recuerdo válido',
+            'date': date.today().isoformat(),
+        }
+        
+        response = client.post(reverse('memories:create_memory'), dict(
+            data, image=SimpleUploadedFile('valida.jpg', self.image_bytes())
+        ))
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Memory.objects.exists())
+        
+        client.get(reverse('memories:create_memory'))
+        token = client.cookies[settings.CSRF_COOKIE_NAME].value
+        response = client.post(reverse('memories:create_memory'), dict(
+            data, image=SimpleUploadedFile('valida.jpg', self.image_bytes()), csrfmiddlewaretoken=token
+        ))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.incoming_files(), [])
+    
+    def test_oversized_body_is_rejected_before_reading(self):
+        """Test de cuerpo declarado desproporcionado: 413 sin leer el formulario"""
+        memory = Memory.objects.create(
+            user=self.user, title='Existente', description='Descripción', date=date.today(),
+            image=SimpleUploadedFile('existente.jpg', self.image_bytes()),
+        )
+        declared = str(settings.FILE_VALIDATION['MAX_FILE_SIZE'] * ABORT_BODY_FACTOR + 1)
+        for url in (reverse('memories:create_memory'), reverse('memories:edit_memory', args=[memory.pk])):
+            response = self.client.post(url, {'title': 'Enorme'}, CONTENT_LENGTH=declared)
+            self.assertEqual(response.status_code, 413)
+            self.assertIn('La imagen no puede ser mayor a', response.content.decode())
+        self.assertEqual(Memory.objects.get().title, 'Existente')
+        self.assertEqual(self.incoming_files(), [])
+    
+    def test_create_view_moves_upload_into_place(self):
+        """Test de subida válida: el archivo recibido pasa a ser el original"""
+        image = SimpleUploadedFile('valida.jpg', self.image_bytes())
+        response = self.client.post(reverse('memories:create_memory'), {
+            'title': 'Recuerdo válido',
+            'description': 'Descripción del recuerdo válido',
+            'image': image,
+            'date': date.today().isoformat(),
+        })
+        
+        self.assertEqual(response.status_code, 302)
+        memory = Memory.objects.get()
+        self.assertTrue(os.path.exists(memory.image.path))
+        self.assertEqual(memory.image_size, len(self.image_bytes()))
+        self.assertEqual(self.incoming_files(), [])
+
+
+class MemoryFormTest(TestCase):
+    """
+    Tests para formularios de recuerdos
+    """
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.test_image = self.create_test_image()
+    
+    def create_test_image(self):
+        """Crear imagen de prueba"""
+        image = Image.new('RGB', (200, 200), color='blue')
+        image_file = io.BytesIO()
+        image.save(image_file, format='JPEG')
+        image_file.seek(0)
+        return SimpleUploadedFile(
+            name='form.jpg',
+            content=image_file.getvalue(),
+            content_type='image/jpeg'
+        )
+    
+    def test_memory_form_valid_data(self):
+        """Test de formulario con datos válidos"""
+        form_data = {
+            'title': 'Recuerdo de prueba',
+            'description': 'Esta es una descripción válida para el formulario',
+            'date': date.today()
+        }
+        
+        form = MemoryForm(data=form_data, files={'image': self.test_image})
+        self.assertTrue(form.is_valid())
+    
+    def test_memory_form_invalid_title(self):
+        """Test de formulario con título inválido"""
+        form_data = {
+            'title': 'AB',  # Muy corto
+            'description': 'Descripción válida para el test',
+            'date': date.today()
+        }
+        
+        form = MemoryForm(data=form_data, files={'image': self.test_image})
+        self.assertFalse(form.is_valid())
+        self.assertIn('title', form.errors)
+    
+    def test_memory_form_invalid_description(self):
+        """Test de formulario con descripción inválida"""
+        form_data = {
+            'title': 'Título válido',
+            'description': 'Corta',  # Muy corta
+            'date': date.today()
+        }
+        
+        form = MemoryForm(data=form_data, files={'image': self.test_image})
+        self.assertFalse(form.is_valid())
+        self.assertIn('description', form.errors)
+    
+    def test_memory_form_missing_required_fields(self):
+        """Test de formulario con campos requeridos faltantes"""
+        form_data = {
+            'title': 'Título válido'
+            # Faltan description, date e image
+        }
+        
+        form = MemoryForm(data=form_data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('description', form.errors)
+        self.assertIn('date', form.errors)
+        self.assertIn('image', form.errors)
+
+
+class RegistrationFormTest(TestCase):
+    """
+    Tests para formulario de registro
+    """
+    
+    def test_registration_form_valid_data(self):
+        """Test de formulario de registro con datos válidos"""
+        form_data = {
+            'username': 'nuevo_usuario',
+            'email': 'nuevo@example.com',
+            'password1': 'contraseña_segura123',
+            'password2': 'contraseña_segura123'
+        }
+        
+        form = RegistrationForm(data=form_data)
+        self.assertTrue(form.is_valid())
+    
+    def test_registration_form_invalid_username(self):
+        """Test de formulario con username inválido"""
+        form_data = {
+            'username': '123usuario',  # Empieza con número
+            'email': 'test@example.com',
+            'password1': 'contraseña_segura123',
+            'password2': 'contraseña_segura123'
+        }
+        
+        form = RegistrationForm(data=form_data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('username', form.errors)
+    
+    def test_registration_form_duplicate_email(self):
+        """Test de formulario con email duplicado"""
+        # Crear usuario existente
         User.objects.create_user(
             username='existente',
             email='existente@example.com',
@@ -418,180 +1590,1327 @@ class RegistrationFormTest(TestCase):
             'password2': 'contraseña_diferente456'
         }
         
-        form = RegistrationForm(data=form_data)
-        self.assertFalse(form.is_valid())
-        self.assertIn('password2', form.errors)
+        form = RegistrationForm(data=form_data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('password2', form.errors)
+
+
+class MemoryViewsTest(TestCase):
+    """
+    Tests para vistas de recuerdos
+    """
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='otherpass123'
+        )
+        
+        # Crear recuerdo de prueba
+        self.memory = Memory(
+            user=self.user,
+            title='Recuerdo de prueba',
+            description='Esta es una descripción de prueba para las vistas',
+            image=self.create_test_image(),
+            date=date.today()
+        )
+        self.memory.save()
+    
+    def create_test_image(self):
+        """Crear imagen de prueba"""
+        image = Image.new('RGB', (200, 200), color='green')
+        image_file = io.BytesIO()
+        image.save(image_file, format='JPEG')
+        image_file.seek(0)
+        return SimpleUploadedFile(
+            name='view.jpg',
+            content=image_file.getvalue(),
+            content_type='image/jpeg'
+        )
+    
+    def test_timeline_view_requires_login(self):
+        """Test que la vista timeline requiere login"""
+        response = self.client.get(reverse('memories:timeline'))
+        self.assertRedirects(response, '/login/?next=/')
+    
+    def test_timeline_view_authenticated(self):
+        """Test de vista timeline con usuario autenticado"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('memories:timeline'))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Recuerdo de prueba')
+        self.assertContains(response, self.user.username)
+    
+    def test_timeline_view_only_user_memories(self):
+        """Test que timeline solo muestra recuerdos del usuario"""
+        # Crear imagen para otro usuario
+        other_image = Image.new('RGB', (200, 200), color='yellow')
+        other_image_file = io.BytesIO()
+        other_image.save(other_image_file, format='JPEG')
+        other_image_file.seek(0)
+        other_test_image = SimpleUploadedFile(
+            name='other.jpg',
+            content=other_image_file.getvalue(),
+            content_type='image/jpeg'
+        )
+        
+        # Crear recuerdo para otro usuario
+        other_memory = Memory(
+            user=self.other_user,
+            title='Recuerdo de otro usuario',
+            description='Este recuerdo no debe aparecer',
+            image=other_test_image,
+            date=date.today()
+        )
+        other_memory.save()
+        
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('memories:timeline'))
+        
+        self.assertContains(response, 'Recuerdo de prueba')
+        self.assertNotContains(response, 'Recuerdo de otro usuario')
+    
+    def test_create_memory_view_requires_login(self):
+        """Test que crear recuerdo requiere login"""
+        response = self.client.get(reverse('memories:create_memory'))
+        self.assertRedirects(response, '/login/?next=/create/')
+    
+    def test_create_memory_view_authenticated(self):
+        """Test de vista crear recuerdo con usuario autenticado"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('memories:create_memory'))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Crear Nuevo Recuerdo')
+    
+    def test_create_memory_post_valid(self):
+        """Test de creación de recuerdo con datos válidos"""
+        self.client.login(username='testuser', password='testpass123')
+        
+        form_data = {
+            'title': 'Nuevo recuerdo',
+            'description': 'Descripción del nuevo recuerdo de prueba',
+            'date': date.today(),
+            'image': self.create_test_image()
+        }
+        
+        response = self.client.post(reverse('memories:create_memory'), data=form_data)
+        
+        # Debe redirigir después de crear
+        self.assertEqual(response.status_code, 302)
+        
+        # Verificar que se creó el recuerdo
+        new_memory = Memory.objects.filter(title='Nuevo recuerdo').first()
+        self.assertIsNotNone(new_memory)
+        self.assertEqual(new_memory.user, self.user)
+    
+    def test_edit_memory_view_owner_only(self):
+        """Test que solo el propietario puede editar un recuerdo"""
+        # Intentar editar con otro usuario
+        self.client.login(username='otheruser', password='otherpass123')
+        response = self.client.get(reverse('memories:edit_memory', kwargs={'pk': self.memory.pk}))
+        
+        self.assertEqual(response.status_code, 404)
+    
+    def test_edit_memory_view_owner(self):
+        """Test de edición de recuerdo por el propietario"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('memories:edit_memory', kwargs={'pk': self.memory.pk}))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Editar Recuerdo')
+        self.assertContains(response, self.memory.title)
+    
+    def test_delete_memory_view_owner_only(self):
+        """Test que solo el propietario puede eliminar un recuerdo"""
+        # Intentar eliminar con otro usuario
+        self.client.login(username='otheruser', password='otherpass123')
+        response = self.client.get(reverse('memories:delete_memory', kwargs={'pk': self.memory.pk}))
+        
+        self.assertEqual(response.status_code, 404)
+    
+    def test_delete_memory_view_owner(self):
+        """Test de eliminación de recuerdo por el propietario"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('memories:delete_memory', kwargs={'pk': self.memory.pk}))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Eliminar Recuerdo')
+        self.assertContains(response, self.memory.title)
+    
+    def test_memory_detail_view_owner_only(self):
+        """Test que solo el propietario puede ver detalles de un recuerdo"""
+        # Intentar ver con otro usuario
+        self.client.login(username='otheruser', password='otherpass123')
+        response = self.client.get(reverse('memories:memory_detail', kwargs={'pk': self.memory.pk}))
+        
+        self.assertEqual(response.status_code, 404)
+    
+    def test_memory_detail_view_owner(self):
+        """Test de vista de detalle por el propietario"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('memories:memory_detail', kwargs={'pk': self.memory.pk}))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.memory.title)
+        self.assertContains(response, self.memory.description)
+
+
+@override_settings(IMAGE_PROCESSING_EAGER=False)
+class TimelinePaginationTest(TestCase):
+    """
+    Tests para la paginación por cursor y la API de la línea de tiempo
+    """
+    
+    def setUp(self):
+        """Crear 30 recuerdos, varios con la misma fecha para probar el desempate"""
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        image = Image.new('RGB', (120, 120), color='pink')
+        image_file = io.BytesIO()
+        image.save(image_file, format='JPEG')
+        for index in range(30):
+            Memory(
+                user=self.user,
+                title=f'Recuerdo número {index}',
+                description='Descripción para probar la paginación',
+                image=SimpleUploadedFile(f'page{index}.jpg', image_file.getvalue(), 'image/jpeg'),
+                date=date(2024, 1, 1) + timedelta(days=index // 4)
+            ).save()
+        self.expected = list(
+            Memory.objects.filter(user=self.user).order_by('-date', '-created_at', '-id').values_list('pk', flat=True)
+        )
+        self.client.login(username='testuser', password='testpass123')
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def test_cursor_roundtrip(self):
+        """Test de codificación y decodificación del cursor"""
+        memory = Memory.objects.first()
+        
+        self.assertEqual(
+            decode_cursor(encode_cursor(memory)),
+            (memory.date, memory.created_at, memory.pk)
+        )
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('no-es-un-cursor')
+    
+    def test_api_walks_whole_timeline(self):
+        """Test de que seguir los cursores de la API recorre todos los recuerdos en orden"""
+        seen = []
+        url = reverse('memories:memory_list_api') + '?limit=7'
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(item['id'] for item in data['results'])
+            url = data['next'] and reverse('memories:memory_list_api') + f"?limit=7&cursor={data['next']}"
+        
+        self.assertEqual(seen, self.expected)
+    
+    def test_api_invalid_cursor(self):
+        """Test de cursor inválido en la API"""
+        response = self.client.get(reverse('memories:memory_list_api') + '?cursor=%%%')
+        
+        self.assertEqual(response.status_code, 400)
+    
+    def test_api_requires_login(self):
+        """Test de que la API requiere autenticación"""
+        self.client.logout()
+        response = self.client.get(reverse('memories:memory_list_api'))
+        
+        self.assertEqual(response.status_code, 302)
+    
+    def test_timeline_cursor_matches_offset_page(self):
+        """Test de que la página por cursor coincide con la página 2 por OFFSET"""
+        first = self.client.get(reverse('memories:timeline'))
+        next_cursor = first.context['next_cursor']
+        
+        by_cursor = self.client.get(reverse('memories:timeline'), {'cursor': next_cursor})
+        by_offset = self.client.get(reverse('memories:timeline'), {'page': 2})
+        
+        self.assertTrue(by_cursor.context['cursor_mode'])
+        self.assertEqual(
+            [memory.pk for memory in by_cursor.context['memories']],
+            [memory.pk for memory in by_offset.context['memories']]
+        )
+        self.assertContains(first, f'?cursor={next_cursor}')
+    
+    def test_timeline_invalid_cursor(self):
+        """Test de cursor inválido en la línea de tiempo"""
+        response = self.client.get(reverse('memories:timeline'), {'cursor': 'xx'})
+        
+        self.assertEqual(response.status_code, 400)
+
+
+class TimelineCacheTest(TestCase):
+    """
+    Tests para el cache por usuario de la línea de tiempo renderizada
+    """
+    
+    def setUp(self):
+        """Configuración inicial"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        image = Image.new('RGB', (150, 150), color='gold')
+        image_file = io.BytesIO()
+        image.save(image_file, format='JPEG')
+        self.memory = Memory(
+            user=self.user,
+            title='Recuerdo cacheado',
+            description='Descripción del recuerdo que se cachea',
+            image=SimpleUploadedFile('cached.jpg', image_file.getvalue(), 'image/jpeg'),
+            date=date.today()
+        )
+        self.memory.save()
+        self.client.login(username='testuser', password='testpass123')
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def memory_queries(self, url):
+        """Consultas a la tabla de recuerdos al pedir la URL"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query for query in queries.captured_queries if 'memories_memory' in query['sql']]
+    
+    def test_second_request_is_served_from_cache(self):
+        """Test de que la segunda visita no consulta los recuerdos"""
+        url = reverse('memories:timeline')
+        
+        self.assertTrue(self.memory_queries(url))
+        self.assertEqual(self.memory_queries(url), [])
+        self.assertEqual(timeline_cache_stats()['hits'], 1)
+        self.assertEqual(timeline_cache_stats()['misses'], 1)
+    
+    def test_pages_are_cached_separately(self):
+        """Test de que cada página o cursor tiene su propio fragmento"""
+        url = reverse('memories:timeline')
+        self.client.get(url)
+        
+        self.assertTrue(self.memory_queries(url + '?page=1'))
+    
+    def test_edit_invalidates_cache(self):
+        """Test de que editar un recuerdo invalida la línea de tiempo"""
+        url = reverse('memories:timeline')
+        self.client.get(url)
+        
+        self.memory.title = 'Título actualizado'
+        self.memory.save()
+        
+        self.assertContains(self.client.get(url), 'Título actualizado')
+    
+    def test_delete_invalidates_cache(self):
+        """Test de que eliminar un recuerdo invalida la línea de tiempo"""
+        url = reverse('memories:timeline')
+        self.client.get(url)
+        
+        self.memory.delete_image_files()
+        self.memory.delete()
+        
+        self.assertNotContains(self.client.get(url), 'Recuerdo cacheado')
+    
+    def test_cache_is_per_user(self):
+        """Test de que cada usuario tiene su propio cache"""
+        self.client.get(reverse('memories:timeline'))
+        User.objects.create_user(username='otheruser', email='o@example.com', password='otherpass123')
+        self.client.login(username='otheruser', password='otherpass123')
+        
+        self.assertNotContains(self.client.get(reverse('memories:timeline')), 'Recuerdo cacheado')
+
+
+class TimelineAggregatesTest(TestCase):
+    """
+    Tests para el índice por año y mes y "un día como hoy"
+    """
+    
+    def setUp(self):
+        """Usuario con recuerdos en distintos años"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.today = date.today()
+        self.last_year = self.create_memory('Hace un año', self.today.replace(year=self.today.year - 1, day=1))
+        self.may = self.create_memory('Mayo', date(2019, 5, 20))
+        self.create_memory('Otro mayo', date(2019, 5, 2))
+        self.create_memory('Recuerdo de junio', date(2019, 6, 1))
+    
+    def create_memory(self, title, memory_date):
+        buffer = io.BytesIO()
+        Image.new('RGB', (120, 120), color='purple').save(buffer, format='JPEG')
+        return Memory.objects.create(
+            user=self.user,
+            title=title,
+            description='Descripción del recuerdo',
+            date=memory_date,
+            image=SimpleUploadedFile('aggregate.jpg', buffer.getvalue(), content_type='image/jpeg'),
+        )
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def test_histogram_groups_by_year_and_month(self):
+        """Test del histograma año → mes"""
+        from .aggregates import date_histogram
+        histogram = date_histogram(self.user.pk)
+        
+        self.assertEqual([entry['year'] for entry in histogram], [self.today.year - 1, 2019])
+        self.assertEqual(histogram[1]['count'], 3)
+        self.assertEqual([(item['month'], item['count']) for item in histogram[1]['months']], [(6, 1), (5, 2)])
+    
+    def test_histogram_is_cached_and_invalidated(self):
+        """Test de que el histograma se cachea y una escritura lo invalida"""
+        from .aggregates import date_histogram
+        date_histogram(self.user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            date_histogram(self.user.pk)
+        self.assertEqual(len(queries), 0)
+        
+        self.create_memory('Nuevo', date(2019, 6, 15))
+        self.assertEqual(date_histogram(self.user.pk)[1]['months'][0]['count'], 2)
+    
+    def test_on_this_day(self):
+        """Test de recuerdos del mismo día en años anteriores"""
+        from .aggregates import on_this_day
+        self.assertEqual(on_this_day(self.user, today=date(2023, 5, 20)), [self.may])
+        self.assertEqual(on_this_day(self.user, today=date(2019, 5, 20)), [])
+        # El 29 de febrero no falla en años no bisiestos
+        self.assertEqual(on_this_day(self.user, today=date(2024, 2, 29)), [])
+    
+    def test_timeline_jumps_to_month(self):
+        """Test de que ?year=&month= filtra la línea de tiempo"""
+        response = self.client.get(reverse('memories:timeline'), {'year': 2019, 'month': 5})
+        
+        self.assertContains(response, 'Otro mayo')
+        self.assertNotContains(response, 'Recuerdo de junio')
+        self.assertNotContains(response, 'Hace un año')
+        self.assertEqual(response.status_code, 200)
+    
+    def test_timeline_rejects_invalid_range(self):
+        """Test de que un rango mal formado responde 400"""
+        response = self.client.get(reverse('memories:timeline'), {'year': 2019, 'month': 13})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_histogram_and_on_this_day_api(self):
+        """Test de los endpoints JSON"""
+        response = self.client.get(reverse('memories:memory_histogram_api'))
+        data = response.json()
+        self.assertEqual(data['results'][1]['year'], 2019)
+        self.assertIn('year=2019&month=6', data['results'][1]['months'][0]['url'])
+        
+        response = self.client.get(reverse('memories:on_this_day_api'))
+        self.assertEqual(response.json()['status'], 'success')
+        
+        response = self.client.get(reverse('memories:memory_list_api'), {'year': 2019})
+        self.assertEqual(len(response.json()['results']), 3)
+
+
+class ConditionalGetTest(TestCase):
+    """
+    Tests para respuestas 304 con ETag / Last-Modified
+    """
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        image = Image.new('RGB', (150, 150), color='navy')
+        image_file = io.BytesIO()
+        image.save(image_file, format='JPEG')
+        self.memory = Memory(
+            user=self.user,
+            title='Recuerdo condicional',
+            description='Descripción del recuerdo con validadores',
+            image=SimpleUploadedFile('etag.jpg', image_file.getvalue(), 'image/jpeg'),
+            date=date.today()
+        )
+        self.memory.save()
+        self.client.login(username='testuser', password='testpass123')
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def urls(self):
+        """URLs con validadores"""
+        return [
+            reverse('memories:timeline'),
+            reverse('memories:memory_detail', kwargs={'pk': self.memory.pk}),
+            reverse('memories:memory_count_api'),
+        ]
+    
+    def test_if_none_match_returns_304(self):
+        """Test de 304 con If-None-Match, sin consultar los recuerdos completos"""
+        self.client.get(reverse('memories:timeline'))  # Primera visita: fija la cookie CSRF
+        for url in self.urls():
+            etag = self.client.get(url)['ETag']
+            
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+            self.assertFalse(any('"title"' in query['sql'] for query in queries.captured_queries))
+    
+    def test_if_modified_since_returns_304(self):
+        """Test de 304 con If-Modified-Since"""
+        self.client.get(reverse('memories:timeline'))
+        for url in self.urls():
+            last_modified = self.client.get(url)['Last-Modified']
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            
+            self.assertEqual(response.status_code, 304)
+    
+    def test_changes_invalidate_validators(self):
+        """Test de que editar el recuerdo cambia los validadores"""
+        self.client.get(reverse('memories:timeline'))
+        etags = [self.client.get(url)['ETag'] for url in self.urls()]
+        
+        memory = Memory.objects.get(pk=self.memory.pk)
+        memory.title = 'Título modificado'
+        memory.save()
+        
+        for url, etag in zip(self.urls(), etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    
+    def test_responses_are_private(self):
+        """Test de que las respuestas no se comparten entre usuarios"""
+        response = self.client.get(reverse('memories:timeline'))
+        
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+    
+    def test_other_user_gets_404_before_validators(self):
+        """Test de que el detalle ajeno sigue siendo 404"""
+        User.objects.create_user(username='otheruser', email='o@example.com', password='otherpass123')
+        self.client.login(username='otheruser', password='otherpass123')
+        response = self.client.get(
+            reverse('memories:memory_detail', kwargs={'pk': self.memory.pk}),
+            HTTP_IF_NONE_MATCH='"cualquiera"'
+        )
+        
+        self.assertEqual(response.status_code, 404)
 
 
-class MemoryViewsTest(TestCase):
+class ReplicaRouterTest(TestCase):
     """
-    Tests para vistas de recuerdos
+    Tests para el enrutamiento de lecturas a réplicas
     """
     
     def setUp(self):
-        """Configuración inicial"""
-        self.client = Client()
+        """Usuario autenticado"""
         self.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        
-        self.other_user = User.objects.create_user(
-            username='otheruser',
-            email='other@example.com',
-            password='otherpass123'
-        )
-        
-        # Crear recuerdo de prueba
-        self.memory = Memory(
+        self.client.login(username='testuser', password='testpass123')
+    
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_reads_go_to_replica_only_inside_context(self):
+        """Test de que solo replica_reads() manda lecturas a la réplica"""
+        from .routers import ReplicaRouter, replica_reads
+        router = ReplicaRouter()
+        
+        self.assertEqual(router.db_for_read(Memory), 'default')
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Memory), 'replica')
+            self.assertEqual(router.db_for_write(Memory), 'default')
+        self.assertEqual(router.db_for_read(Memory), 'default')
+    
+    def test_without_replicas_reads_use_primary(self):
+        """Test de que sin réplicas todo va a la primaria"""
+        from .routers import ReplicaRouter, replica_reads
+        with replica_reads():
+            self.assertEqual(ReplicaRouter().db_for_read(Memory), 'default')
+    
+    @override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=30)
+    def test_post_makes_user_sticky_to_primary(self):
+        """Test de que un POST marca la sesión para leer de la primaria"""
+        from .routers import STICKY_SESSION_KEY
+        self.client.post(reverse('memories:create_memory'), {'title': ''})
+        
+        sticky_until = self.client.session[STICKY_SESSION_KEY]
+        self.assertGreater(sticky_until, time.time() + 20)
+    
+    def test_post_without_replicas_leaves_session_alone(self):
+        """Test de que sin réplicas no se escribe en la sesión"""
+        from .routers import STICKY_SESSION_KEY
+        self.client.post(reverse('memories:create_memory'), {'title': ''})
+        self.assertNotIn(STICKY_SESSION_KEY, self.client.session)
+
+
+class MediaFileTest(TestCase):
+    """
+    Tests del envío de imágenes con URLs firmadas (memories/media.py)
+    """
+    
+    def setUp(self):
+        """Recuerdo con imagen en un MEDIA_ROOT temporal"""
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name, MEDIA_SENDFILE='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.user = User.objects.create_user(username='owner', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        image_file = io.BytesIO()
+        Image.new('RGB', (120, 120), color='red').save(image_file, format='JPEG')
+        self.content = image_file.getvalue()
+        self.memory = Memory.objects.create(
             user=self.user,
-            title='Recuerdo de prueba',
-            description='Esta es una descripción de prueba para las vistas',
-            image=self.create_test_image(),
+            title='Recuerdo con imagen',
+            description='Descripción del recuerdo con imagen',
+            image=SimpleUploadedFile('foto.jpg', self.content, content_type='image/jpeg'),
             date=date.today()
         )
-        self.memory.save()
+        self.client.force_login(self.user)
     
-    def create_test_image(self):
-        """Crear imagen de prueba"""
-        image = Image.new('RGB', (200, 200), color='green')
+    def get(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        self.addCleanup(response.close)
+        return response
+    
+    def test_signed_url_serves_file(self):
+        """Test del archivo completo con cache immutable"""
+        response = self.get(self.memory.image_url)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+    
+    def test_timeline_images_need_no_queries(self):
+        """Las 12 imágenes de una página de la línea de tiempo no consultan la base"""
+        import html
+        import re
+        
+        for index in range(11):
+            image_file = io.BytesIO()
+            Image.new('RGB', (120, 120), color=(index * 20, 0, 0)).save(image_file, format='JPEG')
+            Memory.objects.create(
+                user=self.user,
+                title=f'Recuerdo {index}',
+                description='Descripción del recuerdo con imagen',
+                image=SimpleUploadedFile('foto.jpg', image_file.getvalue(), content_type='image/jpeg'),
+                date=date.today() - timedelta(days=index + 1)
+            )
+        response = self.client.get(reverse('memories:timeline'))
+        urls = [html.unescape(url) for url in re.findall(r'<img src="([^"]+)"', response.content.decode())]
+        self.assertEqual(len(urls), 12)
+        
+        for url in urls:
+            with self.assertNumQueries(0):
+                self.assertEqual(self.get(url).status_code, 200)
+    
+    def test_signed_url_expires(self):
+        """Una URL vencida ya no basta: pasa a la comprobación en la base"""
+        from .media import media_url
+        
+        expired = media_url(self.memory.image.name, self.user.pk, expires=int(time.time()) - 1)
+        self.assertEqual(self.get(expired).status_code, 200)  # El dueño, consultando la base
+        self.client.logout()
+        self.assertEqual(self.get(expired).status_code, 404)
+        self.assertEqual(self.get(self.memory.image_url).status_code, 200)
+    
+    def test_signed_url_cannot_be_altered(self):
+        """Cambiar el usuario, el vencimiento o el archivo invalida la firma"""
+        url = self.memory.image_url
+        self.client.force_login(self.other)
+        expires = url.split('e=')[1].split('&')[0]
+        for altered in (
+            url.replace(f'u={self.user.pk}', f'u={self.other.pk}'),
+            url.replace(f'e={expires}', f'e={int(expires) + 3600}'),
+            url.replace('.jpg?', '.png?'),
+        ):
+            self.assertEqual(self.get(altered).status_code, 404)
+    
+    def test_page_etag_changes_with_url_window(self):
+        """Un 304 no debe reutilizar HTML con URLs de imágenes vencidas"""
+        from unittest import mock
+        
+        url = reverse('memories:memory_detail', args=[self.memory.pk])
+        self.client.get(url)  # Fija la cookie CSRF, que forma parte del ETag
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+        with mock.patch('memories.views.url_window', return_value=0):
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+    
+    def test_unsigned_url_checks_ownership(self):
+        """Sin firma se consulta la base: el dueño y el staff sí, otros no"""
+        url = self.memory.image.url
+        self.assertEqual(self.get(url).status_code, 200)
+        
+        self.client.force_login(self.other)
+        self.assertEqual(self.get(url).status_code, 404)
+        self.other.is_staff = True
+        self.other.save()
+        self.assertEqual(self.get(url).status_code, 200)
+    
+    def test_range_requests(self):
+        """Test de Range, rangos fuera del archivo e If-Range"""
+        url = self.memory.image_url
+        size = len(self.content)
+        
+        response = self.get(url, Range='bytes=0-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 0-9/{size}')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(b''.join(response.streaming_content), self.content[:10])
+        
+        response = self.get(url, Range='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-5:])
+        
+        response = self.get(url, Range=f'bytes={size}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{size}')
+        
+        etag = self.get(url)['ETag']
+        self.assertEqual(self.get(url, Range='bytes=0-9', If_Range=etag).status_code, 206)
+        self.assertEqual(self.get(url, Range='bytes=0-9', If_Range='"otra"').status_code, 200)
+    
+    def test_conditional_requests(self):
+        """Test de 304 con If-None-Match e If-Modified-Since"""
+        url = self.memory.image_url
+        response = self.get(url)
+        
+        not_modified = self.get(url, If_None_Match=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertIn('immutable', not_modified['Cache-Control'])
+        self.assertEqual(self.get(url, If_Modified_Since=response['Last-Modified']).status_code, 304)
+    
+    def test_sendfile_offload(self):
+        """Con MEDIA_SENDFILE el servidor web envía el archivo"""
+        name = self.memory.image.name
+        with override_settings(MEDIA_SENDFILE='x-accel-redirect'):
+            response = self.get(self.memory.image_url)
+            self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{name}')
+            self.assertEqual(response.content, b'')
+        with override_settings(MEDIA_SENDFILE='x-sendfile'):
+            response = self.get(self.memory.image_url)
+            self.assertEqual(response['X-Sendfile'], os.path.join(settings.MEDIA_ROOT, name))
+    
+    def test_path_traversal(self):
+        """Una firma válida no permite salir de MEDIA_ROOT"""
+        from .media import media_url
+        
+        response = self.get(media_url('../db.sqlite3', self.user.pk).replace('../', '..%2F'))
+        self.assertEqual(response.status_code, 404)
+
+
+class ImagePlaceholderTest(TestCase):
+    """
+    Tests del placeholder y el tamaño intrínseco de las imágenes
+    """
+    
+    def setUp(self):
+        """MEDIA_ROOT temporal"""
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='placeholder', password='testpass123')
+        
+        # Foto de teléfono: 400x200 guardada de costado (orientación EXIF 6)
+        exif = Image.Exif()
+        exif[0x0112] = 6
         image_file = io.BytesIO()
-        image.save(image_file, format='JPEG')
-        image_file.seek(0)
-        return SimpleUploadedFile(
-            name='view.jpg',
-            content=image_file.getvalue(),
-            content_type='image/jpeg'
+        Image.new('RGB', (400, 200), color='navy').save(image_file, format='JPEG', exif=exif)
+        self.content = image_file.getvalue()
+    
+    def create_memory(self, title='Recuerdo con placeholder'):
+        return Memory.objects.create(
+            user=self.user,
+            title=title,
+            description='Descripción del recuerdo con placeholder',
+            image=SimpleUploadedFile('foto.jpg', self.content, content_type='image/jpeg'),
+            date=date.today()
         )
     
-    def test_timeline_view_requires_login(self):
-        """Test que la vista timeline requiere login"""
-        response = self.client.get(reverse('memories:timeline'))
-        self.assertRedirects(response, '/login/?next=/')
+    def test_placeholder_computed_on_upload(self):
+        """Test del placeholder WebP diminuto y el tamaño ya orientado"""
+        import base64
+        
+        memory = self.create_memory()
+        memory.refresh_from_db()
+        
+        self.assertEqual((memory.image_width, memory.image_height), (200, 400))
+        prefix = 'data:image/webp;base64,'
+        self.assertTrue(memory.placeholder.startswith(prefix))
+        self.assertLess(len(memory.placeholder), 1024)
+        with Image.open(io.BytesIO(base64.b64decode(memory.placeholder[len(prefix):]))) as placeholder:
+            self.assertEqual(placeholder.size, (20, 40))
     
-    def test_timeline_view_authenticated(self):
-        """Test de vista timeline con usuario autenticado"""
-        self.client.login(username='testuser', password='testpass123')
+    def test_placeholder_shared_with_same_image(self):
+        """Test de que un recuerdo con la misma imagen reutiliza el placeholder"""
+        first = self.create_memory()
+        first.refresh_from_db()
+        second = self.create_memory('Recuerdo repetido')
+        second.refresh_from_db()
+        
+        self.assertEqual(second.placeholder, first.placeholder)
+        self.assertEqual(second.image_width, 200)
+    
+    def test_timeline_inlines_placeholder(self):
+        """Test de la línea de tiempo con placeholder y tamaño en el HTML"""
+        memory = self.create_memory()
+        memory.refresh_from_db()
+        self.client.force_login(self.user)
+        
         response = self.client.get(reverse('memories:timeline'))
         
-        self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'Recuerdo de prueba')
-        self.assertContains(response, self.user.username)
+        self.assertContains(response, f'url({memory.placeholder})')
+        self.assertContains(response, 'width="200" height="400"')
     
-    def test_timeline_view_only_user_memories(self):
-        """Test que timeline solo muestra recuerdos del usuario"""
-        # Crear imagen para otro usuario
-        other_image = Image.new('RGB', (200, 200), color='yellow')
-        other_image_file = io.BytesIO()
-        other_image.save(other_image_file, format='JPEG')
-        other_image_file.seek(0)
-        other_test_image = SimpleUploadedFile(
-            name='other.jpg',
-            content=other_image_file.getvalue(),
-            content_type='image/jpeg'
+    def test_backfill_placeholders(self):
+        """Test de backfill_placeholders sobre recuerdos anteriores al campo"""
+        memory = self.create_memory()
+        other = self.create_memory('Recuerdo repetido')
+        memory.refresh_from_db()
+        expected = memory.placeholder
+        Memory.objects.update(placeholder='', image_width=0, image_height=0)
+        
+        out = io.StringIO()
+        call_command('backfill_placeholders', stdout=out)
+        
+        self.assertIn('2 recuerdos actualizados', out.getvalue())
+        for pk in (memory.pk, other.pk):
+            memory = Memory.objects.get(pk=pk)
+            self.assertEqual(memory.placeholder, expected)
+            self.assertEqual((memory.image_width, memory.image_height), (200, 400))
+        
+        out = io.StringIO()
+        call_command('backfill_placeholders', stdout=out)
+        self.assertIn('0 recuerdos actualizados', out.getvalue())
+
+
+class ImageNormalizationTest(TestCase):
+    """
+    Tests de la recodificación de imágenes (IMAGE_NORMALIZATION)
+    """
+    
+    OPTIONS = {
+        'ENABLED': True,
+        'FORMAT': 'WEBP',
+        'QUALITY': 82,
+        'MAX_SIDE': 2560,
+        'MIN_SAVING': 0.1,
+        'VARIANTS': {'WEBP': 80},
+    }
+    
+    def setUp(self):
+        """MEDIA_ROOT temporal con la recodificación activada"""
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root.name, MEDIA_SENDFILE='', IMAGE_NORMALIZATION=self.OPTIONS
         )
-        
-        # Crear recuerdo para otro usuario
-        other_memory = Memory(
-            user=self.other_user,
-            title='Recuerdo de otro usuario',
-            description='Este recuerdo no debe aparecer',
-            image=other_test_image,
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='normal', password='testpass123')
+    
+    def create_memory(self, content, name='foto.jpg'):
+        return Memory.objects.create(
+            user=self.user,
+            title='Recuerdo recodificado',
+            description='Descripción del recuerdo recodificado',
+            image=SimpleUploadedFile(name, content, content_type='image/jpeg'),
             date=date.today()
         )
-        other_memory.save()
+    
+    def phone_photo(self, size=(3000, 1000)):
+        """JPEG con orientación EXIF (girar 90°) y un comentario"""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        image_file = io.BytesIO()
+        Image.new('RGB', size, color='teal').save(
+            image_file, format='JPEG', quality=95, exif=exif, comment=b'camara'
+        )
+        return image_file.getvalue()
+    
+    def test_upload_normalized(self):
+        """Test del original en WebP, girado, limitado y sin metadatos"""
+        with self.captureOnCommitCallbacks(execute=True):
+            memory = self.create_memory(self.phone_photo())
+        memory.refresh_from_db()
+        
+        self.assertTrue(memory.image.name.endswith('.webp'))
+        self.assertEqual(memory.image_size, memory.image.size)
+        self.assertEqual(memory.blob.name, memory.image.name)
+        with Image.open(memory.image.path) as image:
+            self.assertEqual(image.size, (853, 2560))
+            self.assertFalse(image.getexif())
+        # El original sin recodificar se purgó
+        self.assertEqual(ImageBlob.objects.count(), 1)
+        stem = os.path.splitext(os.path.basename(memory.image.name))[0]
+        for _, _, files in os.walk(settings.MEDIA_ROOT):
+            self.assertTrue(all(name.startswith(stem) for name in files), files)
+    
+    def test_animation_kept(self):
+        """Test de que los GIF animados se guardan tal cual"""
+        frames = [Image.new('P', (120, 120), color) for color in (1, 2)]
+        image_file = io.BytesIO()
+        frames[0].save(image_file, format='GIF', save_all=True, append_images=frames[1:])
+        memory = self.create_memory(image_file.getvalue(), name='baile.gif')
+        memory.refresh_from_db()
         
-        self.client.login(username='testuser', password='testpass123')
-        response = self.client.get(reverse('memories:timeline'))
+        self.assertTrue(memory.image.name.endswith('.gif'))
+        self.assertTrue(memory.thumbnail)
+    
+    def test_variant_negotiated_by_accept(self):
+        """Test de la variante WebP del derivado según el encabezado Accept"""
+        memory = self.create_memory(self.phone_photo())
+        memory.refresh_from_db()
+        self.client.force_login(self.user)
+        
+        response = self.client.get(memory.thumbnail_url, headers={'Accept': 'image/avif,image/webp,*/*'})
+        self.addCleanup(response.close)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('Accept', response['Vary'])
+        
+        response = self.client.get(memory.thumbnail_url, headers={'Accept': 'image/*'})
+        self.addCleanup(response.close)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('Accept', response['Vary'])
+    
+    def test_backfill_existing_images(self):
+        """Test de normalize_images sobre imágenes subidas sin recodificar"""
+        with self.settings(IMAGE_NORMALIZATION={**self.OPTIONS, 'ENABLED': False}):
+            memory = self.create_memory(self.phone_photo())
+            other = self.create_memory(self.phone_photo())
+        memory.refresh_from_db()
+        old_blob, old_size = memory.blob_id, memory.image_size
+        self.assertTrue(memory.image.name.endswith('.jpg'))
+        
+        out = io.StringIO()
+        call_command('normalize_images', workers=0, stdout=out)
+        self.assertIn('1 originales recodificados', out.getvalue())
+        
+        memory.refresh_from_db()
+        other.refresh_from_db()
+        self.assertTrue(memory.image.name.endswith('.webp'))
+        self.assertEqual(other.image.name, memory.image.name)
+        self.assertEqual(memory.blob.ref_count, 2)
+        self.assertFalse(ImageBlob.objects.filter(pk=old_blob).exists())
+        self.assertTrue(memory.thumbnail.name.startswith(os.path.splitext(memory.image.name)[0]))
+        self.assertTrue(os.path.exists(os.path.splitext(memory.thumbnail.path)[0] + '.webp'))
+        stats = UserMemoryStats.objects.get(user=self.user)
+        self.assertEqual(stats.total_image_bytes, 2 * memory.image_size)
+        self.assertLess(memory.image_size, old_size)
+        
+        out = io.StringIO()
+        call_command('normalize_images', workers=0, stdout=out)
+        self.assertIn('1 ya al día', out.getvalue())
+    
+    def test_backfill_requires_enabled(self):
+        """Test de que normalize_images no corre con la recodificación desactivada"""
+        from django.core.management.base import CommandError
         
-        self.assertContains(response, 'Recuerdo de prueba')
-        self.assertNotContains(response, 'Recuerdo de otro usuario')
+        with self.settings(IMAGE_NORMALIZATION={**self.OPTIONS, 'ENABLED': False}):
+            with self.assertRaises(CommandError):
+                call_command('normalize_images', workers=0, stdout=io.StringIO())
+
+
+class MetricsTest(TestCase):
+    """
+    Tests para las métricas de rendimiento y /metrics/
+    """
     
-    def test_create_memory_view_requires_login(self):
-        """Test que crear recuerdo requiere login"""
-        response = self.client.get(reverse('memories:create_memory'))
-        self.assertRedirects(response, '/login/?next=/create/')
+    def setUp(self):
+        """Usuario staff y un usuario normal"""
+        cache.clear()
+        self.staff = User.objects.create_user(username='staffuser', password='testpass123', is_staff=True)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
     
-    def test_create_memory_view_authenticated(self):
-        """Test de vista crear recuerdo con usuario autenticado"""
+    def test_requests_are_measured_per_view(self):
+        """Test de latencia, consultas y cache por vista"""
         self.client.login(username='testuser', password='testpass123')
-        response = self.client.get(reverse('memories:create_memory'))
+        self.client.get(reverse('memories:timeline'))
+        self.client.logout()
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(reverse('memories:metrics'))
         
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'Crear Nuevo Recuerdo')
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('timeline_http_requests_total{view="memories:timeline",method="GET",status="200"}', body)
+        self.assertIn('timeline_http_request_duration_seconds_bucket{view="memories:timeline",le="+Inf"}', body)
+        self.assertIn('timeline_db_queries_per_request_count{view="memories:timeline"}', body)
+        self.assertIn('timeline_cache_requests_total{view="memories:timeline",outcome="misses"}', body)
+        self.assertIn('timeline_http_response_size_bytes_sum{view="memories:timeline"}', body)
     
-    def test_create_memory_post_valid(self):
-        """Test de creación de recuerdo con datos válidos"""
-        self.client.login(username='testuser', password='testpass123')
-        
-        form_data = {
-            'title': 'Nuevo recuerdo',
-            'description': 'Descripción del nuevo recuerdo de prueba',
-            'date': date.today(),
-            'image': self.create_test_image()
+    def test_metrics_are_summed_across_workers(self):
+        """Test de que se suman los archivos de todos los workers"""
+        import shutil
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        snapshot = {
+            'counters': [['http_requests_total', [['view', 'otro'], ['method', 'GET'], ['status', '200']], 3]],
+            'histograms': [],
         }
+        for pid in (1, 2):
+            with open(os.path.join(directory, f'worker-{pid}.json'), 'w') as handle:
+                json.dump(snapshot, handle)
         
-        response = self.client.post(reverse('memories:create_memory'), data=form_data)
-        
-        # Debe redirigir después de crear
-        self.assertEqual(response.status_code, 302)
+        with override_settings(MONITORING={'METRICS_DIR': directory, 'METRICS_TOKEN': 'secreto'}):
+            response = self.client.get(reverse('memories:metrics'), HTTP_AUTHORIZATION='Bearer secreto')
         
-        # Verificar que se creó el recuerdo
-        new_memory = Memory.objects.filter(title='Nuevo recuerdo').first()
-        self.assertIsNotNone(new_memory)
-        self.assertEqual(new_memory.user, self.user)
+        self.assertIn('timeline_http_requests_total{view="otro",method="GET",status="200"} 6', response.content.decode())
+        self.assertTrue(os.path.exists(os.path.join(directory, f'worker-{os.getpid()}.json')))
     
-    def test_edit_memory_view_owner_only(self):
-        """Test que solo el propietario puede editar un recuerdo"""
-        # Intentar editar con otro usuario
-        self.client.login(username='otheruser', password='otherpass123')
-        response = self.client.get(reverse('memories:edit_memory', kwargs={'pk': self.memory.pk}))
-        
-        self.assertEqual(response.status_code, 404)
+    def test_dead_workers_are_merged_into_aggregate(self):
+        """Test de que los archivos de workers terminados se suman a aggregate.json y se borran"""
+        import runpy
+        import shutil
+        import subprocess
+        import sys
+        from unittest import mock
+        from .metrics import AGGREGATE_FILE, collect
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        labels = [['view', 'otro'], ['method', 'GET'], ['status', '200']]
+        snapshot = {
+            'counters': [['http_requests_total', labels, 3]],
+            'histograms': [['db_queries_per_request', [['view', 'otro']], [1] + [0] * 9]],
+        }
+        finished = []
+        for _ in range(2):
+            process = subprocess.Popen([sys.executable, '-c', 'pass'])
+            process.wait()
+            finished.append(process.pid)
+            with open(os.path.join(directory, f'worker-{process.pid}.json'), 'w') as handle:
+                json.dump(snapshot, handle)
+        
+        key = ('http_requests_total', tuple(map(tuple, labels)))
+        with override_settings(MONITORING={'METRICS_DIR': directory}):
+            # child_exit de gunicorn para el primero; el segundo lo detecta /metrics/
+            hooks = runpy.run_path(os.path.join(settings.BASE_DIR, 'gunicorn.conf.py'))
+            hooks['child_exit'](mock.Mock(), mock.Mock(pid=finished[0]))
+            self.assertFalse(os.path.exists(os.path.join(directory, f'worker-{finished[0]}.json')))
+            
+            counters, histograms = collect()
+            self.assertEqual(counters[key], 6)
+            self.assertEqual(histograms[('db_queries_per_request', (('view', 'otro'),))][0], 2)
+            counters, histograms = collect()
+            self.assertEqual(counters[key], 6)
+        
+        self.assertEqual(
+            sorted(name for name in os.listdir(directory) if name.endswith('.json')),
+            sorted([AGGREGATE_FILE, f'worker-{os.getpid()}.json'])
+        )
     
-    def test_edit_memory_view_owner(self):
-        """Test de edición de recuerdo por el propietario"""
+    def test_metrics_are_private(self):
+        """Test de que /metrics/ no es público"""
+        self.assertEqual(self.client.get(reverse('memories:metrics')).status_code, 404)
         self.client.login(username='testuser', password='testpass123')
-        response = self.client.get(reverse('memories:edit_memory', kwargs={'pk': self.memory.pk}))
+        self.assertEqual(self.client.get(reverse('memories:metrics')).status_code, 404)
         
+        with override_settings(MONITORING={'METRICS_TOKEN': 'secreto'}):
+            response = self.client.get(reverse('memories:metrics'), HTTP_AUTHORIZATION='Bearer otro')
+        self.assertEqual(response.status_code, 404)
+
+
+class HealthEndpointTest(TestCase):
+    """
+    Tests para /health/ y sus variantes
+    """
+    
+    def setUp(self):
+        """Limpiar resultados cacheados entre tests"""
+        from . import health
+        health._results.clear()
+    
+    def test_liveness_does_not_query(self):
+        """Test de que el sondeo de vida no consulta la base"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('memories:health_live'))
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'Editar Recuerdo')
-        self.assertContains(response, self.memory.title)
+        self.assertEqual(response.json()['status'], 'ok')
+        self.assertEqual(len(queries), 0)
     
-    def test_delete_memory_view_owner_only(self):
-        """Test que solo el propietario puede eliminar un recuerdo"""
-        # Intentar eliminar con otro usuario
-        self.client.login(username='otheruser', password='otherpass123')
-        response = self.client.get(reverse('memories:delete_memory', kwargs={'pk': self.memory.pk}))
-        
-        self.assertEqual(response.status_code, 404)
+    def test_readiness_runs_only_its_checks(self):
+        """Test de la variante de disponibilidad"""
+        os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+        response = self.client.get(reverse('memories:health_ready'))
+        checks = response.json()['checks']
+        self.assertEqual(set(checks), {'Base de Datos', 'Cache', 'Archivos Media'})
+        self.assertTrue(checks['Base de Datos']['healthy'])
     
-    def test_delete_memory_view_owner(self):
-        """Test de eliminación de recuerdo por el propietario"""
-        self.client.login(username='testuser', password='testpass123')
-        response = self.client.get(reverse('memories:delete_memory', kwargs={'pk': self.memory.pk}))
-        
+    def test_results_are_cached(self):
+        """Test de que sondeos seguidos reutilizan el resultado"""
+        from unittest import mock
+        from . import health
+        with mock.patch.object(health, 'run_checks', return_value=(True, {})) as run_checks:
+            self.client.get(reverse('memories:health'))
+            self.client.get(reverse('memories:health'))
+        self.assertEqual(run_checks.call_count, 1)
+    
+    def test_slow_check_times_out(self):
+        """Test de que una verificación lenta no bloquea la respuesta"""
+        import threading
+        from unittest import mock
+        from . import health
+        release = threading.Event()
+        self.addCleanup(release.set)
+        slow = mock.Mock(side_effect=lambda: release.wait(5) and {'healthy': True, 'message': 'OK'})
+        with mock.patch.dict(health.CHECKS, {'Cache': slow}):
+            started = time.monotonic()
+            healthy, results = health.run_checks(['Cache'], timeout=0.1)
+        
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertFalse(healthy)
+        self.assertIn('Tiempo agotado', results['Cache']['message'])
+    
+    def test_failing_check_returns_503(self):
+        """Test de que un problema responde 503"""
+        from unittest import mock
+        from . import health
+        failing = {'Cache': {'healthy': False, 'message': 'Caído'}}
+        with mock.patch.object(health, 'run_checks', return_value=(False, failing)):
+            response = self.client.get(reverse('memories:health'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['status'], 'error')
+
+
+class AsyncViewsTest(TestCase):
+    """
+    Tests de las vistas async que se sirven con ASGI
+    """
+    
+    def setUp(self):
+        """Activar ASYNC_VIEWS y recargar las URLs"""
+        import importlib
+        from django.urls import clear_url_caches
+        from timeline_love import urls as root_urls
+        from . import urls
+        
+        def load_urls():
+            clear_url_caches()
+            importlib.reload(urls)
+            importlib.reload(root_urls)  # Su include() guarda las rutas ya cargadas
+        
+        settings_override = override_settings(ASYNC_VIEWS=True)
+        settings_override.enable()
+        load_urls()
+        self.addCleanup(load_urls)
+        self.addCleanup(settings_override.disable)
+        
+        self.user = User.objects.create_user(username='asyncuser', password='testpass123')
+        self.memory = self.create_memory(self.user, 'Recuerdo async')
+        self.other_memory = self.create_memory(User.objects.create_user(username='otheruser'), 'Ajeno')
+        self.async_client.force_login(self.user)
+    
+    def create_memory(self, user, title):
+        buffer = io.BytesIO()
+        Image.new('RGB', (120, 120), color='teal').save(buffer, format='JPEG')
+        return Memory.objects.create(
+            user=user,
+            title=title,
+            description='Descripción del recuerdo',
+            date=date(2024, 5, 1),
+            image=SimpleUploadedFile('async.jpg', buffer.getvalue(), content_type='image/jpeg'),
+        )
+    
+    def tearDown(self):
+        """Eliminar archivos generados"""
+        for memory in Memory.objects.all():
+            memory.delete_image_files()
+    
+    def test_read_views_are_async(self):
+        """Test de que las URLs apuntan a las vistas async"""
+        from django.urls import resolve
+        from . import async_views
+        for path, view in (('/', async_views.TimelineView), ('/health/live/', async_views.LivenessView)):
+            view_class = resolve(path).func.view_class
+            self.assertIs(view_class, view)
+            self.assertTrue(view_class.view_is_async)
+    
+    async def test_timeline_and_not_modified(self):
+        """Test de la línea de tiempo async y su respuesta 304"""
+        await self.async_client.get(reverse('memories:timeline'))  # Primera visita: fija la cookie CSRF
+        response = await self.async_client.get(reverse('memories:timeline'))
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'Eliminar Recuerdo')
-        self.assertContains(response, self.memory.title)
+        self.assertContains(response, 'Recuerdo async')
+        
+        response = await self.async_client.get(
+            reverse('memories:timeline'), headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(response.status_code, 304)
     
-    def test_memory_detail_view_owner_only(self):
-        """Test que solo el propietario puede ver detalles de un recuerdo"""
-        # Intentar ver con otro usuario
-        self.client.login(username='otheruser', password='otherpass123')
-        response = self.client.get(reverse('memories:memory_detail', kwargs={'pk': self.memory.pk}))
+    async def test_detail_belongs_to_user(self):
+        """Test del detalle async y de recuerdos ajenos"""
+        response = await self.async_client.get(reverse('memories:memory_detail', args=[self.memory.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Recuerdo async')
         
+        response = await self.async_client.get(reverse('memories:memory_detail', args=[self.other_memory.pk]))
         self.assertEqual(response.status_code, 404)
     
-    def test_memory_detail_view_owner(self):
-        """Test de vista de detalle por el propietario"""
-        self.client.login(username='testuser', password='testpass123')
-        response = self.client.get(reverse('memories:memory_detail', kwargs={'pk': self.memory.pk}))
-        
+    async def test_count(self):
+        """Test del conteo async"""
+        response = await self.async_client.get(reverse('memories:memory_count_api'))
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, self.memory.title)
-        self.assertContains(response, self.memory.description)
+        self.assertEqual(json.loads(response.content)['count'], 1)  # Solo los propios
+    
+    async def test_anonymous_redirects_to_login(self):
+        """Test de que las vistas async siguen exigiendo sesión"""
+        from django.test import AsyncClient
+        response = await AsyncClient().get(reverse('memories:timeline'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(settings.LOGIN_URL, response['Location'])
+    
+    async def test_health(self):
+        """Test de los sondeos async"""
+        from . import health
+        health._results.clear()
+        response = await self.async_client.get(reverse('memories:health_live'))
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(reverse('memories:health_ready'))
+        self.assertIn('Base de Datos', json.loads(response.content)['checks'])
+    
+    async def test_metrics_count_queries(self):
+        """Test de que las consultas hechas en otro hilo cuentan para la petición"""
+        from . import metrics
+        metrics.registry.histograms.clear()
+        await self.async_client.get(reverse('memories:memory_count_api'))
+        row = metrics.registry.histograms[('db_queries_per_request', (('view', 'memories:memory_count_api'),))]
+        self.assertEqual(sum(row[:-1]), 1)
+        self.assertGreater(row[-1], 0)
+
+
+class StaticAssetsTest(TestCase):
+    """
+    Tests del CSS generado por build_assets (sin CDN)
+    """
+    
+    def test_bundle_is_up_to_date(self):
+        """static/css/app.css corresponde a las plantillas actuales"""
+        from .assets import BUNDLE, TAILWIND_CLI, build_bundle, static_dir
+        
+        if shutil.which(TAILWIND_CLI) is None:
+            self.skipTest('tailwindcss-bin no está instalado')
+        css = build_bundle()
+        with open(os.path.join(static_dir(), BUNDLE), encoding='utf-8') as handle:
+            self.assertEqual(handle.read(), css, 'Ejecuta python manage.py build_assets')
+        for rule in ('.font-script{', '.card-hover{', '.group-hover\\:bg-black\\/20'):
+            self.assertIn(rule, css)
+    
+    def test_fonts_are_committed(self):
+        """Los woff2 están en static/fonts y app.css los declara con el mismo recorte"""
+        from .assets import FONTS, LATIN_UNICODE_RANGE, TAILWIND_INPUT, built_fonts
+        
+        self.assertEqual(built_fonts(), list(FONTS))
+        with open(os.path.join(settings.BASE_DIR, TAILWIND_INPUT), encoding='utf-8') as handle:
+            source = handle.read()
+        for font in FONTS:
+            self.assertIn(f"src: url(../{font['output']}) format('woff2');", source)
+        self.assertEqual(source.count(f'unicode-range: {LATIN_UNICODE_RANGE};'), len(FONTS))
+    
+    def test_pages_load_local_assets_only(self):
+        """Ni Tailwind por CDN ni Google Fonts, y la CSP sin hosts externos"""
+        response = self.client.get(reverse('memories:login'))
+        content = response.content.decode()
+        self.assertIn('css/app.css', content)
+        for host in ('cdn.tailwindcss.com', 'fonts.googleapis.com', 'fonts.gstatic.com'):
+            self.assertNotIn(host, content)
+            self.assertNotIn(host, response['Content-Security-Policy'])
+    
+    def test_font_preloads(self):
+        """Solo se precargan las fuentes generadas marcadas con preload"""
+        from django.template import Context, Template
+        from .assets import FONTS
+        
+        template = Template('{% load assets %}{% font_preloads %}')
+        self.assertEqual(template.render(Context()).count('rel="preload"'), 1)
+        self.assertIn('fonts/inter-latin.woff2', template.render(Context()))
+        with tempfile.TemporaryDirectory() as static_root:
+            with override_settings(STATICFILES_DIRS=[static_root]):
+                self.assertEqual(template.render(Context()), '')
+    
+    def test_font_source(self):
+        """La fuente original es la vertical aunque el paquete traiga la itálica"""
+        from .assets import FONTS, font_source
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.assertIsNone(font_source(FONTS[0], temp_dir))
+            for name in ('Inter-Italic[opsz,wght].ttf', 'Inter[opsz,wght].ttf'):
+                open(os.path.join(temp_dir, name), 'wb').close()
+            self.assertEqual(font_source(FONTS[0], temp_dir), os.path.join(temp_dir, 'Inter[opsz,wght].ttf'))
+    
+    def test_subset_font(self):
+        """Recortar una fuente deja solo los caracteres latinos"""
+        try:
+            from fontTools.fontBuilder import FontBuilder
+            from fontTools.pens.ttGlyphPen import TTGlyphPen
+            from fontTools.ttLib import TTFont
+            import brotli  # noqa: F401 (necesario para woff2)
+        except ImportError:
+            self.skipTest('fontTools[woff] no está instalado')
+        from .assets import subset_font
+        
+        pen = TTGlyphPen(None)
+        pen.moveTo((0, 0))
+        pen.lineTo((0, 500))
+        pen.lineTo((500, 0))
+        pen.closePath()
+        glyph = pen.glyph()
+        builder = FontBuilder(1000, isTTF=True)
+        builder.setupGlyphOrder(['.notdef', 'A', 'ntilde', 'uni4E2D'])
+        builder.setupCharacterMap({ord('A'): 'A', ord('ñ'): 'ntilde', 0x4E2D: 'uni4E2D'})
+        builder.setupGlyf({name: glyph for name in ['.notdef', 'A', 'ntilde', 'uni4E2D']})
+        builder.setupHorizontalMetrics({name: (500, 0) for name in ['.notdef', 'A', 'ntilde', 'uni4E2D']})
+        builder.setupHorizontalHeader(ascent=800, descent=-200)
+        builder.setupNameTable({'familyName': 'Prueba', 'styleName': 'Regular'})
+        builder.setupOS2()
+        builder.setupPost()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, 'Prueba.ttf')
+            output = os.path.join(temp_dir, 'fonts', 'prueba.woff2')
+            builder.save(source)
+            subset_font(source, output)
+            
+            font = TTFont(output)
+            self.assertEqual(font.flavor, 'woff2')
+            self.assertEqual(set(font.getBestCmap()), {ord('A'), ord('ñ')})
 
 
 class AuthenticationViewsTest(TestCase):
@@ -686,6 +3005,74 @@ class AuthenticationViewsTest(TestCase):
         self.assertRedirects(response, '/login/?next=/')
 
 
+class RateLimitTest(TestCase):
+    """
+    Tests para los backends de rate limiting y el middleware
+    """
+    
+    def test_local_backend_sliding_window(self):
+        """Test de la ventana deslizante en memoria"""
+        backend = LocalRateLimitBackend()
+        
+        results = [backend.hit('ip', limit=3, window=60, now=t) for t in (0, 1, 2, 3)]
+        self.assertEqual(results, [True, True, True, False])
+        # Al salir de la ventana el primer intento deja lugar a uno nuevo
+        self.assertTrue(backend.hit('ip', limit=3, window=60, now=60.5))
+        self.assertFalse(backend.hit('ip', limit=3, window=60, now=60.8))
+    
+    def test_local_backend_block_duration(self):
+        """Test del bloqueo tras superar el límite"""
+        backend = LocalRateLimitBackend()
+        for t in range(3):
+            backend.hit('ip', limit=2, window=10, block_duration=100, now=t)
+        
+        self.assertFalse(backend.hit('ip', limit=2, window=10, block_duration=100, now=50))
+        self.assertTrue(backend.hit('ip', limit=2, window=10, block_duration=100, now=103))
+    
+    def test_local_backend_bounded_memory(self):
+        """Test de que el backend local no crece sin límite"""
+        backend = LocalRateLimitBackend(max_keys=100)
+        for index in range(1000):
+            backend.hit(f'ip-{index}', limit=5, window=3600, now=index)
+        
+        self.assertLessEqual(len(backend), 100)
+    
+    def test_local_backend_expires_old_keys(self):
+        """Test de la expiración amortizada de claves vencidas"""
+        backend = LocalRateLimitBackend()
+        for index in range(50):
+            backend.hit(f'ip-{index}', limit=5, window=10, now=0)
+        backend.hit('nueva', limit=5, window=10, now=100)
+        
+        self.assertEqual(len(backend), 1)
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ratelimit-tests'}})
+    def test_cache_backend_limits_and_blocks(self):
+        """Test del backend compartido sobre el cache de Django"""
+        backend = CacheRateLimitBackend()
+        
+        results = [backend.hit('ip', limit=3, window=60, block_duration=300, now=120 + t) for t in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+        # Bloqueado aunque empiece otra ventana
+        self.assertFalse(backend.hit('ip', limit=3, window=60, block_duration=300, now=200))
+        self.assertTrue(backend.hit('otra-ip', limit=3, window=60, now=200))
+    
+    def test_login_endpoint_budget(self):
+        """Test de que el login usa su propio presupuesto de intentos"""
+        login_limit = settings.RATE_LIMITING['LOGIN_ATTEMPTS']['limit']
+        data = {'username': 'nadie', 'password': 'incorrecta'}
+        
+        for _ in range(login_limit):
+            response = self.client.post(reverse('memories:login'), data)
+            self.assertEqual(response.status_code, 200)
+        
+        response = self.client.post(reverse('memories:login'), data)
+        self.assertEqual(response.status_code, 429)
+        # El registro tiene un presupuesto independiente
+        response = self.client.post(reverse('memories:register'), {})
+        self.assertEqual(response.status_code, 200)
+
+
 class IntegrationTest(TestCase):
     """
     Tests de integración que prueban flujos completos de la aplicación
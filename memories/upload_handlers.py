@@ -0,0 +1,163 @@
+"""
+Manejo de subidas de imágenes en streaming.
+
+Valida formato y dimensiones con los primeros bytes que llegan, corta la
+subida en cuanto deja de ser aceptable y escribe el resto directamente en
+un archivo dentro de MEDIA_ROOT, de modo que el storage solo tiene que
+renombrarlo (sin copia) al guardar el recuerdo.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+from .imageinfo import HEADER_LIMIT, MIME_TYPES, ImageHeaderError, sniff_image
+
+
+# Directorio (relativo a MEDIA_ROOT) donde se reciben las subidas en curso
+INCOMING_DIR = 'memories/.incoming'
+
+# Cuerpos declarados mayores a este múltiplo del tamaño máximo se rechazan sin
+# leerlos (ver body_too_large). Por debajo se lee el cuerpo para poder
+# responder con el formulario y su error.
+ABORT_BODY_FACTOR = 4
+
+
+class StreamedImageFile(TemporaryUploadedFile):
+    """
+    Archivo subido que vive en MEDIA_ROOT y conoce su hash y su cabecera
+    """
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        directory = default_storage.path(INCOMING_DIR)
+        os.makedirs(directory, exist_ok=True)
+        file = tempfile.NamedTemporaryFile(suffix='.upload', dir=directory)
+        UploadedFile.__init__(self, file, name, content_type, size, charset, content_type_extra)
+        self.content_hash = None
+        self.image_info = None
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Upload handler que rechaza imágenes inválidas mientras se reciben
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        limits = settings.FILE_VALIDATION
+        self.max_size = limits['MAX_FILE_SIZE']
+        self.min_dimensions = limits['MIN_DIMENSIONS']
+        self.max_dimensions = limits['MAX_DIMENSIONS']
+        self.allowed_mime_types = limits['ALLOWED_MIME_TYPES']
+
+    def body_too_large(self, META):
+        """
+        El cuerpo declarado es desproporcionado. La vista lo comprueba antes de
+        leer request.POST: un StopUpload en handle_raw_input no lo captura
+        MultiPartParser y terminaría en un error 500.
+        """
+        try:
+            content_length = int(META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return False
+        return content_length > self.max_size * ABORT_BODY_FACTOR
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = StreamedImageFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+        )
+        self.hasher = hashlib.sha256()
+        self.header = b''
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self._reject(self.size_message())
+
+        if self.file.image_info is None:
+            self.header += raw_data
+            self._inspect_header()
+
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.file.image_info is None:
+            # El archivo terminó antes de que la cabecera fuera legible
+            self._discard()
+            self._record_rejection(self.field_name, self._format_message())
+            return None
+
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.content_hash = self.hasher.hexdigest()
+        # El tipo declarado por el navegador no es confiable: usar el detectado
+        self.file.content_type = MIME_TYPES[self.file.image_info.format]
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            self._discard()
+
+    def _inspect_header(self):
+        try:
+            info = sniff_image(self.header)
+        except ImageHeaderError:
+            self._reject(self._format_message())
+
+        if info is None:
+            if len(self.header) > HEADER_LIMIT:
+                self._reject('No se pudo leer la cabecera de la imagen.')
+            return
+
+        if MIME_TYPES[info.format] not in self.allowed_mime_types:
+            self._reject(self._format_message())
+
+        min_width, min_height = self.min_dimensions
+        max_width, max_height = self.max_dimensions
+        if info.width < min_width or info.height < min_height:
+            self._reject(
+                f'La imagen debe tener al menos {min_width}x{min_height} píxeles. '
+                f'Dimensiones actuales: {info.width}x{info.height}'
+            )
+        if info.width > max_width or info.height > max_height:
+            self._reject(
+                f'La imagen no puede ser mayor a {max_width}x{max_height} píxeles. '
+                f'Dimensiones actuales: {info.width}x{info.height}'
+            )
+
+        self.file.image_info = info
+        self.header = b''
+
+    def _reject(self, message):
+        """Descartar lo recibido y saltar el resto del archivo"""
+        self._discard()
+        self._record_rejection(self.field_name, message)
+        raise SkipFile()
+
+    def _discard(self):
+        try:
+            self.file.close()  # NamedTemporaryFile se elimina al cerrarse
+        except FileNotFoundError:
+            pass
+
+    def _record_rejection(self, field_name, message):
+        """Guardar el motivo en la petición para mostrarlo en el formulario"""
+        if self.request is None:
+            return
+        if not hasattr(self.request, 'upload_rejections'):
+            self.request.upload_rejections = {}
+        self.request.upload_rejections[field_name] = message
+
+    def size_message(self):
+        return f'La imagen no puede ser mayor a {self.max_size // (1024 * 1024)}MB.'
+
+    def _format_message(self):
+        return 'El archivo debe ser una imagen JPG, PNG, GIF o WEBP válida.'
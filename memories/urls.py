@@ -1,13 +1,17 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth.views import LogoutView
-from . import views
+from . import async_views, views
 
 app_name = 'memories'
 
+# Con ASGI las vistas de lectura frecuentes son async (ver async_views.py)
+read_views = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     # Página principal
-    path('', views.TimelineView.as_view(), name='timeline'),
-    path('timeline/', views.TimelineView.as_view(), name='timeline_alt'),  # URL alternativa
+    path('', read_views.TimelineView.as_view(), name='timeline'),
+    path('timeline/', read_views.TimelineView.as_view(), name='timeline_alt'),  # URL alternativa
     
     # Autenticación
     path('login/', views.CustomLoginView.as_view(), name='login'),
@@ -17,14 +21,28 @@ urlpatterns = [
     # Gestión de recuerdos
     path('create/', views.CreateMemoryView.as_view(), name='create_memory'),
     path('memory/new/', views.CreateMemoryView.as_view(), name='new_memory'),  # URL alternativa
-    path('memory/<int:pk>/', views.MemoryDetailView.as_view(), name='memory_detail'),
+    path('memory/<int:pk>/', read_views.MemoryDetailView.as_view(), name='memory_detail'),
     path('memory/<int:pk>/edit/', views.EditMemoryView.as_view(), name='edit_memory'),
     path('memory/<int:pk>/delete/', views.DeleteMemoryView.as_view(), name='delete_memory'),
+    path('search/', views.SearchMemoriesView.as_view(), name='search_memories'),
+    path('export/', views.ExportMemoriesView.as_view(), name='export_memories'),
     
     # URLs de conveniencia
     path('edit/<int:pk>/', views.EditMemoryView.as_view(), name='edit_memory_short'),
     path('delete/<int:pk>/', views.DeleteMemoryView.as_view(), name='delete_memory_short'),
     
     # API endpoints básicos (para futuras mejoras)
-    path('api/memories/count/', views.MemoryCountView.as_view(), name='memory_count_api'),
+    path('api/memories/', views.MemoryListAPIView.as_view(), name='memory_list_api'),
+    path('api/memories/count/', read_views.MemoryCountView.as_view(), name='memory_count_api'),
+    path('api/memories/histogram/', views.MemoryHistogramAPIView.as_view(), name='memory_histogram_api'),
+    path('api/memories/on-this-day/', views.OnThisDayAPIView.as_view(), name='on_this_day_api'),
+    
+    # Imágenes de los recuerdos, solo para su dueño (ver memories/media.py)
+    path(settings.MEDIA_URL.lstrip('/') + '<path:name>', views.MediaFileView.as_view(), name='media'),
+    
+    # Monitoreo
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
+    path('health/', read_views.HealthView.as_view(), name='health'),
+    path('health/live/', read_views.LivenessView.as_view(), name='health_live'),
+    path('health/ready/', read_views.ReadinessView.as_view(), name='health_ready'),
 ]
\ No newline at end of file
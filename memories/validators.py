@@ -3,26 +3,26 @@ Validadores personalizados para la aplicación de recuerdos
 """
 import os
 from django.core.exceptions import ValidationError
-from django.core.files.images import get_image_dimensions
 from django.utils.deconstruct import deconstructible
 from datetime import date
 
-try:
-    import magic
-    HAS_MAGIC = True
-except ImportError:
-    HAS_MAGIC = False
+from .imageinfo import ImageHeaderError, read_image_info
 
 
 @deconstructible
 class ImageValidator:
     """
-    Validador personalizado para imágenes
+    Validador personalizado para imágenes.
+    Lee solo la cabecera (ver memories/imageinfo.py): no decodifica la imagen
+    ni depende de Pillow o libmagic.
     """
     
-    def __init__(self, max_size=5*1024*1024, allowed_formats=None):
+    def __init__(self, max_size=5*1024*1024, allowed_formats=None,
+                 min_dimensions=(100, 100), max_dimensions=(4000, 4000)):
         self.max_size = max_size
         self.allowed_formats = allowed_formats or ['JPEG', 'PNG', 'GIF', 'WEBP']
+        self.min_dimensions = tuple(min_dimensions)
+        self.max_dimensions = tuple(max_dimensions)
     
     def __call__(self, image):
         # Validar tamaño de archivo
@@ -32,47 +32,50 @@ class ImageValidator:
                 f'Tamaño actual: {image.size // (1024*1024)}MB'
             )
         
+        info = uploaded_image_info(image)
+        if info is None:
+            try:
+                info = read_image_info(image)
+            except (ImageHeaderError, OSError):
+                raise ValidationError('No se pudo procesar la imagen. Verifica que sea un archivo válido.')
+        
+        # Validar formato real (no la extensión ni el tipo declarado)
+        if info.format not in self.allowed_formats:
+            raise ValidationError(
+                f'Formato de imagen no permitido: {info.format}. '
+                f'Formatos permitidos: {", ".join(self.allowed_formats)}'
+            )
+        
         # Validar dimensiones mínimas y máximas
-        try:
-            width, height = get_image_dimensions(image)
-            if width and height:
-                # Mínimo 100x100 píxeles
-                if width < 100 or height < 100:
-                    raise ValidationError(
-                        'La imagen debe tener al menos 100x100 píxeles. '
-                        f'Dimensiones actuales: {width}x{height}'
-                    )
-                
-                # Máximo 4000x4000 píxeles
-                if width > 4000 or height > 4000:
-                    raise ValidationError(
-                        'La imagen no puede ser mayor a 4000x4000 píxeles. '
-                        f'Dimensiones actuales: {width}x{height}'
-                    )
-        except Exception:
-            raise ValidationError('No se pudo procesar la imagen. Verifica que sea un archivo válido.')
+        min_width, min_height = self.min_dimensions
+        if info.width < min_width or info.height < min_height:
+            raise ValidationError(
+                f'La imagen debe tener al menos {min_width}x{min_height} píxeles. '
+                f'Dimensiones actuales: {info.width}x{info.height}'
+            )
         
-        # Validar tipo MIME usando python-magic si está disponible
-        if HAS_MAGIC:
-            try:
-                mime_type = magic.from_buffer(image.read(1024), mime=True)
-                image.seek(0)  # Reset file pointer
-                
-                allowed_mimes = {
-                    'image/jpeg': 'JPEG',
-                    'image/png': 'PNG', 
-                    'image/gif': 'GIF',
-                    'image/webp': 'WEBP'
-                }
-                
-                if mime_type not in allowed_mimes:
-                    raise ValidationError(
-                        f'Formato de imagen no permitido: {mime_type}. '
-                        f'Formatos permitidos: {", ".join(self.allowed_formats)}'
-                    )
-            except Exception:
-                # Si falla la validación con magic, continuar sin error
-                pass
+        max_width, max_height = self.max_dimensions
+        if info.width > max_width or info.height > max_height:
+            raise ValidationError(
+                f'La imagen no puede ser mayor a {max_width}x{max_height} píxeles. '
+                f'Dimensiones actuales: {info.width}x{info.height}'
+            )
+
+
+def uploaded_image_info(image):
+    """
+    Cabecera leída por el upload handler mientras recibía el archivo, si la hay.
+    Acepta el archivo subido o el FieldFile del modelo que lo envuelve.
+    """
+    try:
+        candidates = (image, getattr(image, 'file', None))
+    except OSError:
+        return None
+    for candidate in candidates:
+        info = getattr(candidate, 'image_info', None)
+        if info is not None:
+            return info
+    return None
 
 
 @deconstructible
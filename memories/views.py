@@ -1,13 +1,105 @@
+import hashlib
+from datetime import date
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView, View
 from django.contrib.auth.views import LoginView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth import login
 from django.contrib import messages
-from django.urls import reverse_lazy
-from django.http import Http404, JsonResponse
+from django.urls import reverse, reverse_lazy
+from django.template.loader import render_to_string
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.exceptions import BadRequest
+from django.db.models import Q
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from .models import Memory
 from .forms import RegistrationForm, CustomLoginForm, MemoryForm
+from .pagination import TIMELINE_ORDERING, InvalidCursor, KnownCountPaginator, encode_cursor, keyset_page
+from .stats import get_user_stats
+from .routers import get_replicas, is_primary_sticky, replica_reads
+from .health import READINESS_CHECKS, cached_checks
+from .aggregates import InvalidDateRange, date_histogram, on_this_day, parse_date_range, range_count
+from .cache import cache_fragment, get_cached_fragment, get_timeline_version, timeline_fragment_key
+from .media import serve_media, signed_owner, url_window
+from .upload_handlers import ImageUploadHandler
+
+
+class ConditionalGetMixin:
+    """
+    Mixin que responde 304 Not Modified con If-None-Match / If-Modified-Since.
+    Las vistas definen get_validators() con consultas baratas, que se evalúan
+    antes de ejecutar querysets o renderizar plantillas.
+    """
+    
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_conditional(request):
+            return super().dispatch(request, *args, **kwargs)
+        
+        etag, last_modified = self.get_validators(request)
+        response = self.not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return self.add_validators(response, etag, last_modified)
+    
+    def is_conditional(self, request):
+        return request.method in ('GET', 'HEAD') and request.user.is_authenticated
+    
+    def not_modified_response(self, request, etag, last_modified):
+        """Respuesta 304 (o 412) si el cliente ya tiene esta versión, si no None"""
+        # Con mensajes pendientes la respuesta no es la misma que tiene el cliente
+        if len(messages.get_messages(request)):
+            return None
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(request, etag=etag, last_modified=timestamp)
+    
+    def add_validators(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(int(last_modified.timestamp()))
+            # Privada por usuario; el navegador la guarda pero revalida siempre
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+    
+    def get_validators(self, request):
+        """Retornar la tupla (etag, last_modified) de la respuesta"""
+        raise NotImplementedError
+    
+    def make_etag(self, *parts):
+        """ETag a partir de los valores de los que depende la respuesta"""
+        digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+        return quote_etag(digest)
+    
+    def page_dependencies(self, request):
+        """
+        Valores de la sesión que aparecen en el HTML (usuario, token CSRF):
+        al iniciar sesión de nuevo cambian y la página ya no es válida.
+        """
+        return (request.session.session_key, request.COOKIES.get(settings.CSRF_COOKIE_NAME))
+
+
+class ReplicaReadMixin:
+    """
+    Mixin para vistas de solo lectura: sus consultas van a una réplica
+    (ver memories/routers.py), salvo si el usuario escribió hace poco.
+    """
+    
+    def dispatch(self, request, *args, **kwargs):
+        # request.user y la sesión se cargan antes, desde la primaria
+        if (
+            request.method in ('GET', 'HEAD')
+            and get_replicas()
+            and request.user.is_authenticated
+            and not is_primary_sticky(request)
+        ):
+            with replica_reads():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
 
 
 class CustomLoginView(LoginView):
@@ -50,7 +142,7 @@ class RegisterView(CreateView):
         return super().form_invalid(form)
 
 
-class TimelineView(LoginRequiredMixin, ListView):
+class TimelineView(LoginRequiredMixin, ReplicaReadMixin, ConditionalGetMixin, ListView):
     """
     Vista principal que muestra la línea de tiempo de recuerdos del usuario
     """
@@ -59,18 +151,139 @@ class TimelineView(LoginRequiredMixin, ListView):
     context_object_name = 'memories'
     paginate_by = 12  # Paginación para mejor rendimiento
     
+    paginator_class = KnownCountPaginator
+    fragment_template_name = 'memories/_timeline_page.html'
+    
+    def get(self, request, *args, **kwargs):
+        return self.render_to_response(self.get_page_context(request))
+    
+    def get_page_context(self, request):
+        """
+        Con ?cursor= se pagina por keyset en lugar de ?page=.
+        El grid renderizado se cachea por usuario, página y versión;
+        un hit no consulta ni renderiza los recuerdos.
+        """
+        self.cursor = request.GET.get('cursor')
+        try:
+            self.date_range = parse_date_range(request.GET)
+        except InvalidDateRange:
+            raise BadRequest('Rango de fechas no válido.')
+        if not hasattr(self, 'stats'):
+            self.stats = get_user_stats(request.user)
+        
+        self.object_list = self.get_queryset()  # Lazy: no consulta hasta renderizar
+        
+        cache_key = timeline_fragment_key(request.user.pk, request.GET)
+        fragment = get_cached_fragment(cache_key)
+        if fragment is None:
+            fragment = render_to_string(self.fragment_template_name, self.get_context_data(), request)
+            cache_fragment(cache_key, fragment)
+        
+        selected_year, selected_month = self.date_range[:2] if self.date_range else (None, None)
+        return {
+            'view': self,
+            'timeline_fragment': fragment,
+            'total_memories': self.stats.memory_count,
+            'date_index': date_histogram(request.user.pk),
+            'on_this_day': on_this_day(request.user) if not request.GET else [],
+            'selected_year': selected_year,
+            'selected_month': selected_month,
+        }
+    
+    def get_validators(self, request):
+        """Validadores desde las estadísticas del usuario, que cambian con cada escritura"""
+        self.stats = get_user_stats(request.user)
+        return self.validators_from_stats(request)
+    
+    def validators_from_stats(self, request):
+        etag = self.make_etag(
+            'timeline', request.user.pk, self.stats.updated_at.isoformat(),
+            get_timeline_version(request.user.pk), request.GET.urlencode(),
+            date.today().isoformat(),  # "Un día como hoy" cambia cada día
+            url_window(),  # Las URLs firmadas de las imágenes vencen
+            *self.page_dependencies(request)
+        )
+        return etag, self.stats.updated_at
+    
     def get_queryset(self):
         """Mostrar solo los recuerdos del usuario autenticado, ordenados cronológicamente"""
-        return Memory.objects.filter(user=self.request.user).select_related('user').order_by('-date', '-created_at')
+        queryset = Memory.objects.filter(user=self.request.user)
+        if self.date_range:
+            # ?year= / ?month= saltan al rango sin pasar por las páginas anteriores
+            queryset = queryset.filter(date__range=self.date_range[2:])
+        return queryset.select_related('user').order_by(*TIMELINE_ORDERING)
+    
+    def get_paginate_by(self, queryset):
+        """El paginador por OFFSET solo se usa sin cursor"""
+        return None if self.cursor is not None else self.paginate_by
+    
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        """El total sale de las estadísticas o del histograma, sin COUNT(*)"""
+        count = self.stats.memory_count
+        if self.date_range:
+            count = range_count(self.request.user.pk, *self.date_range[:2])
+        return self.paginator_class(
+            queryset, per_page, count=count,
+            orphans=orphans, allow_empty_first_page=allow_empty_first_page, **kwargs
+        )
     
     def get_context_data(self, **kwargs):
         """Añadir contexto adicional"""
+        if self.cursor is not None:
+            try:
+                memories, next_cursor = keyset_page(self.object_list, self.cursor, self.paginate_by)
+            except InvalidCursor:
+                raise BadRequest('Cursor de paginación no válido.')
+            kwargs.update(object_list=memories, next_cursor=next_cursor, cursor_mode=True)
+        
         context = super().get_context_data(**kwargs)
-        context['total_memories'] = self.get_queryset().count()
+        
+        # El enlace "Siguiente" continúa por cursor desde la última tarjeta mostrada
+        page_obj = context.get('page_obj')
+        if page_obj is not None and page_obj.has_next():
+            context['next_cursor'] = encode_cursor(page_obj.object_list[len(page_obj.object_list) - 1])
+        
+        context['total_memories'] = self.stats.memory_count
+        # Los enlaces de paginación conservan el rango de fechas elegido
+        context['range_query'] = ''
+        if self.date_range:
+            year, month = self.date_range[:2]
+            context['range_query'] = f'year={year}&' + (f'month={month}&' if month else '')
         return context
 
 
-class CreateMemoryView(LoginRequiredMixin, CreateView):
+class UploadRejectionMixin:
+    """
+    Recibe las imágenes con ImageUploadHandler (solo en estas vistas; el resto
+    del sitio usa los handlers de Django) y pasa al formulario los archivos
+    rechazados. El handler debe instalarse antes de leer request.POST, que
+    CsrfViewMiddleware leería antes de la vista: por eso la vista queda exenta
+    del middleware y comprueba CSRF con csrf_protect después de instalarlo.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        handler = ImageUploadHandler(request)
+        if request.method == 'POST' and handler.body_too_large(request.META):
+            # Sin leer el cuerpo: basta con el mensaje de error del formulario
+            return HttpResponse(handler.size_message(), status=413, content_type='text/plain; charset=utf-8')
+        request.upload_handlers = [handler]
+        return self.protected_dispatch(request, *args, **kwargs)
+
+    @method_decorator(csrf_protect)
+    def protected_dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_errors'] = getattr(self.request, 'upload_rejections', {})
+        return kwargs
+
+
+class CreateMemoryView(LoginRequiredMixin, UploadRejectionMixin, CreateView):
     """
     Vista para crear nuevos recuerdos
     """
@@ -91,7 +304,7 @@ class CreateMemoryView(LoginRequiredMixin, CreateView):
         return super().form_invalid(form)
 
 
-class EditMemoryView(LoginRequiredMixin, UpdateView):
+class EditMemoryView(LoginRequiredMixin, UploadRejectionMixin, UpdateView):
     """
     Vista para editar recuerdos existentes
     """
@@ -133,23 +346,14 @@ class DeleteMemoryView(LoginRequiredMixin, DeleteView):
             raise Http404("No tienes permiso para eliminar este recuerdo.")
         return obj
     
-    def delete(self, request, *args, **kwargs):
-        """Mensaje de confirmación y eliminación del archivo de imagen"""
-        self.object = self.get_object()
+    def form_valid(self, form):
+        """Mensaje de confirmación (los archivos se liberan en la señal post_delete)"""
         memory_title = self.object.title
-        
-        # Eliminar archivo de imagen del sistema de archivos
-        if self.object.image:
-            try:
-                self.object.image.delete(save=False)
-            except Exception:
-                pass  # Continuar aunque falle la eliminación del archivo
-        
-        messages.success(request, f'El recuerdo "{memory_title}" ha sido eliminado.')
-        return super().delete(request, *args, **kwargs)
+        messages.success(self.request, f'El recuerdo "{memory_title}" ha sido eliminado.')
+        return super().form_valid(form)
 
 
-class MemoryDetailView(LoginRequiredMixin, DetailView):
+class MemoryDetailView(LoginRequiredMixin, ReplicaReadMixin, ConditionalGetMixin, DetailView):
     """
     Vista para mostrar detalles de un recuerdo específico
     """
@@ -157,6 +361,25 @@ class MemoryDetailView(LoginRequiredMixin, DetailView):
     template_name = 'memories/detail.html'
     context_object_name = 'memory'
     
+    def get_validators(self, request):
+        """Validadores desde updated_at, sin cargar el recuerdo completo"""
+        return self.validators_from_row(request, self.validators_queryset(request).first())
+    
+    def validators_queryset(self, request):
+        return Memory.objects.filter(
+            pk=self.kwargs['pk'], user=request.user
+        ).values_list('updated_at', 'processing_status')
+    
+    def validators_from_row(self, request, row):
+        if row is None:
+            raise Http404("No tienes permiso para ver este recuerdo.")
+        updated_at, processing_status = row
+        etag = self.make_etag(
+            'memory', self.kwargs['pk'], updated_at.isoformat(), processing_status, url_window(),
+            *self.page_dependencies(request)
+        )
+        return etag, updated_at
+    
     def get_object(self, queryset=None):
         """Verificar que el recuerdo pertenezca al usuario autenticado"""
         obj = get_object_or_404(Memory, pk=self.kwargs['pk'])
@@ -165,16 +388,252 @@ class MemoryDetailView(LoginRequiredMixin, DetailView):
         return obj
 
 
-class MemoryCountView(LoginRequiredMixin, View):
+class MemoryCountView(LoginRequiredMixin, ReplicaReadMixin, ConditionalGetMixin, View):
     """
     Vista API para obtener el conteo de recuerdos del usuario
     """
     
+    def get_validators(self, request):
+        """Validadores desde las estadísticas del usuario"""
+        self.stats = get_user_stats(request.user)
+        return self.validators_from_stats(request)
+    
+    def validators_from_stats(self, request):
+        etag = self.make_etag('count', request.user.pk, self.stats.memory_count, self.stats.updated_at.isoformat())
+        return etag, self.stats.updated_at
+    
     def get(self, request):
         """Retornar conteo de recuerdos en formato JSON"""
-        count = Memory.objects.filter(user=request.user).count()
+        stats = self.stats
         return JsonResponse({
-            'count': count,
+            'count': stats.memory_count,
             'user': request.user.username,
             'status': 'success'
         })
+
+
+class SearchMemoriesView(LoginRequiredMixin, View):
+    """
+    Búsqueda de texto completo en los recuerdos del usuario
+    """
+    template_name = 'memories/search.html'
+    
+    def get(self, request):
+        """Resultados ordenados por relevancia"""
+        from .search import SEARCH_LIMIT, search_memories
+        
+        query = request.GET.get('q', '').strip()[:200]
+        memories = search_memories(request.user, query) if query else []
+        return render(request, self.template_name, {
+            'query': query,
+            'memories': memories,
+            'search_limit': SEARCH_LIMIT,
+        })
+
+
+class ExportMemoriesView(LoginRequiredMixin, View):
+    """
+    Descarga de todos los recuerdos del usuario como ZIP generado en streaming
+    """
+    
+    def get(self, request):
+        """Enviar el ZIP a medida que se escribe (sin armarlo en memoria)"""
+        from django.utils import timezone
+        from .export import stream_export
+        
+        filename = f'recuerdos-{request.user.username}-{timezone.localdate():%Y-%m-%d}.zip'
+        response = StreamingHttpResponse(stream_export(request.user), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        # El contenido se genera al vuelo: no hay tamaño ni rangos conocidos de antemano
+        response['Accept-Ranges'] = 'none'
+        response['X-Accel-Buffering'] = 'no'
+        patch_cache_control(response, private=True, no_store=True)
+        return response
+
+
+class MemoryListAPIView(LoginRequiredMixin, ReplicaReadMixin, View):
+    """
+    Vista API que retorna la línea de tiempo paginada por cursor
+    """
+    page_size = 12
+    max_page_size = 50
+    
+    def get(self, request):
+        """Retornar una página de recuerdos y el cursor de la siguiente"""
+        try:
+            limit = int(request.GET.get('limit', self.page_size))
+        except ValueError:
+            limit = self.page_size
+        limit = max(1, min(limit, self.max_page_size))
+        
+        queryset = Memory.objects.filter(user=request.user)
+        try:
+            date_range = parse_date_range(request.GET)
+        except InvalidDateRange:
+            return JsonResponse({
+                'error': 'Rango de fechas no válido.',
+                'status': 'error'
+            }, status=400)
+        if date_range:
+            queryset = queryset.filter(date__range=date_range[2:])
+        
+        try:
+            memories, next_cursor = keyset_page(queryset, request.GET.get('cursor'), limit)
+        except InvalidCursor:
+            return JsonResponse({
+                'error': 'Cursor de paginación no válido.',
+                'status': 'error'
+            }, status=400)
+        
+        return JsonResponse({
+            'results': [self.serialize(memory) for memory in memories],
+            'next': next_cursor,
+            'status': 'success'
+        })
+    
+    def serialize(self, memory):
+        """Representación JSON de un recuerdo"""
+        return {
+            'id': memory.pk,
+            'title': memory.title,
+            'description': memory.description,
+            'date': memory.date.isoformat(),
+            'image': memory.image_url,
+            'thumbnail': memory.thumbnail_url,
+            'medium': memory.medium_url,
+            'srcset': memory.srcset,
+            'width': memory.image_width,
+            'height': memory.image_height,
+            'placeholder': memory.placeholder,
+            'processing_status': memory.processing_status,
+            'url': reverse('memories:memory_detail', kwargs={'pk': memory.pk}),
+        }
+
+
+class MemoryHistogramAPIView(LoginRequiredMixin, ReplicaReadMixin, View):
+    """
+    Vista API con el número de recuerdos por año y mes
+    """
+    
+    def get(self, request):
+        """Retornar el índice año → mes cacheado del usuario"""
+        url = reverse('memories:timeline')
+        years = [
+            {
+                'year': entry['year'],
+                'count': entry['count'],
+                'url': f"{url}?year={entry['year']}",
+                'months': [
+                    dict(item, url=f"{url}?year={entry['year']}&month={item['month']}")
+                    for item in entry['months']
+                ],
+            }
+            for entry in date_histogram(request.user.pk)
+        ]
+        return JsonResponse({
+            'results': years,
+            'status': 'success'
+        })
+
+
+class OnThisDayAPIView(MemoryListAPIView):
+    """
+    Vista API con los recuerdos de un día como hoy en años anteriores
+    """
+    
+    def get(self, request):
+        """Retornar los recuerdos del mismo día y mes de otros años"""
+        return JsonResponse({
+            'results': [self.serialize(memory) for memory in on_this_day(request.user)],
+            'status': 'success'
+        })
+
+
+class MediaFileView(View):
+    """
+    Imágenes de recuerdos, solo para su dueño (ver memories/media.py).
+    Las URLs firmadas vigentes las atiende antes SignedMediaMiddleware; aquí
+    llegan las que no tienen firma (admin) o vencieron, y se consulta la base.
+    """
+    
+    def get(self, request, name):
+        if not self.has_access(request, name):
+            raise Http404()
+        return serve_media(request, name)
+    
+    def has_access(self, request, name):
+        if signed_owner(request, name) is not None:
+            return True  # Sin SignedMediaMiddleware en MIDDLEWARE
+        user = request.user
+        if not user.is_authenticated:
+            return False
+        return user.is_staff or Memory.objects.filter(
+            Q(image=name) | Q(thumbnail=name) | Q(medium=name), user=user
+        ).exists()
+
+
+class MetricsView(View):
+    """
+    Métricas de rendimiento en formato de texto de Prometheus
+    """
+    
+    def get(self, request):
+        """Sumar y exportar las métricas de todos los workers"""
+        from django.utils.crypto import constant_time_compare
+        from .metrics import render_prometheus
+        
+        token = settings.MONITORING.get('METRICS_TOKEN')
+        if token:
+            allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+        else:
+            # Sin token: solo en DEBUG o para staff
+            allowed = settings.DEBUG or request.user.is_staff
+        if not allowed:
+            raise Http404()
+        
+        response = HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+        patch_cache_control(response, no_store=True)
+        return response
+
+
+class LivenessView(View):
+    """
+    Sondeo de vida: el proceso responde, sin consultar nada más
+    """
+    
+    def get(self, request):
+        response = JsonResponse({'status': 'ok'})
+        patch_cache_control(response, no_store=True)
+        return response
+
+
+class HealthView(View):
+    """
+    Estado de salud del sistema en JSON (503 si algo falla).
+    No toca la sesión ni el usuario: el sondeo no consulta la base.
+    """
+    variant = 'full'
+    checks = None  # Todas (ver memories/health.py)
+    
+    def get(self, request):
+        """Verificaciones en paralelo, cacheadas unos segundos por proceso"""
+        return self.health_response(*cached_checks(self.variant, self.checks))
+    
+    def health_response(self, healthy, results):
+        response = JsonResponse({
+            'status': 'ok' if healthy else 'error',
+            'checks': {
+                name: {'healthy': result['healthy'], 'message': result['message']}
+                for name, result in results.items()
+            },
+        }, status=200 if healthy else 503)
+        patch_cache_control(response, no_store=True)
+        return response
+
+
+class ReadinessView(HealthView):
+    """
+    Sondeo de disponibilidad: base de datos, cache y almacenamiento media
+    """
+    variant = 'ready'
+    checks = READINESS_CHECKS
@@ -120,7 +120,7 @@ const TimelineApp = {
         
         alertContainer.innerHTML = `
             <div class="flex items-center">
-                <div class="flex-shrink-0">
+                <div class="shrink-0">
                     ${type === 'error' ? '⚠️' : type === 'success' ? '✅' : 'ℹ️'}
                 </div>
                 <div class="ml-3">
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'timeline_love.settings')
+# Con ASGI, las vistas de lectura frecuentes son async (memories/async_views.py)
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
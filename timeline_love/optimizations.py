@@ -48,6 +48,17 @@ DATABASE_OPTIMIZATIONS = {
     }
 }
 
+# PRAGMA de SQLite aplicados a cada conexión (ver memories/sqlite.py).
+# Cada entorno puede reemplazar valores; None omite el PRAGMA.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # Lectores y escritor en paralelo
+    'synchronous': 'NORMAL',  # Seguro con WAL; fsync solo en checkpoints
+    'busy_timeout': 5000,  # ms esperando el lock antes de "database is locked"
+    'mmap_size': 128 * 1024 * 1024,  # 128MB mapeados en memoria
+    'cache_size': -16000,  # Negativo = KiB (16MB por conexión)
+    'temp_store': 'MEMORY',  # Tablas temporales y ordenamientos en RAM
+}
+
 # Headers de seguridad adicionales
 SECURITY_HEADERS = {
     'Strict-Transport-Security': 'max-age=31536000; includeSubDomains; preload',
@@ -75,6 +86,11 @@ RATE_LIMITING = {
         'window': 3600,  # 1 hora
         'block_duration': 1800,  # 30 minutos
     },
+    'DEFAULT': {  # Resto de formularios POST
+        'limit': 10,
+        'window': 3600,  # 1 hora
+        'block_duration': 0,
+    },
 }
 
 # Configuración de validación de archivos optimizada
@@ -91,6 +107,20 @@ FILE_VALIDATION = {
     'MAX_DIMENSIONS': (4000, 4000),
 }
 
+# Recodificación de las imágenes subidas (ver memories/images.py). El worker
+# reemplaza el original por una versión en FORMAT sin metadatos, con la
+# orientación EXIF aplicada y el lado mayor limitado; los derivados se
+# guardan además en VARIANTS y se sirven según el encabezado Accept.
+# Desactivada salvo en producción: sin ella los archivos se guardan tal cual.
+IMAGE_NORMALIZATION = {
+    'ENABLED': False,
+    'FORMAT': 'WEBP',  # JPEG, PNG o WEBP (las extensiones que acepta Memory.image)
+    'QUALITY': 82,
+    'MAX_SIDE': 2560,  # Píxeles del lado mayor
+    'MIN_SAVING': 0.1,  # Si no hay nada que corregir, recodificar solo si ahorra un 10%
+    'VARIANTS': {'AVIF': 55, 'WEBP': 80},  # Formato -> calidad; se omiten los que Pillow no soporte
+}
+
 # Configuración de logging optimizada
 LOGGING_CONFIG = {
     'version': 1,
@@ -152,6 +182,10 @@ LOGGING_CONFIG = {
 MONITORING = {
     'HEALTH_CHECK_URL': '/health/',
     'METRICS_URL': '/metrics/',
+    # Directorio compartido por los workers para /metrics/ (None = solo este proceso)
+    'METRICS_DIR': None,
+    # Si se define, /metrics/ exige "Authorization: Bearer <token>"
+    'METRICS_TOKEN': None,
     'STATUS_CHECKS': [
         'database',
         'cache',
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,13 +49,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'memories.middleware.MetricsMiddleware',  # Primero: mide a todos los demás
     'django.middleware.security.SecurityMiddleware',
     'memories.middleware.SecurityHeadersMiddleware',
     'memories.middleware.RateLimitMiddleware',
+    'memories.middleware.SignedMediaMiddleware',  # Antes de la sesión: imágenes sin consultas
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'memories.middleware.ReplicaStickyMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -89,6 +93,25 @@ DATABASES = {
     }
 }
 
+# Réplica de solo lectura (ver memories/routers.py). Para probar en local con
+# dos archivos SQLite: cp db.sqlite3 db_replica.sqlite3 y exportar
+# SQLITE_REPLICA=db_replica.sqlite3
+if os.environ.get('SQLITE_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / os.environ['SQLITE_REPLICA'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['memories.routers.ReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Segundos que un usuario lee de la primaria después de un POST
+REPLICA_STICKY_SECONDS = 10
+
+# PRAGMA por conexión para SQLite: WAL, busy_timeout, mmap... (ver memories/sqlite.py)
+from .optimizations import SQLITE_PRAGMAS  # noqa: E402
+
 
 # Password validation moved to security settings section
 
@@ -115,10 +138,53 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Envío de las imágenes (ver memories/media.py): vacío las envía Django;
+# 'x-accel-redirect' (Nginx) o 'x-sendfile' (Apache / Passenger) se las delega al servidor web
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '')
+MEDIA_SENDFILE_PREFIX = '/protected-media/'  # location internal de Nginx con alias a MEDIA_ROOT
+# Las URLs firmadas valen entre 1 y 2 veces este plazo y cambian una vez por plazo.
+# Debe ser mayor que TIMELINE_CACHE_TIMEOUT: los fragmentos cacheados las contienen.
+MEDIA_URL_TTL = 24 * 3600
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
 
+# Las imágenes de recuerdos se validan mientras se reciben y se escriben directo
+# en MEDIA_ROOT (ver memories/upload_handlers.py, instalado solo en las vistas de
+# crear y editar); los límites salen de FILE_VALIDATION
+from .optimizations import FILE_VALIDATION  # noqa: E402
+
+# Procesamiento de imágenes
+# En desarrollo los derivados se generan dentro de la petición; en producción
+# los genera el worker en segundo plano: python manage.py image_worker
+IMAGE_PROCESSING_EAGER = DEBUG
+from .optimizations import IMAGE_NORMALIZATION  # noqa: E402
+
+# Rate limiting por endpoint (ver memories/ratelimit.py)
+from .optimizations import RATE_LIMITING  # noqa: E402
+RATE_LIMIT_BACKEND = 'memories.ratelimit.LocalRateLimitBackend'
+
+# Segundos que se conserva cada página renderizada de la línea de tiempo
+# (se invalida antes al crear, editar o eliminar recuerdos)
+TIMELINE_CACHE_TIMEOUT = 600
+
+# Checkpoint del barrido incremental de imágenes huérfanas (optimize_db).
+# Fuera de MEDIA_ROOT para que no se publique.
+ORPHAN_SWEEP_CHECKPOINT = BASE_DIR / '.orphan_sweep.json'
+
+# Métricas de rendimiento por vista en /metrics/ (ver memories/metrics.py)
+from .optimizations import MONITORING  # noqa: E402
+METRICS_FLUSH_INTERVAL = 1.0  # Segundos entre volcados de cada worker
+
+# /health/, /health/live/ y /health/ready/ (ver memories/health.py)
+HEALTH_CHECK_TIMEOUT = 2.0  # Segundos máximos por verificación
+HEALTH_CACHE_SECONDS = 5  # Los sondeos dentro de este plazo reutilizan el resultado
+
+# Vistas async para las lecturas frecuentes (ver memories/async_views.py);
+# asgi.py las activa, con WSGI no aportan nada
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS') == '1'
+
 # Authentication settings
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
@@ -29,6 +29,27 @@ DATABASES = {
     )
 }
 
+# Réplicas de solo lectura: DATABASE_REPLICA_URLS con una o más URLs
+# separadas por comas (ver memories/routers.py)
+for index, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), start=1):
+    DATABASES[f'replica_{index}'] = dj_database_url.parse(
+        url.strip(),
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    DATABASES[f'replica_{index}']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Perfil de SQLite para cPanel/passenger y varios workers de gunicorn
+# (sin efecto si DATABASE_URL apunta a PostgreSQL)
+SQLITE_PRAGMAS = {
+    **SQLITE_PRAGMAS,
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', '10000')),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', '-32000')),
+}
+
 # Configuración de seguridad para producción
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -38,15 +59,29 @@ SECURE_HSTS_PRELOAD = True
 
 # SSL/HTTPS settings
 SECURE_SSL_REDIRECT = True
+# El balanceador sondea por HTTP interno
+SECURE_REDIRECT_EXEMPT = [r'^health/']
 SESSION_COOKIE_SECURE = True
 CSRF_COOKIE_SECURE = True
 
 # Configuración de archivos estáticos para producción
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# collectstatic agrega el hash al nombre y guarda versiones .gz (y .br si Brotli está
+# instalado); WhiteNoise elige según Accept-Encoding y cachea un año las que tienen hash
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Middleware para archivos estáticos en producción
-MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
+MIDDLEWARE.insert(
+    MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+)
+
+# Métricas sumadas entre todos los workers de gunicorn
+MONITORING = {
+    **MONITORING,
+    'METRICS_DIR': os.environ.get('METRICS_DIR', str(BASE_DIR / 'logs' / 'metrics')),
+    'METRICS_TOKEN': os.environ.get('METRICS_TOKEN') or None,
+}
 
 # Configuración de logging para producción
 LOGGING = {
@@ -110,6 +145,10 @@ CACHES = {
     }
 }
 
+# Rate limiting compartido entre todos los workers de gunicorn
+RATE_LIMIT_BACKEND = 'memories.ratelimit.CacheRateLimitBackend'
+RATE_LIMIT_CACHE = 'default'
+
 # Configuración de sesiones
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
@@ -119,6 +158,12 @@ SESSION_CACHE_ALIAS = 'default'
 MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_URL = '/media/'
 
+# Las imágenes se procesan con el worker: python manage.py image_worker
+IMAGE_PROCESSING_EAGER = False
+# El worker recodifica los originales (ver memories/images.py);
+# las imágenes ya guardadas se procesan con: python manage.py normalize_images
+IMAGE_NORMALIZATION = {**IMAGE_NORMALIZATION, 'ENABLED': True}
+
 # Límites de subida más estrictos en producción
 FILE_UPLOAD_MAX_MEMORY_SIZE = 2 * 1024 * 1024  # 2MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 2 * 1024 * 1024  # 2MB
@@ -24,9 +24,8 @@ urlpatterns = [
     path('', include('memories.urls')),  # URLs de la aplicación memories
 ]
 
-# Servir archivos media en desarrollo
+# Los archivos media los sirve memories.views.MediaFileView (también en producción)
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0])
 
 # Manejadores de error personalizados